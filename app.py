@@ -1,24 +1,23 @@
 import streamlit as st
 import os
-from dotenv import load_dotenv
 from openai import OpenAI
-import PyPDF2
-import docx
 import pandas as pd
 import json
+import hashlib
+import io
+import threading
+import copy
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
 # Remove streamlit-elements import
 # from streamlit_elements import elements, mui
 from jd_analyzer import analyze_job_description, format_requirements_for_display, parse_edited_requirements
 from resume_analyzer import analyze_resume
-
-# Load environment variables
-load_dotenv()
-
-# Initialize OpenAI client
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+from text_extraction import extract_text
+from verdict_cache import analysis_cache_key
 
 # Initialize session state for API key verification
-# Auto-apply API key from .env file
+# Auto-apply API key from .env file (loaded by llm_utils when the analyzers are imported)
 api_key_from_env = os.getenv("OPENAI_API_KEY")
 if 'api_key_verified' not in st.session_state:
     st.session_state.api_key_verified = bool(api_key_from_env)
@@ -35,51 +34,126 @@ if "formatted_reqs" not in st.session_state:
 if "selected_models" not in st.session_state:
     st.session_state.selected_models = {"primary": "gpt-4.1", "reasoning": "o4-mini"}
 
-def extract_text_from_pdf(pdf_file):
-    text = ""
-    try:
-        pdf_reader = PyPDF2.PdfReader(pdf_file)
-        for page_num, page in enumerate(pdf_reader.pages):
-            page_text = page.extract_text()
-            text += page_text
-            
-            # Log each page separately for debugging
-            print(f"\n--- PAGE {page_num + 1} TEXT ---")
-            print(page_text[:300] + "..." if len(page_text) > 300 else page_text)
-            print("--- END PAGE ---")
-    
-    except Exception as e:
-        print(f"Error extracting PDF text: {str(e)}")
-        return ""
+# Resumes analyzed concurrently when "Analyze Resumes" is clicked
+ANALYSIS_WORKERS = 4
+
+# Entries kept per cache; the least recently used ones are evicted beyond this
+CACHE_MAX_ENTRIES = 256
+
+class _NotCached(Exception):
+    """Raised inside a cached function so that a failed call is not stored"""
+
+class CacheStats:
+    """Counts calls and misses per cache; every call that did not miss was a hit"""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.calls = {}
+        self.misses = {}
     
-    # Clean up the text - remove extra whitespace and normalize
-    text = ' '.join(text.split())
+    def record_call(self, name):
+        with self._lock:
+            self.calls[name] = self.calls.get(name, 0) + 1
     
-    # Log the extracted text for debugging
-    print("\n" + "="*80)
-    print(f"EXTRACTED PDF TEXT FROM: {pdf_file.name}")
-    print("="*80)
-    print(f"Total text length: {len(text)} characters")
-    print("First 1000 characters:")
-    print(text[:1000] + "..." if len(text) > 1000 else text)
-    print("="*80)
+    def record_miss(self, name):
+        with self._lock:
+            self.misses[name] = self.misses.get(name, 0) + 1
     
-    return text
+    def snapshot(self):
+        with self._lock:
+            return {name: {"hits": calls - self.misses.get(name, 0), "misses": self.misses.get(name, 0)}
+                    for name, calls in self.calls.items()}
 
-def extract_text_from_docx(docx_file):
-    doc = docx.Document(docx_file)
-    text = ""
-    for paragraph in doc.paragraphs:
-        text += paragraph.text + "\n"
-    return text
+@st.cache_resource
+def get_cache_stats():
+    """Cache counters shared by every rerun and session"""
+    return CacheStats()
 
-def process_file(file):
-    if file.name.endswith('.pdf'):
-        return extract_text_from_pdf(file)
-    elif file.name.endswith('.docx'):
-        return extract_text_from_docx(file)
-    else:
-        return file.getvalue().decode('utf-8')
+@st.cache_resource
+def get_openai_client(api_key):
+    """One OpenAI client per API key, created once and shared by every rerun and session"""
+    return OpenAI(api_key=api_key)
+
+class LRUCache:
+    """
+    Thread-safe least-recently-used cache for calls made from the analysis worker threads.
+    st.cache_data needs the script thread's ScriptRunContext, which worker threads lack.
+    Failed calls (None) are not stored, and hits are returned as copies like st.cache_data's.
+    """
+    def __init__(self, name, stats, max_entries=CACHE_MAX_ENTRIES):
+        self.name = name
+        self.stats = stats
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+    
+    def get_or_compute(self, key, compute):
+        self.stats.record_call(self.name)
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return copy.deepcopy(self._entries[key])
+        self.stats.record_miss(self.name)
+        value = compute()
+        if value is not None:
+            with self._lock:
+                self._entries[key] = copy.deepcopy(value)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return value
+
+# Resolved on the script thread and handed to the workers, since st.cache_resource
+# itself must not be called from worker threads either
+@st.cache_resource
+def get_text_cache():
+    """Extracted text keyed by file content hash and extension"""
+    return LRUCache("text_extraction", get_cache_stats())
+
+@st.cache_resource
+def get_resume_analysis_cache():
+    """Resume analyses keyed by resume, requirements and model"""
+    return LRUCache("resume_analysis", get_cache_stats())
+
+# Job descriptions are analyzed on the script thread, so st.cache_data can be used; it is
+# keyed by a content hash and the underscore argument carries the text (not hashed by Streamlit)
+@st.cache_data(show_spinner=False, max_entries=CACHE_MAX_ENTRIES)
+def _cached_analyze_job_description(job_description_hash, model, _job_description):
+    get_cache_stats().record_miss("job_description")
+    requirements = analyze_job_description(_job_description, model=model)
+    if requirements is None:
+        raise _NotCached()
+    return requirements
+
+def cached_extract_text(file, text_cache):
+    """Extracts an uploaded file's text, reusing the result for identical file contents"""
+    file_bytes = file.getvalue()
+    extension = os.path.splitext(file.name)[1].lower()
+    return text_cache.get_or_compute((hashlib.sha256(file_bytes).hexdigest(), extension),
+                                     lambda: extract_text(io.BytesIO(file_bytes), extension))
+
+def cached_analyze_job_description(job_description, model):
+    """Analyzes a job description, reusing the result for the same text and model"""
+    get_cache_stats().record_call("job_description")
+    job_description_hash = hashlib.sha256(job_description.encode('utf-8')).hexdigest()
+    try:
+        return _cached_analyze_job_description(job_description_hash, model, job_description)
+    except _NotCached:
+        return None
+
+def cached_analyze_resume(resume_text, requirements, model, analysis_cache):
+    """Analyzes a resume, reusing the result for the same resume, requirements and model"""
+    return analysis_cache.get_or_compute(analysis_cache_key(resume_text, requirements, model),
+                                         lambda: analyze_resume(resume_text, requirements, model=model))
+
+def clear_caches():
+    """Drops cached extractions and analyses and resets the counters"""
+    get_text_cache.clear()
+    get_resume_analysis_cache.clear()
+    _cached_analyze_job_description.clear()
+    get_cache_stats.clear()
+
+def process_file(file, text_cache):
+    return cached_extract_text(file, text_cache)
 
 def create_collapsible_section(header, content):
     """Create a collapsible section using HTML and JavaScript"""
@@ -510,6 +584,144 @@ def flatten_analysis_for_csv(analysis):
 
     return flattened
 
+def analyze_uploaded_file(file, requirements, model, text_cache, analysis_cache):
+    """
+    Extracts and analyzes one uploaded resume. Runs in a worker thread, so it must not
+    call Streamlit (including its caches); the caller renders the result.
+
+    Args:
+        file: Uploaded file from st.file_uploader
+        requirements (dict): Job requirements to match against
+        model (str): Model used for the analysis
+        text_cache (LRUCache): Cache of extracted texts, from get_text_cache()
+        analysis_cache (LRUCache): Cache of analyses, from get_resume_analysis_cache()
+    """
+    resume_text = process_file(file, text_cache)
+    if not resume_text.strip():
+        raise ValueError("no text could be extracted")
+    
+    # Log the processed text for debugging
+    print("\n" + "="*80)
+    print(f"PROCESSED TEXT FOR AI ANALYSIS - FILE: {file.name}")
+    print("="*80)
+    print(f"Text length: {len(resume_text)} characters")
+    print("First 500 characters:")
+    print(resume_text[:500])
+    print("="*80)
+    
+    return cached_analyze_resume(resume_text, requirements, model, analysis_cache)
+
+def display_resume_result(filename, analysis, quantitative_percentage, semantic_percentage):
+    """Renders one analyzed resume as an expander"""
+    with st.expander(f"{filename} - {semantic_percentage}% (Semantic: {semantic_percentage}% | Quantitative: {quantitative_percentage}%)", expanded=True):
+        # Display contact information first
+        if 'contact_info' in analysis['analysis']:
+            # Debug: Print contact info to console
+            print(f"\n--- CONTACT INFO FOR {filename} ---")
+            print(json.dumps(analysis['analysis']['contact_info'], indent=2))
+            print("--- END CONTACT INFO ---")
+            
+            display_contact_info(analysis['analysis']['contact_info'])
+            st.divider()
+        else:
+            print(f"\n--- NO CONTACT INFO FOUND FOR {filename} ---")
+            st.warning("⚠️ No contact information could be extracted from this resume.")
+        
+        # Display requirements match
+        display_simple_minimal_requirements(analysis['analysis'])
+        
+        # Display other parts 
+        st.divider() 
+        display_qualitative_assessment(analysis['analysis']['qualitative_assessment'])
+        
+        # Display Recruiter Summary if available (without title)
+        if 'qualitative_assessment' in analysis['analysis'] and 'recruiter_style_summary' in analysis['analysis']['qualitative_assessment']:
+            st.write("")
+            st.write(analysis['analysis']['qualitative_assessment']['recruiter_style_summary'])
+            st.divider()
+        
+        st.subheader("Final Recommendation")
+        st.write(analysis['analysis']['final_recommendation'])
+        
+        st.subheader("Reason for Recommendation") 
+        for factor in analysis['analysis']['summary_of_key_factors']:
+            st.write(f"- {factor}")
+        st.divider()
+
+# Sort options for the results view: label -> (key function, descending)
+RESULT_SORT_OPTIONS = {
+    "Semantic score": (lambda result: result['semantic_percentage'], True),
+    "Quantitative score": (lambda result: result['quantitative_percentage'], True),
+    "Candidate name": (lambda result: candidate_name(result).lower(), False),
+    "File name": (lambda result: result['filename'].lower(), False)
+}
+
+RESULTS_PAGE_SIZES = [10, 25, 50, 100]
+
+def candidate_name(result):
+    """Returns the candidate's name from the extracted contact info, or an empty string"""
+    return (result['analysis'].get('contact_info') or {}).get('full_name') or ""
+
+def build_results_summary(results):
+    """Builds the compact one-row-per-candidate table shown instead of full detail panels"""
+    return pd.DataFrame([{
+        'File': result['filename'],
+        'Candidate': candidate_name(result),
+        'Semantic %': result['semantic_percentage'],
+        'Quantitative %': result['quantitative_percentage'],
+        'Recommendation': result['analysis'].get('final_recommendation', '')
+    } for result in results])
+
+def display_results_view(results):
+    """
+    Renders analysis results as a sortable, paginated summary table. Detail panels are only
+    built for the candidates the user opens on the current page, so large pools stay responsive.
+
+    Args:
+        results (list): Result dicts stored in st.session_state.resume_results
+    """
+    st.subheader(f"Results ({len(results)} candidates)")
+    
+    sort_col, order_col, size_col = st.columns([2, 1, 1])
+    with sort_col:
+        sort_label = st.selectbox("Sort by", list(RESULT_SORT_OPTIONS), key="results_sort")
+    sort_key, descending = RESULT_SORT_OPTIONS[sort_label]
+    with order_col:
+        descending = st.checkbox("Descending", value=descending, key=f"results_descending_{sort_label}")
+    with size_col:
+        page_size = st.selectbox("Per page", RESULTS_PAGE_SIZES, key="results_page_size")
+    
+    total_pages = max(1, -(-len(results) // page_size))
+    # Keep the stored page valid when the page size or the number of results changes
+    if st.session_state.get("results_page", 1) > total_pages:
+        st.session_state.results_page = total_pages
+    page = st.number_input(f"Page (of {total_pages})", min_value=1, max_value=total_pages,
+                           step=1, key="results_page")
+    
+    ordered = sorted(results, key=sort_key, reverse=descending)
+    page_results = ordered[(page - 1) * page_size:page * page_size]
+    st.dataframe(build_results_summary(page_results), hide_index=True, use_container_width=True)
+    
+    # Detail panels are built only for the candidates opened here
+    opened = st.multiselect("Show details for", range(len(page_results)),
+                            format_func=lambda i: page_results[i]['filename'],
+                            key=f"results_details_{sort_label}_{descending}_{page_size}_{page}")
+    for i in sorted(opened):
+        result = page_results[i]
+        display_resume_result(result['filename'], result, result['quantitative_percentage'],
+                              result['semantic_percentage'])
+    
+    # CSV download covers every result, not just the current page
+    if st.session_state.get('csv_data'):
+        df = pd.DataFrame(st.session_state.csv_data)
+        csv = df.to_csv(index=False)
+        st.download_button(
+            label="📥 Download Complete Analysis Results as CSV",
+            data=csv,
+            file_name="resume_analysis_results.csv",
+            mime="text/csv",
+        )
+
 # Main page title
 st.title("Resume Ranking System")
 
@@ -534,7 +746,7 @@ elif not st.session_state.api_key_verified:
         if api_key:
             try:
                 # Try to create a client and make a simple API call
-                client = OpenAI(api_key=api_key)
+                client = get_openai_client(api_key)
                 response = client.chat.completions.create(
                     model="gpt-3.5-turbo",
                     messages=[{"role": "user", "content": "Test"}],
@@ -630,7 +842,7 @@ if st.button("Analyze Job Description", key="analyze_jd_btn"):
         st.error("Please provide a job description.")
     else:
         with st.spinner("Analyzing job description..."):
-            requirements = analyze_job_description(job_description, model=st.session_state.selected_models["primary"])
+            requirements = cached_analyze_job_description(job_description, st.session_state.selected_models["primary"])
             
             if requirements:
                 st.session_state.job_description = job_description
@@ -691,23 +903,26 @@ if st.session_state.requirements is not None:
         
         total_files = len(uploaded_files)
         
-        # Create one results section that will be updated
+        # Live summary of the analyses finished so far, plus any per-file errors
+        live_summary = st.empty()
         results_section = st.container()
         
-        for idx, file in enumerate(uploaded_files, 1):
-            with st.spinner(f"Analyzing {file.name}..."):
-                resume_text = process_file(file)
-                
-                # Log the processed text for debugging
-                print("\n" + "="*80)
-                print(f"PROCESSED TEXT FOR AI ANALYSIS - FILE: {file.name}")
-                print("="*80)
-                print(f"Text length: {len(resume_text)} characters")
-                print("First 500 characters:")
-                print(resume_text[:500])
-                print("="*80)
-                
-                analysis = analyze_resume(resume_text, st.session_state.requirements, model=st.session_state.selected_models["reasoning"])
+        # Analyses run in a worker pool; the summary is updated as each one completes
+        requirements = st.session_state.requirements
+        model = st.session_state.selected_models["reasoning"]
+        text_cache = get_text_cache()
+        analysis_cache = get_resume_analysis_cache()
+        with ThreadPoolExecutor(max_workers=ANALYSIS_WORKERS) as executor:
+            futures = {executor.submit(analyze_uploaded_file, file, requirements, model, text_cache, analysis_cache): file.name
+                       for file in uploaded_files}
+            
+            for idx, future in enumerate(as_completed(futures), 1):
+                filename = futures[future]
+                try:
+                    analysis = future.result()
+                except Exception as e:
+                    print(f"Error analyzing {filename}: {str(e)}")
+                    analysis = None
                 
                 if analysis:
                     # Calculate both percentage scores
@@ -716,7 +931,7 @@ if st.session_state.requirements is not None:
                     
                     # Store results
                     result = {
-                        'filename': file.name,
+                        'filename': filename,
                         'quantitative_percentage': quantitative_percentage,
                         'semantic_percentage': semantic_percentage,
                         'percentage': semantic_percentage,  # Use semantic as main percentage
@@ -729,63 +944,43 @@ if st.session_state.requirements is not None:
                     
                     # Flatten and store data for CSV
                     flattened_data = flatten_analysis_for_csv(analysis['analysis'])
-                    flattened_data['filename'] = file.name
+                    flattened_data['filename'] = filename
                     flattened_data['quantitative_percentage'] = quantitative_percentage
                     flattened_data['semantic_percentage'] = semantic_percentage
                     flattened_data['percentage'] = semantic_percentage  # Use semantic as main percentage
                     st.session_state.csv_data.append(flattened_data)
                     
-                    # Update progress
-                    progress_bar.progress(idx / total_files)
-                    
-                    # Display result in the single results section
+                    # Update the live summary; details are opened from the results view below
+                    live_summary.dataframe(build_results_summary(st.session_state.resume_results),
+                                           hide_index=True, use_container_width=True)
+                else:
+                    # Malformed responses were already retried for this file only
                     with results_section:
-                        with st.expander(f"{file.name} - {semantic_percentage}% (Semantic: {semantic_percentage}% | Quantitative: {quantitative_percentage}%)", expanded=True):
-                            # Display contact information first
-                            if 'contact_info' in analysis['analysis']:
-                                # Debug: Print contact info to console
-                                print(f"\n--- CONTACT INFO FOR {file.name} ---")
-                                print(json.dumps(analysis['analysis']['contact_info'], indent=2))
-                                print("--- END CONTACT INFO ---")
-                                
-                                display_contact_info(analysis['analysis']['contact_info'])
-                                st.divider()
-                            else:
-                                print(f"\n--- NO CONTACT INFO FOUND FOR {file.name} ---")
-                                st.warning("⚠️ No contact information could be extracted from this resume.")
-                            
-                            # Display requirements match
-                            display_simple_minimal_requirements(analysis['analysis'])
-                            
-                            # Display other parts 
-                            st.divider() 
-                            display_qualitative_assessment(analysis['analysis']['qualitative_assessment'])
-                            
-                            # Display Recruiter Summary if available (without title)
-                            if 'qualitative_assessment' in analysis['analysis'] and 'recruiter_style_summary' in analysis['analysis']['qualitative_assessment']:
-                                st.write("")
-                                st.write(analysis['analysis']['qualitative_assessment']['recruiter_style_summary'])
-                                st.divider()
-                            
-                            st.subheader("Final Recommendation")
-                            st.write(analysis['analysis']['final_recommendation'])
-                            
-                            st.subheader("Reason for Recommendation") 
-                            for factor in analysis['analysis']['summary_of_key_factors']:
-                                st.write(f"- {factor}")
-                            st.divider()
+                        st.error(f"❌ Could not analyze {filename}. Re-upload just this file to retry.")
+                
+                # Update progress
+                progress_bar.progress(idx / total_files, text=f"Analyzed {idx} of {total_files} resumes")
         
         # Clear the progress bar and show completion
         progress_bar.empty()
+        live_summary.empty()
         st.success("✅ All resumes processed!")
-        
-        # Show CSV download button after all processing is complete
-        if st.session_state.csv_data:
-            df = pd.DataFrame(st.session_state.csv_data)
-            csv = df.to_csv(index=False)
-            st.download_button(
-                label="📥 Download Complete Analysis Results as CSV",
-                data=csv,
-                file_name="resume_analysis_results.csv",
-                mime="text/csv",
-            )
\ No newline at end of file
+    
+    # Results view, rendered on every rerun from the stored results
+    if st.session_state.get('resume_results'):
+        display_results_view(st.session_state.resume_results)
+
+# Cache statistics panel
+with st.sidebar.expander("⚡ Cache Statistics"):
+    cache_labels = {
+        "text_extraction": "Text extraction",
+        "job_description": "Job description analysis",
+        "resume_analysis": "Resume analysis"
+    }
+    cache_stats = get_cache_stats().snapshot()
+    for name, label in cache_labels.items():
+        counts = cache_stats.get(name, {"hits": 0, "misses": 0})
+        st.write(f"**{label}**: {counts['hits']} hits / {counts['misses']} misses")
+    if st.button("Clear Caches", key="clear_caches_btn"):
+        clear_caches()
+        st.rerun()
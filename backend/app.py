@@ -1,38 +1,46 @@
-from flask import Flask, request, jsonify, send_file, send_from_directory
+from flask import Flask, Response, request, jsonify, send_file, send_from_directory, stream_with_context
 from flask_cors import CORS
 import os
 import json
-import pandas as pd
-from dotenv import load_dotenv
-from openai import OpenAI
-import PyPDF2
-import docx
 import io
+import copy
+import gzip
+from werkzeug.datastructures import FileStorage
+from werkzeug.http import parse_options_header
 from werkzeug.utils import secure_filename
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import tempfile
-import re
+import threading
 
 # Import our custom modules
 import sys
 sys.path.append('..')
 from jd_analyzer import analyze_job_description, format_requirements_for_display, parse_edited_requirements
 from resume_analyzer import analyze_resume
-
-# Load environment variables
-load_dotenv()
+from text_extraction import extract_text, is_archive, iter_archive_members
+from screening_matrix import fill_candidate_matrix
+from skill_taxonomy import analysis_skill_ids, find_skills, requirement_skill_ids
+from multipart_stream import close_files, iter_multipart_parts
+from llm_utils import api_key_verifier, get_client, request_hedger, stream_completion
+from single_flight import single_flight
+from verdict_cache import verdict_cache
+from context_extractor import update_job_context
+from chat_context import build_windowed_conversation, context_json
+from batch_api import get_batch_backend, import_batch_results, submit_resume_batch
+from results_query import DEFAULT_PAGE_SIZE, LIST_FIELDS, index_results, project, query_results
+from jd_batch import analyze_job_descriptions, duplicate_ids, job_description_entry, parse_job_descriptions_jsonl, requirements_id_for
 
 # Configure Flask to serve React build files
 app = Flask(__name__, static_folder='../frontend/build', static_url_path='')
 CORS(app)
 
-# Initialize OpenAI client
+# Check the OpenAI API key (.env is loaded by llm_utils); the shared client is created on first use
 api_key_from_env = os.getenv("OPENAI_API_KEY")
 if not api_key_from_env:
     print("❌ OPENAI_API_KEY not found in environment variables!")
     print("Please set OPENAI_API_KEY in your .env file")
     exit(1)
 
-client = OpenAI(api_key=api_key_from_env)
 print("✅ OpenAI API key loaded from environment")
 
 # Global variables to store analysis data
@@ -40,57 +48,47 @@ current_requirements = None
 current_job_description = None
 analysis_results = []
 
-def extract_text_from_pdf(pdf_file):
-    """Extract text from PDF file"""
-    text = ""
-    try:
-        pdf_reader = PyPDF2.PdfReader(pdf_file)
-        for page_num, page in enumerate(pdf_reader.pages):
-            page_text = page.extract_text()
-            text += page_text
-            
-            # Log each page separately for debugging
-            print(f"\n--- PAGE {page_num + 1} TEXT ---")
-            print(page_text[:300] + "..." if len(page_text) > 300 else page_text)
-            print("--- END PAGE ---")
-    
-    except Exception as e:
-        print(f"Error extracting PDF text: {str(e)}")
-        return ""
-    
-    # Clean up the text - remove extra whitespace and normalize
-    text = ' '.join(text.split())
-    
-    # Log the extracted text for debugging
-    print("\n" + "="*80)
-    print(f"EXTRACTED PDF TEXT FROM: {pdf_file.name if hasattr(pdf_file, 'name') else 'PDF file'}")
-    print("="*80)
-    print(f"Total text length: {len(text)} characters")
-    print("First 1000 characters:")
-    print(text[:1000] + "..." if len(text) > 1000 else text)
-    print("="*80)
-    
-    return text
+# Incremented whenever analysis_results is replaced, so stale result cursors are rejected
+results_version = 0
+results_lock = threading.Lock()
 
-def extract_text_from_docx(docx_file):
-    """Extract text from DOCX file"""
-    doc = docx.Document(docx_file)
-    text = ""
-    for paragraph in doc.paragraphs:
-        text += paragraph.text + "\n"
-    return text
+# Analyzed requirements keyed by requirements id, filled by single and bulk JD analysis
+requirements_store = {}
 
-def process_file(file):
-    """Process uploaded file and extract text"""
-    filename = secure_filename(file.filename)
-    
-    if filename.endswith('.pdf'):
-        return extract_text_from_pdf(file)
-    elif filename.endswith('.docx'):
-        return extract_text_from_docx(file)
-    else:
-        # Assume it's a text file
-        return file.read().decode('utf-8')
+# Resumes analyzed concurrently by the streaming upload endpoint
+UPLOAD_ANALYSIS_WORKERS = 4
+
+# Submitted Batch API jobs keyed by batch id
+batch_jobs = {}
+
+def process_file(file, filename=None):
+    """
+    Process uploaded file (or archive member) and extract text.
+    Raises ValueError if no text could be extracted (e.g. a scanned PDF).
+    """
+    filename = secure_filename(filename or file.filename)
+    resume_text = extract_text(file, filename)
+    if not resume_text.strip():
+        raise ValueError("no text could be extracted")
+    return resume_text
+
+def iter_uploaded_files(files):
+    """
+    Yields (filename, file) for each uploaded resume. Zip/tar archives are expanded one
+    member at a time; `file` is None for members over the size limit or unreadable archives.
+    """
+    for file in files:
+        if file.filename == '':
+            continue
+        if not is_archive(file.filename):
+            yield file.filename, file
+            continue
+        try:
+            for member_name, content in iter_archive_members(file.stream, file.filename):
+                yield member_name, (io.BytesIO(content) if content is not None else None)
+        except Exception as e:
+            print(f"Error reading archive {file.filename}: {str(e)}")
+            yield file.filename, None
 
 def calculate_percentage(score):
     """Convert score like '10/21' to percentage"""
@@ -146,6 +144,26 @@ def flatten_analysis_for_csv(analysis):
 
     return flattened
 
+# JSON responses at least this large are gzip-compressed for clients that accept it
+GZIP_MIN_BYTES = 1024
+
+@app.after_request
+def compress_response(response):
+    """Gzip-compress large JSON responses (streams and files are left as they are)"""
+    if (response.direct_passthrough or response.is_streamed or response.mimetype != 'application/json'
+            or 'Content-Encoding' in response.headers
+            or 'gzip' not in request.headers.get('Accept-Encoding', '').lower()):
+        return response
+    
+    data = response.get_data()
+    if len(data) < GZIP_MIN_BYTES:
+        return response
+    
+    response.set_data(gzip.compress(data))
+    response.headers['Content-Encoding'] = 'gzip'
+    response.vary.add('Accept-Encoding')
+    return response
+
 # API Routes
 
 @app.route('/api/health', methods=['GET'])
@@ -153,21 +171,42 @@ def health_check():
     """Health check endpoint"""
     return jsonify({"status": "healthy", "message": "Resume Ranking API is running"})
 
+@app.route('/api/metrics', methods=['GET'])
+def metrics():
+    """Model-call metrics: request hedging, in-flight coalescing and verdict cache"""
+    return jsonify({
+        "success": True,
+        "hedging": request_hedger.stats(),
+        "single_flight": single_flight.stats(),
+        "verdict_cache": verdict_cache.stats(),
+        "api_key_checks": api_key_verifier.stats()
+    })
+
 @app.route('/api/check-api-key', methods=['GET'])
 def check_api_key():
-    """Check if API key is loaded and working"""
+    """Check if API key is loaded and working (cached; pass refresh=true to verify again now)"""
     try:
-        # Test the API key with a simple request
-        response = client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[{"role": "user", "content": "Test"}],
-            max_tokens=5
-        )
-        
-        return jsonify({"success": True, "message": "API key is working"})
-    
+        status = api_key_verifier.status(force=request.args.get('refresh', '').lower() == 'true')
     except Exception as e:
         return jsonify({"success": False, "message": f"API key error: {str(e)}"}), 400
+    
+    return jsonify({
+        "success": status["valid"],
+        "message": status["message"],
+        "checked_at": status["checked_at"],
+        "age_seconds": status["age_seconds"]
+    }), (200 if status["valid"] else 400)
+
+@app.route('/api/ready', methods=['GET'])
+def readiness_check():
+    """Readiness probe for load balancers; uses the last cached key check and never calls the API"""
+    status = api_key_verifier.cached_status()
+    ready = status["valid"] is not False
+    return jsonify({
+        "ready": ready,
+        "api_key_verified": status["valid"],
+        "message": status["message"]
+    }), (200 if ready else 503)
 
 @app.route('/api/analyze-job-description', methods=['POST'])
 def analyze_jd():
@@ -187,11 +226,14 @@ def analyze_jd():
         if requirements:
             current_job_description = job_description
             current_requirements = requirements
+            requirements_id = requirements_id_for(job_description)
+            requirements_store[requirements_id] = requirements
             
             return jsonify({
                 "success": True,
                 "message": "Job description analyzed successfully",
-                "requirements": requirements
+                "requirements": requirements,
+                "requirements_id": requirements_id
             })
         else:
             return jsonify({"success": False, "message": "Failed to analyze job description"}), 500
@@ -199,23 +241,81 @@ def analyze_jd():
     except Exception as e:
         return jsonify({"success": False, "message": f"Error analyzing job description: {str(e)}"}), 500
 
-@app.route('/api/job-description-chat', methods=['POST'])
-def job_description_chat():
-    """Handle conversational job description creation"""
-    data = request.get_json()
-    message = data.get('message', '')
-    context = data.get('context', {})
-    messages = data.get('messages', [])
+@app.route('/api/analyze-job-descriptions/bulk', methods=['POST'])
+def analyze_jds_bulk():
+    """Analyze many job descriptions concurrently and store each under its own requirements id"""
+    if 'file' in request.files:
+        # JSONL upload: one {"id", "title", "job_description"} object per line
+        entries = parse_job_descriptions_jsonl(request.files['file'].stream)
+        model = request.form.get('model', 'gpt-4.1')
+    else:
+        data = request.get_json() or {}
+        model = data.get('model', 'gpt-4.1')
+        entries = []
+        for item in data.get('job_descriptions', []):
+            if isinstance(item, str):
+                item = {"job_description": item}
+            if item.get('job_description'):
+                entries.append(job_description_entry(item['job_description'], item.get('id'), item.get('title')))
     
-    if not message:
-        return jsonify({"success": False, "message": "Message is required"}), 400
+    if not entries:
+        return jsonify({"success": False, "message": "No job descriptions provided"}), 400
+    
+    # Results are stored by id, so a repeated id would silently replace another JD's requirements
+    duplicates = duplicate_ids(entries)
+    if duplicates:
+        return jsonify({
+            "success": False,
+            "message": f"Duplicate job description ids: {', '.join(duplicates)}",
+            "duplicate_ids": duplicates
+        }), 400
     
     try:
-        # Build conversation history for OpenAI
-        conversation_history = []
+        results = analyze_job_descriptions(entries, model=model)
         
-        # System prompt for job description creation
-        system_prompt = """You are a helpful HR assistant specializing in creating comprehensive job descriptions. Your role is to guide users through creating detailed, professional job descriptions by asking relevant questions and gathering information step by step.
+        analyzed = []
+        failed = []
+        for requirements_id, requirements in results.items():
+            if requirements:
+                requirements_store[requirements_id] = requirements
+                analyzed.append(requirements_id)
+            else:
+                failed.append(requirements_id)
+        
+        return jsonify({
+            "success": True,
+            "message": f"Analyzed {len(analyzed)} of {len(entries)} job descriptions",
+            "requirements_ids": analyzed,
+            "failed_ids": failed
+        })
+    
+    except Exception as e:
+        return jsonify({"success": False, "message": f"Error analyzing job descriptions: {str(e)}"}), 500
+
+@app.route('/api/requirements', methods=['GET'])
+def list_requirements():
+    """List stored requirement sets"""
+    return jsonify({
+        "success": True,
+        "requirements": [
+            {"requirements_id": requirements_id, "title": requirements.get('title', '')}
+            for requirements_id, requirements in requirements_store.items()
+        ]
+    })
+
+@app.route('/api/requirements/<requirements_id>', methods=['GET'])
+def get_requirements(requirements_id):
+    """Get a stored requirement set by id"""
+    requirements = requirements_store.get(requirements_id)
+    if requirements is None:
+        return jsonify({"success": False, "message": "Requirements not found"}), 404
+    
+    return jsonify({"success": True, "requirements_id": requirements_id, "requirements": requirements})
+
+def build_chat_conversation(message, context, messages):
+    """Builds the chat messages for one turn; returns (context, conversation_history)"""
+    # System prompt for job description creation
+    system_prompt = """You are a helpful HR assistant specializing in creating comprehensive job descriptions. Your role is to guide users through creating detailed, professional job descriptions by asking relevant questions and gathering information step by step.
 
 When creating job descriptions, include:
 - Job title and department
@@ -233,22 +333,29 @@ Ask follow-up questions to gather missing information. When you have gathered en
 
 Be conversational, helpful, and professional. Always be ready to create job descriptions once you have the essentials.
 
-Current context: {context}""".format(context=json.dumps(context))
-        
-        conversation_history.append({"role": "system", "content": system_prompt})
-        
-        # Add previous messages to conversation history
-        for msg in messages:
-            if msg['type'] == 'user':
-                conversation_history.append({"role": "user", "content": msg['content']})
-            elif msg['type'] == 'assistant':
-                conversation_history.append({"role": "assistant", "content": msg['content']})
-        
-        # Add current user message
-        conversation_history.append({"role": "user", "content": message})
+Current context: {context}""".format(context=context_json(context))
+    
+    # Recent turns verbatim, older turns via the rolling summary, within a token budget
+    context = dict(context)
+    conversation_history = build_windowed_conversation(get_client(), system_prompt, context, messages, message)
+    return context, conversation_history
+
+@app.route('/api/job-description-chat', methods=['POST'])
+def job_description_chat():
+    """Handle conversational job description creation"""
+    data = request.get_json()
+    message = data.get('message', '')
+    context = data.get('context', {})
+    messages = data.get('messages', [])
+    
+    if not message:
+        return jsonify({"success": False, "message": "Message is required"}), 400
+    
+    try:
+        context, conversation_history = build_chat_conversation(message, context, messages)
         
         # Get response from OpenAI
-        response = client.chat.completions.create(
+        response = get_client().chat.completions.create(
             model="gpt-4o",
             messages=conversation_history,
             max_tokens=1000,
@@ -290,186 +397,107 @@ Current context: {context}""".format(context=json.dumps(context))
     except Exception as e:
         return jsonify({"success": False, "message": f"Error in chat: {str(e)}"}), 500
 
-def update_job_context(context, user_message, ai_response):
-    """Update conversation context based on user input and AI response"""
-    updated_context = context.copy()
-    
-    # Simple keyword-based context extraction from user message
-    message_lower = user_message.lower()
-    ai_lower = ai_response.lower()
-    
-    # Extract job title
-    if not updated_context.get('jobTitle'):
-        # Try to extract job title from message
-        common_titles = ['software engineer', 'data scientist', 'product manager', 'marketing manager', 
-                        'sales manager', 'developer', 'analyst', 'designer', 'coordinator', 'engineer',
-                        'manager', 'director', 'specialist', 'associate', 'lead', 'senior', 'junior',
-                        'architect', 'consultant', 'representative', 'executive', 'administrator',
-                        'technician', 'supervisor', 'officer', 'assistant']
-        
-        for title in common_titles:
-            if title in message_lower:
-                # Extract a more complete job title from the message
-                words = user_message.split()
-                for i, word in enumerate(words):
-                    if word.lower() == title:
-                        # Try to get a 2-3 word job title
-                        title_parts = []
-                        if i > 0:
-                            title_parts.append(words[i-1])
-                        title_parts.append(word)
-                        if i < len(words) - 1:
-                            title_parts.append(words[i+1])
-                        
-                        updated_context['jobTitle'] = ' '.join(title_parts).title()
-                        break
-                if updated_context.get('jobTitle'):
-                    break
-    
-    # Extract company info
-    if 'company' in message_lower or 'organization' in message_lower:
-        words = user_message.split()
-        for i, word in enumerate(words):
-            if word.lower() in ['company', 'organization', 'startup', 'corporation']:
-                if i > 0:
-                    updated_context['company'] = words[i-1]
-                break
-    
-    # Handle company overview from predefined profiles
-    if 'company overview:' in user_message.lower():
-        # Extract company overview from message
-        overview_start = user_message.lower().find('company overview:')
-        if overview_start != -1:
-            overview_text = user_message[overview_start + len('company overview:'):].strip()
-            # Extract until benefits section if present
-            benefits_start = overview_text.lower().find('our benefits include:')
-            if benefits_start != -1:
-                updated_context['companyOverview'] = overview_text[:benefits_start].strip()
-                # Extract benefits
-                benefits_text = overview_text[benefits_start + len('our benefits include:'):].strip()
-                updated_context['benefits'] = [benefits_text]
-            else:
-                updated_context['companyOverview'] = overview_text
-    
-    # Extract benefits information from user message
-    if 'benefits include:' in user_message.lower() or 'benefit' in user_message.lower():
-        benefits_start = user_message.lower().find('benefits include:')
-        if benefits_start != -1:
-            benefits_text = user_message[benefits_start + len('benefits include:'):].strip()
-            if 'benefits' not in updated_context:
-                updated_context['benefits'] = []
-            updated_context['benefits'].append(benefits_text)
-    
-    # Handle benefits updates from AI response (when user asks to change benefits)
-    if ('change' in message_lower or 'update' in message_lower or 'revise' in message_lower) and 'benefit' in message_lower:
-        # Look for updated benefits in AI response
-        import re
-        
-        # Clean the AI response to handle formatting
-        ai_clean = re.sub(r'[*\-•]', '', ai_response)  # Remove bullet points and formatting
-        ai_clean = re.sub(r'\s+', ' ', ai_clean)  # Normalize whitespace
-        
-        # Multiple patterns to find updated benefits
-        patterns = [
-            r'benefit(?:s?)\s*cuti\s*(\d+)\s*(?:hari|days?)',  # "Benefit cuti X hari"
-            r'(\d+)\s*(?:hari|days?)\s*(?:of\s*)?(?:leave|cuti)',  # "X days of leave" or "X hari cuti"
-            r'benefit(?:s?).*?(\d+)\s*(?:hari|days?)',  # "Benefits... X days"
-            r'cuti\s*(\d+)\s*(?:hari|days?)',  # "cuti X hari"
-            r'(\d+)\s*(?:hari|days?)',  # Just "X hari" or "X days"
-        ]
-        
-        benefit_match = None
-        days = None
-        
-        # Try patterns on cleaned AI response
-        for pattern in patterns:
-            benefit_match = re.search(pattern, ai_clean.lower())
-            if benefit_match:
-                days = benefit_match.group(1)
-                print(f"DEBUG: Found benefits match with pattern '{pattern}': {days} days")
-                break
-        
-        # If no pattern match, try to extract from Benefits section
-        if not days and 'benefits:' in ai_lower:
-            benefits_start = ai_response.lower().find('benefits:')
-            if benefits_start != -1:
-                # Extract the benefits section
-                benefits_section = ai_response[benefits_start:].split('\n\n')[0]  # Get until next section
-                print(f"DEBUG: Benefits section extracted: {benefits_section}")
+def sse_event(payload):
+    """Format one server-sent event"""
+    return f"data: {json.dumps(payload)}\n\n"
+
+def sse_response(events):
+    """Stream server-sent events without proxy buffering"""
+    return Response(
+        stream_with_context(events),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+def stream_job_description(context):
+    """Yield `job_description_delta` events while generating; returns the complete job description"""
+    prompt = build_job_description_prompt(context)
+    parts = []
+    for delta in stream_completion(
+        get_client(),
+        model="gpt-4o",
+        messages=[{"role": "user", "content": prompt}],
+        max_tokens=1500,
+        temperature=0.7
+    ):
+        parts.append(delta)
+        yield sse_event({"type": "job_description_delta", "content": delta})
+    return ''.join(parts).strip()
+
+@app.route('/api/job-description-chat/stream', methods=['POST'])
+def job_description_chat_stream():
+    """
+    Streamed version of /api/job-description-chat (server-sent events).
+    Emits `delta` events with response text as it is generated, `context` events whenever the
+    extracted context changes, `job_description_delta` events if a job description is generated,
+    and a final `done` event with the same fields as the non-streaming endpoint.
+    """
+    data = request.get_json()
+    message = data.get('message', '')
+    context = data.get('context', {})
+    messages = data.get('messages', [])
+    
+    if not message:
+        return jsonify({"success": False, "message": "Message is required"}), 400
+    
+    def generate():
+        try:
+            base_context, conversation_history = build_chat_conversation(message, context, messages)
+            updated_context = base_context
+            parts = []
+            
+            for delta in stream_completion(
+                get_client(),
+                model="gpt-4o",
+                messages=conversation_history,
+                max_tokens=1000,
+                temperature=0.7
+            ):
+                parts.append(delta)
+                yield sse_event({"type": "delta", "content": delta})
                 
-                # Look for days in this section
-                for pattern in patterns:
-                    section_match = re.search(pattern, benefits_section.lower())
-                    if section_match:
-                        days = section_match.group(1)
-                        print(f"DEBUG: Found days in benefits section: {days}")
-                        break
-        
-        # If we found days, update the context
-        if days:
-            new_benefits = f"Benefit cuti {days} hari, BPJS, THR, Diskon karyawan"
-            updated_context['benefits'] = [new_benefits]
-            print(f"DEBUG: Updated benefits to: {new_benefits}")
-        else:
-            print(f"DEBUG: No days found in AI response. AI response: {ai_response[:500]}...")
+                # Re-extract context on complete lines only, so patterns never see half a line
+                if '\n' in delta:
+                    text = ''.join(parts)
+                    partial_context = update_job_context(copy.deepcopy(base_context), message, text[:text.rfind('\n')])
+                    if partial_context != updated_context:
+                        updated_context = partial_context
+                        yield sse_event({"type": "context", "context": updated_context})
             
-            # Try to extract the entire benefits line if formatted properly
-            if 'benefit cutix' in ai_lower:
-                # Find lines containing "benefit cuti"
-                lines = ai_response.split('\n')
-                for line in lines:
-                    if 'benefit cuti' in line.lower():
-                        # Clean the line and use it
-                        clean_line = re.sub(r'^[*\-•\s]*', '', line).strip()
-                        if clean_line:
-                            updated_context['benefits'] = [clean_line]
-                            print(f"DEBUG: Extracted entire benefits line: {clean_line}")
-                            break
-    
-    # Also check for any benefits information in AI response (not just when user asks for changes)
-    if 'benefit' in ai_lower and 'cuti' in ai_lower:
-        import re
-        
-        # Clean the AI response to handle formatting
-        ai_clean = re.sub(r'[*\-•]', '', ai_response)  # Remove bullet points and formatting
-        ai_clean = re.sub(r'\s+', ' ', ai_clean)  # Normalize whitespace
-        
-        # Look for benefit cuti pattern
-        patterns = [
-            r'benefit(?:s?)\s*cuti\s*(\d+)\s*(?:hari|days?)',  # "Benefit cuti X hari"
-            r'cuti\s*(\d+)\s*(?:hari|days?)',  # "cuti X hari"
-        ]
+            ai_response = ''.join(parts).strip()
+            updated_context = update_job_context(copy.deepcopy(base_context), message, ai_response)
+            
+            job_description = None
+            if should_generate_job_description(updated_context, ai_response):
+                job_description = yield from stream_job_description(updated_context)
+            
+            yield sse_event({
+                "type": "done",
+                "success": True,
+                "response": ai_response,
+                "context": updated_context,
+                "jobDescription": job_description
+            })
         
-        for pattern in patterns:
-            match = re.search(pattern, ai_clean.lower())
-            if match:
-                days = match.group(1)
-                new_benefits = f"Benefit cuti {days} hari, BPJS, THR, Diskon karyawan"
-                updated_context['benefits'] = [new_benefits]
-                print(f"DEBUG: General benefits extraction - Updated to: {new_benefits}")
-                break
-    
-    # Extract experience requirements
-    if 'year' in message_lower and ('experience' in message_lower or 'exp' in message_lower):
-        import re
-        exp_match = re.search(r'(\d+)[-\s]?(?:to|-)?[\s]?(\d+)?\s*years?', message_lower)
-        if exp_match:
-            if exp_match.group(2):
-                updated_context['experience'] = f"{exp_match.group(1)}-{exp_match.group(2)} years"
-            else:
-                updated_context['experience'] = f"{exp_match.group(1)}+ years"
+        except Exception as e:
+            yield sse_event({"type": "error", "success": False, "message": f"Error in chat: {str(e)}"})
     
-    # Extract skills mentioned
-    common_skills = ['python', 'javascript', 'react', 'node.js', 'sql', 'aws', 'docker', 'kubernetes',
-                    'machine learning', 'data analysis', 'excel', 'powerbi', 'tableau', 'figma', 'photoshop']
+    return sse_response(generate())
+
+@app.route('/api/generate-job-description/stream', methods=['POST'])
+def generate_job_description_stream():
+    """Stream a complete job description for a conversation context (server-sent events)"""
+    data = request.get_json() or {}
+    context = data.get('context', {})
     
-    for skill in common_skills:
-        if skill in message_lower and skill not in updated_context.get('skills', []):
-            if 'skills' not in updated_context:
-                updated_context['skills'] = []
-            updated_context['skills'].append(skill.title())
+    def generate():
+        try:
+            job_description = yield from stream_job_description(context)
+            yield sse_event({"type": "done", "success": True, "jobDescription": job_description})
+        except Exception as e:
+            yield sse_event({"type": "error", "success": False, "message": f"Error generating job description: {str(e)}"})
     
-    return updated_context
+    return sse_response(generate())
 
 def should_generate_job_description(context, ai_response):
     """Determine if we have enough information to generate a job description"""
@@ -490,18 +518,17 @@ def should_generate_job_description(context, ai_response):
     # Generate if AI suggests it OR if we have good info and it's a comprehensive response
     return (ai_suggests_generate and has_job_title) or (has_job_title and has_some_info and is_comprehensive_response)
 
-def generate_complete_job_description(context):
-    """Generate a complete job description based on context"""
-    try:
-        # Build the prompt with available context
-        company_info = ""
-        if context.get('companyOverview'):
-            company_info += f"Company Overview: {context.get('companyOverview')}\n"
-        if context.get('benefits'):
-            benefits_text = context.get('benefits')[0] if isinstance(context.get('benefits'), list) else context.get('benefits')
-            company_info += f"Benefits: {benefits_text}\n"
-        
-        prompt = f"""Based on the following information, create a comprehensive, professional job description:
+def build_job_description_prompt(context):
+    """Build the job description generation prompt from the conversation context"""
+    # Build the prompt with available context
+    company_info = ""
+    if context.get('companyOverview'):
+        company_info += f"Company Overview: {context.get('companyOverview')}\n"
+    if context.get('benefits'):
+        benefits_text = context.get('benefits')[0] if isinstance(context.get('benefits'), list) else context.get('benefits')
+        company_info += f"Benefits: {benefits_text}\n"
+    
+    prompt = f"""Based on the following information, create a comprehensive, professional job description:
 
 Job Title: {context.get('jobTitle', 'Position')}
 Company: {context.get('company', 'Our Company')}
@@ -524,17 +551,24 @@ Create a complete job description with:
 
 Make it professional, engaging, and comprehensive. Format it properly with clear sections. If company overview is provided, use it prominently in the job description."""
 
-        # Debug logging for job description generation
-        print("\n" + "="*80)
-        print("JOB DESCRIPTION GENERATION PROMPT:")
-        print("="*80)
-        print(f"Context benefits: {context.get('benefits')}")
-        print(f"Company info section: {company_info}")
-        print("Full prompt:")
-        print(prompt)
-        print("="*80)
+    # Debug logging for job description generation
+    print("\n" + "="*80)
+    print("JOB DESCRIPTION GENERATION PROMPT:")
+    print("="*80)
+    print(f"Context benefits: {context.get('benefits')}")
+    print(f"Company info section: {company_info}")
+    print("Full prompt:")
+    print(prompt)
+    print("="*80)
+    
+    return prompt
 
-        response = client.chat.completions.create(
+def generate_complete_job_description(context):
+    """Generate a complete job description based on context"""
+    try:
+        prompt = build_job_description_prompt(context)
+        
+        response = get_client().chat.completions.create(
             model="gpt-4o",
             messages=[{"role": "user", "content": prompt}],
             max_tokens=1500,
@@ -584,13 +618,124 @@ def update_requirements():
     except Exception as e:
         return jsonify({"success": False, "message": f"Error updating requirements: {str(e)}"}), 500
 
+def resolve_requirements(requirements_id):
+    """
+    Returns (requirements, error_response) for a resume analysis request. Resumes can be
+    matched against any stored requirement set, not just the latest one.
+    """
+    if requirements_id:
+        requirements = requirements_store.get(requirements_id)
+        if requirements is None:
+            return None, (jsonify({"success": False, "message": f"Unknown requirements id: {requirements_id}"}), 404)
+    else:
+        requirements = current_requirements
+    
+    if requirements is None:
+        return None, (jsonify({"success": False, "message": "Please analyze job description first"}), 400)
+    return requirements, None
+
+def analyze_uploaded_resume(filename, file, requirements, model, required_skill_ids):
+    """
+    Extracts and analyzes one uploaded resume.
+    Returns the result entry for the response, or None if the file could not be analyzed.
+    """
+    try:
+        if file is None:
+            raise ValueError("archive member is too large or the archive could not be read")
+        
+        # Process the file
+        resume_text = process_file(file, filename)
+        
+        # Log the processed text for debugging
+        print("\n" + "="*80)
+        print(f"PROCESSED TEXT FOR AI ANALYSIS - FILE: {filename}")
+        print("="*80)
+        print(f"Text length: {len(resume_text)} characters")
+        print("First 500 characters:")
+        print(resume_text[:500])
+        print("="*80)
+        
+        # Analyze the resume (malformed responses are retried for this file only)
+        analysis = analyze_resume(resume_text, requirements, model=model)
+    except Exception as e:
+        print(f"Error processing {filename}: {str(e)}")
+        analysis = None
+    
+    if not analysis:
+        return None
+    
+    return build_result_entry(filename, analysis, required_skill_ids)
+
+def build_result_entry(filename, analysis, required_skill_ids):
+    """Builds the result entry for one analyzed resume"""
+    # Calculate percentage scores
+    quantitative_percentage = calculate_percentage(analysis['quantitative_score'])
+    semantic_percentage = analysis.get('semantic_score', 0)
+    
+    # Canonical skills shared with the JD, used for tie-breaking and search
+    skill_ids = analysis_skill_ids(analysis['analysis'])
+    skill_coverage = round(100 * len(skill_ids & required_skill_ids) / len(required_skill_ids)) if required_skill_ids else 0
+    
+    return {
+        'filename': filename,
+        'quantitative_percentage': quantitative_percentage,
+        'semantic_percentage': semantic_percentage,
+        'percentage': semantic_percentage,  # Use semantic as main percentage
+        'quantitative_score': analysis['quantitative_score'],
+        'semantic_score': analysis['semantic_score'],
+        'skill_ids': sorted(skill_ids),
+        'skill_coverage': skill_coverage,
+        'analysis': analysis['analysis']
+    }
+
+def store_results(results):
+    """
+    Sorts analyzed resumes and makes them the current results for paging and export.
+    Returns (indexed results, results version).
+    """
+    global analysis_results, results_version
+    
+    # Sort results by semantic percentage, then by canonical skill coverage (descending)
+    results.sort(key=lambda x: (x['semantic_percentage'], x['skill_coverage']), reverse=True)
+    indexed = index_results(results)
+    with results_lock:
+        analysis_results = indexed
+        results_version += 1
+        return indexed, results_version
+
+def results_page_response(indexed, version, failed_files, **extra):
+    """
+    Builds the JSON response for stored results. It carries the first page of slim list
+    entries; further pages and the full analysis of each result are fetched from /api/results.
+    """
+    page, next_cursor, total = query_results(indexed, version=version)
+    
+    message = f"Analyzed {len(indexed)} resumes successfully"
+    if failed_files:
+        message += f" ({len(failed_files)} failed and can be re-uploaded on their own)"
+    
+    return jsonify({
+        "success": True,
+        "message": message,
+        "total": total,
+        "results": [project(result, LIST_FIELDS) for result in page],
+        "next_cursor": next_cursor,
+        "results_version": version,
+        "failed_files": failed_files,
+        **extra
+    })
+
+def resume_analysis_response(results, failed_files, **extra):
+    """Stores analyzed resumes as the current results and builds the JSON response."""
+    indexed, version = store_results(results)
+    return results_page_response(indexed, version, failed_files, **extra)
+
 @app.route('/api/analyze-resumes', methods=['POST'])
 def analyze_resumes():
     """Analyze uploaded resumes against job requirements"""
-    global analysis_results
-    
-    if current_requirements is None:
-        return jsonify({"success": False, "message": "Please analyze job description first"}), 400
+    requirements, error = resolve_requirements(request.form.get('requirements_id'))
+    if error:
+        return error
     
     if 'files' not in request.files:
         return jsonify({"success": False, "message": "No files uploaded"}), 400
@@ -601,59 +746,301 @@ def analyze_resumes():
     if not files:
         return jsonify({"success": False, "message": "No files selected"}), 400
     
-    analysis_results = []
     results = []
+    failed_files = []
+    required_skill_ids = requirement_skill_ids(requirements)
     
     try:
-        for file in files:
-            if file.filename == '':
-                continue
+        for filename, file in iter_uploaded_files(files):
+            result = analyze_uploaded_resume(filename, file, requirements, model, required_skill_ids)
+            if result is None:
+                failed_files.append(filename)
+            else:
+                results.append(result)
+        
+        return resume_analysis_response(results, failed_files)
+    
+    except Exception as e:
+        return jsonify({"success": False, "message": f"Error analyzing resumes: {str(e)}"}), 500
+
+@app.route('/api/analyze-resumes/stream', methods=['POST'])
+def analyze_resumes_stream():
+    """
+    Analyze resumes while the multipart upload is still arriving. Each file part is handed
+    to a worker as soon as it has been received, so extraction and model calls overlap with
+    the rest of the upload. Form fields (model, requirements_id) must be sent before the files.
+    """
+    mimetype, options = parse_options_header(request.headers.get('Content-Type', ''))
+    boundary = options.get('boundary')
+    if mimetype != 'multipart/form-data' or not boundary:
+        return jsonify({"success": False, "message": "Expected a multipart/form-data upload"}), 400
+    
+    fields = {}
+    requirements = None
+    required_skill_ids = set()
+    futures = {}
+    results = []
+    failed_files = []
+    # Spooled file parts; closed once every worker reading them has finished
+    opened_files = []
+    
+    try:
+        with ThreadPoolExecutor(max_workers=UPLOAD_ANALYSIS_WORKERS) as executor:
+            for kind, name, value in iter_multipart_parts(request.stream, boundary.encode('latin-1'), opened_files):
+                if kind == 'field':
+                    fields[name] = value
+                    continue
+                if not name:
+                    continue
                 
-            # Process the file
-            resume_text = process_file(file)
-            
-            # Log the processed text for debugging
-            print("\n" + "="*80)
-            print(f"PROCESSED TEXT FOR AI ANALYSIS - FILE: {file.filename}")
-            print("="*80)
-            print(f"Text length: {len(resume_text)} characters")
-            print("First 500 characters:")
-            print(resume_text[:500])
-            print("="*80)
-            
-            # Analyze the resume
-            analysis = analyze_resume(resume_text, current_requirements, model=model)
+                if requirements is None:
+                    requirements, error = resolve_requirements(fields.get('requirements_id'))
+                    if error:
+                        return error
+                    required_skill_ids = requirement_skill_ids(requirements)
+                
+                upload = FileStorage(stream=value, filename=name)
+                for filename, file in iter_uploaded_files([upload]):
+                    future = executor.submit(analyze_uploaded_resume, filename, file, requirements,
+                                             fields.get('model', 'o4-mini'), required_skill_ids)
+                    futures[future] = filename
             
+            for future in as_completed(futures):
+                result = future.result()
+                if result is None:
+                    failed_files.append(futures[future])
+                else:
+                    results.append(result)
+        
+        if not futures:
+            return jsonify({"success": False, "message": "No files uploaded"}), 400
+        
+        return resume_analysis_response(results, failed_files)
+    
+    except Exception as e:
+        return jsonify({"success": False, "message": f"Error analyzing resumes: {str(e)}"}), 500
+    
+    finally:
+        close_files(opened_files)
+
+@app.route('/api/batch-jobs', methods=['POST'])
+def submit_batch_job():
+    """Submit uploaded resumes as one Batch API job (cheaper, results within 24h)"""
+    requirements, error = resolve_requirements(request.form.get('requirements_id'))
+    if error:
+        return error
+    
+    files = [file for file in request.files.getlist('files') if file.filename]
+    if not files:
+        return jsonify({"success": False, "message": "No files uploaded"}), 400
+    
+    model = request.form.get('model', 'o4-mini')
+    
+    try:
+        resumes = {}
+        failed_files = []
+        for filename, file in iter_uploaded_files(files):
+            try:
+                if file is None:
+                    raise ValueError("archive member is too large or the archive could not be read")
+                resumes[filename] = process_file(file, filename)
+            except Exception as e:
+                print(f"Error processing {filename}: {str(e)}")
+                failed_files.append(filename)
+        
+        if not resumes:
+            return jsonify({"success": False, "message": "No readable resumes uploaded", "failed_files": failed_files}), 400
+        
+        manifest = submit_resume_batch(get_batch_backend(get_client()), resumes, requirements, model=model)
+        batch_jobs[manifest['batch_id']] = {
+            "manifest": manifest,
+            "required_skill_ids": requirement_skill_ids(requirements),
+            "failed_files": failed_files,
+            "lock": threading.Lock(),
+            "import_state": None,  # None, "importing", "imported" or "failed"
+            "import_error": None,
+            "results": None,
+            "results_version": None
+        }
+        
+        return jsonify({
+            "success": True,
+            "message": f"Submitted {len(resumes)} resumes as batch {manifest['batch_id']}",
+            "batch_id": manifest['batch_id'],
+            "failed_files": failed_files
+        })
+    
+    except Exception as e:
+        return jsonify({"success": False, "message": f"Error submitting batch: {str(e)}"}), 500
+
+def import_batch_job(batch_id, job, backend):
+    """
+    Imports a completed batch in the background (one semantic-score call per resume) and
+    makes its results the current results once, instead of on every status poll.
+    """
+    try:
+        results = []
+        failed_files = list(job["failed_files"])
+        for filename, analysis in import_batch_results(backend.results(batch_id), job["manifest"]).items():
             if analysis:
-                # Calculate percentage scores
-                quantitative_percentage = calculate_percentage(analysis['quantitative_score'])
-                semantic_percentage = analysis.get('semantic_score', 0)
-                
-                # Store result
-                result = {
-                    'filename': file.filename,
-                    'quantitative_percentage': quantitative_percentage,
-                    'semantic_percentage': semantic_percentage,
-                    'percentage': semantic_percentage,  # Use semantic as main percentage
-                    'quantitative_score': analysis['quantitative_score'],
-                    'semantic_score': analysis['semantic_score'],
-                    'analysis': analysis['analysis']
-                }
-                
-                results.append(result)
-                analysis_results.append(result)
+                results.append(build_result_entry(filename, analysis, job["required_skill_ids"]))
+            else:
+                failed_files.append(filename)
+        indexed, version = store_results(results)
+        with job["lock"]:
+            job["results"], job["results_version"], job["failed_files"] = indexed, version, failed_files
+            job["import_state"] = "imported"
+    except Exception as e:
+        print(f"Error importing batch {batch_id}: {str(e)}")
+        with job["lock"]:
+            job["import_state"], job["import_error"] = "failed", str(e)
+
+@app.route('/api/batch-jobs/<batch_id>', methods=['GET'])
+def get_batch_job(batch_id):
+    """
+    Check a batch job. Once it completes its results are imported in the background and
+    become the current results (and CSV export); later polls only read them.
+    """
+    job = batch_jobs.get(batch_id)
+    if job is None:
+        return jsonify({"success": False, "message": f"Unknown batch id: {batch_id}"}), 404
+    
+    try:
+        with job["lock"]:
+            if job["import_state"] is None:
+                backend = get_batch_backend(get_client())
+                status = backend.status(batch_id)
+                if status != "completed":
+                    return jsonify({"success": status not in ("failed", "expired", "cancelled"),
+                                    "message": f"Batch {batch_id} is {status}", "status": status})
+                job["import_state"] = "importing"
+                threading.Thread(target=import_batch_job, args=(batch_id, job, backend), daemon=True).start()
+            state = job["import_state"]
         
-        # Sort results by semantic percentage (descending)
-        results.sort(key=lambda x: x['semantic_percentage'], reverse=True)
+        if state == "importing":
+            return jsonify({"success": True, "message": f"Batch {batch_id} is importing its results",
+                            "status": "importing"})
+        if state == "failed":
+            return jsonify({"success": False, "message": f"Error importing batch: {job['import_error']}",
+                            "status": "failed"}), 500
+        return results_page_response(job["results"], job["results_version"], job["failed_files"],
+                                     status="completed")
+    
+    except Exception as e:
+        return jsonify({"success": False, "message": f"Error checking batch: {str(e)}"}), 500
+
+@app.route('/api/analyze-matrix', methods=['POST'])
+def analyze_matrix():
+    """Analyze uploaded resumes against several stored requirement sets (candidates x JDs)"""
+    requirements_ids = []
+    for value in request.form.getlist('requirements_ids'):
+        requirements_ids.extend(part.strip() for part in value.split(',') if part.strip())
+    
+    if not requirements_ids:
+        return jsonify({"success": False, "message": "At least one requirements id is required"}), 400
+    
+    unknown = [requirements_id for requirements_id in requirements_ids if requirements_id not in requirements_store]
+    if unknown:
+        return jsonify({"success": False, "message": f"Unknown requirements ids: {', '.join(unknown)}"}), 404
+    
+    files = [file for file in request.files.getlist('files') if file.filename]
+    if not files:
+        return jsonify({"success": False, "message": "No files uploaded"}), 400
+    
+    model = request.form.get('model', 'o4-mini')
+    
+    try:
+        resumes = {}
+        failed_files = []
+        for filename, file in iter_uploaded_files(files):
+            try:
+                if file is None:
+                    raise ValueError("archive member is too large or the archive could not be read")
+                resumes[filename] = process_file(file, filename)
+            except Exception as e:
+                print(f"Error processing {filename}: {str(e)}")
+                failed_files.append(filename)
+        
+        requirements_by_id = {requirements_id: requirements_store[requirements_id] for requirements_id in requirements_ids}
+        matrix = fill_candidate_matrix(resumes, requirements_by_id, model=model)
+        
+        cells = []
+        for (filename, requirements_id), analysis in matrix.items():
+            if not analysis:
+                continue
+            semantic_percentage = analysis.get('semantic_score', 0)
+            cells.append({
+                'filename': filename,
+                'requirements_id': requirements_id,
+                'quantitative_percentage': calculate_percentage(analysis['quantitative_score']),
+                'semantic_percentage': semantic_percentage,
+                'percentage': semantic_percentage,
+                'quantitative_score': analysis['quantitative_score'],
+                'semantic_score': analysis['semantic_score'],
+                'analysis': analysis['analysis']
+            })
+        
+        cells.sort(key=lambda x: (x['requirements_id'], -x['semantic_percentage']))
+        missing_cells = [
+            {'filename': filename, 'requirements_id': requirements_id}
+            for (filename, requirements_id), analysis in matrix.items() if not analysis
+        ]
         
         return jsonify({
             "success": True,
-            "message": f"Analyzed {len(results)} resumes successfully",
-            "results": results
+            "message": f"Analyzed {len(cells)} of {len(matrix)} candidate/job pairs",
+            "results": cells,
+            "failed_cells": missing_cells,
+            "failed_files": failed_files
         })
     
     except Exception as e:
-        return jsonify({"success": False, "message": f"Error analyzing resumes: {str(e)}"}), 500
+        return jsonify({"success": False, "message": f"Error analyzing matrix: {str(e)}"}), 500
+
+@app.route('/api/results', methods=['GET'])
+def list_results():
+    """
+    Page through the current analysis results.
+    Query parameters: sort (semantic|quantitative), order (desc|asc), limit, cursor,
+    recommendation, min_must_have, location, and fields (comma-separated; defaults to the
+    slim list fields, add "analysis" for the full nested analysis).
+    """
+    fields = [field.strip() for field in request.args.get('fields', '').split(',') if field.strip()] or LIST_FIELDS
+    
+    try:
+        page, next_cursor, total = query_results(
+            analysis_results,
+            sort=request.args.get('sort', 'semantic'),
+            order=request.args.get('order', 'desc'),
+            limit=request.args.get('limit', DEFAULT_PAGE_SIZE, type=int),
+            cursor=request.args.get('cursor'),
+            version=results_version,
+            recommendation=request.args.get('recommendation') or None,
+            min_must_have=request.args.get('min_must_have', type=int),
+            location=request.args.get('location') or None
+        )
+    except ValueError as e:
+        return jsonify({"success": False, "message": str(e)}), 400
+    
+    return jsonify({
+        "success": True,
+        "total": total,
+        "results": [project(result, fields) for result in page],
+        "next_cursor": next_cursor,
+        "results_version": results_version
+    })
+
+@app.route('/api/results/<int:result_id>', methods=['GET'])
+def get_result(result_id):
+    """Get one analysis result, including the full nested analysis"""
+    version = request.args.get('version', type=int)
+    if version is not None and version != results_version:
+        return jsonify({"success": False, "message": "The analysis results have changed; reload the list"}), 409
+    
+    if not 0 <= result_id < len(analysis_results):
+        return jsonify({"success": False, "message": f"Unknown result id: {result_id}"}), 404
+    
+    return jsonify({"success": True, "result": analysis_results[result_id]})
 
 @app.route('/api/export-csv', methods=['GET'])
 def export_csv():
@@ -672,6 +1059,9 @@ def export_csv():
             flattened_data['percentage'] = result['semantic_percentage']
             csv_data.append(flattened_data)
         
+        # pandas is only needed here, so it is imported on the first export rather than at startup
+        import pandas as pd
+        
         # Create DataFrame and CSV
         df = pd.DataFrame(csv_data)
         
@@ -690,6 +1080,32 @@ def export_csv():
     except Exception as e:
         return jsonify({"success": False, "message": f"Error exporting CSV: {str(e)}"}), 500
 
+@app.route('/api/search-candidates', methods=['GET'])
+def search_candidates():
+    """Find analyzed candidates by skill, matching aliases through the skill taxonomy"""
+    query = request.args.get('skills', '')
+    wanted = set()
+    for term in query.split(','):
+        wanted.update(find_skills(term))
+    
+    if not wanted:
+        return jsonify({"success": False, "message": "No known skills in query"}), 400
+    
+    matches = []
+    for result in analysis_results:
+        matched = wanted & set(result.get('skill_ids', []))
+        if matched:
+            matches.append({
+                'filename': result['filename'],
+                'semantic_percentage': result['semantic_percentage'],
+                'quantitative_percentage': result['quantitative_percentage'],
+                'matched_skills': sorted(matched)
+            })
+    
+    matches.sort(key=lambda x: (len(x['matched_skills']), x['semantic_percentage']), reverse=True)
+    
+    return jsonify({"success": True, "skills": sorted(wanted), "results": matches})
+
 @app.route('/api/current-requirements', methods=['GET'])
 def get_current_requirements():
     """Get current job requirements"""
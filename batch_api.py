@@ -0,0 +1,421 @@
+import argparse
+import io
+import json
+import os
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import fcntl
+except ImportError:  # No fcntl (e.g. Windows): local batches are only guarded within one process
+    fcntl = None
+
+from batch_runner import CheckpointWriter, checkpoint_key, iter_resume_sources
+from llm_utils import (
+    ResponseParseError,
+    create_json_completion,
+    get_client,
+    json_response_format,
+    parse_json_response,
+)
+from resume_analyzer import (
+    RESUME_ANALYSIS_KEYS,
+    build_resume_analysis_messages,
+    build_resume_analysis_schema,
+    finalize_resume_analysis,
+    format_requirements_for_prompt,
+)
+from text_extraction import extract_text
+
+# Endpoint and completion window used for batch submissions
+BATCH_ENDPOINT = "/v1/chat/completions"
+BATCH_COMPLETION_WINDOW = "24h"
+
+# Batch states after which no more polling is needed
+BATCH_FINAL_STATES = ("completed", "failed", "expired", "cancelled")
+
+# Seconds between status checks while waiting for a batch
+DEFAULT_POLL_INTERVAL = 60
+
+# Where the local stand-in backend keeps its input and output files
+LOCAL_BATCH_DIR = os.getenv("LOCAL_BATCH_DIR", os.path.join(tempfile.gettempdir(), "resume-analyzer-batches"))
+
+# Response format used when a model rejects the strict resume analysis schema
+FALLBACK_RESPONSE_FORMAT = {"type": "json_object"}
+
+# Local batches being run by this process. Kept at module level since the web backend
+# creates a new LocalBatchBackend per request, and every status poll of an unfinished
+# batch would otherwise start another run of it.
+_running_local_batches = set()
+_running_local_batches_lock = threading.Lock()
+
+
+def build_batch_requests(resumes, requirements, model="o4-mini"):
+    """
+    Builds one Batch API request per resume, using the same prompt and response format
+    as analyze_resume. Returns (requests, filenames_by_custom_id).
+
+    Args:
+        resumes (dict): Resume texts keyed by file name
+        requirements (dict): Requirements from the JD analyzer
+        model (str): The OpenAI model to use for analysis
+    """
+    requirements_str = format_requirements_for_prompt(requirements)
+    response_format = json_response_format(
+        model, "resume_analysis", build_resume_analysis_schema(requirements), fallback=FALLBACK_RESPONSE_FORMAT
+    )
+
+    requests = []
+    filenames = {}
+    for index, (filename, resume_text) in enumerate(resumes.items()):
+        custom_id = f"resume-{index}"
+        filenames[custom_id] = filename
+        requests.append({
+            "custom_id": custom_id,
+            "method": "POST",
+            "url": BATCH_ENDPOINT,
+            "body": {
+                "model": model,
+                "messages": build_resume_analysis_messages(resume_text, requirements_str),
+                "response_format": response_format,
+                "reasoning_effort": "high",
+                "store": False
+            }
+        })
+    return requests, filenames
+
+
+def requests_to_jsonl(requests):
+    """Serializes batch requests as JSONL bytes."""
+    return "".join(json.dumps(request) + "\n" for request in requests).encode("utf-8")
+
+
+def run_batch_request(client, request):
+    """
+    Runs one batch request synchronously and returns its Batch API output record.
+    As in analyze_resume, a rejected strict schema is retried with FALLBACK_RESPONSE_FORMAT.
+
+    Args:
+        client: The OpenAI client
+        request (dict): A request built by build_batch_requests
+    """
+    body = dict(request["body"])
+    response_format = body.pop("response_format", None)
+    try:
+        response = create_json_completion(client, response_format=response_format,
+                                          fallback_format=FALLBACK_RESPONSE_FORMAT, **body)
+        response_body = response.model_dump() if hasattr(response, "model_dump") else {
+            "choices": [{"message": {"content": response.choices[0].message.content},
+                         "finish_reason": response.choices[0].finish_reason}]
+        }
+        return {"custom_id": request["custom_id"], "response": {"status_code": 200, "body": response_body},
+                "error": None}
+    except Exception as e:
+        return {"custom_id": request["custom_id"], "response": None, "error": {"message": str(e)}}
+
+
+def is_rejected_schema_request(record, request):
+    """Whether a batch output record is a 400 for a request that used a strict JSON schema."""
+    response = record.get("response") or {}
+    response_format = request["body"].get("response_format") or {}
+    return response.get("status_code") == 400 and response_format.get("type") == "json_schema"
+
+
+class OpenAIBatchBackend:
+    """Submits batches to the OpenAI Batch API (about half the cost, results within 24h)."""
+
+    def __init__(self, client):
+        self.client = client
+
+    def submit(self, jsonl_bytes):
+        input_file = self.client.files.create(file=("resume_batch.jsonl", jsonl_bytes), purpose="batch")
+        batch = self.client.batches.create(
+            input_file_id=input_file.id,
+            endpoint=BATCH_ENDPOINT,
+            completion_window=BATCH_COMPLETION_WINDOW
+        )
+        return batch.id
+
+    def status(self, batch_id):
+        return self.client.batches.retrieve(batch_id).status
+
+    def results(self, batch_id):
+        """Returns the output records of a finished batch (including per-request errors)."""
+        batch = self.client.batches.retrieve(batch_id)
+        records = []
+        for file_id in (batch.output_file_id, batch.error_file_id):
+            if file_id:
+                content = self.client.files.content(file_id).text
+                records.extend(json.loads(line) for line in content.splitlines() if line.strip())
+        return self._retry_rejected_schemas(batch, records)
+
+    def _retry_rejected_schemas(self, batch, records):
+        """
+        The Batch API has no fallback for a rejected strict schema, so those requests come
+        back as 400s. They are rerun synchronously with the fallback format, like the sync path.
+        """
+        if not any((record.get("response") or {}).get("status_code") == 400 for record in records):
+            return records
+        content = self.client.files.content(batch.input_file_id).text
+        requests = {request["custom_id"]: request
+                    for request in (json.loads(line) for line in content.splitlines() if line.strip())}
+        retried = []
+        for record in records:
+            request = requests.get(record.get("custom_id"))
+            if request is not None and is_rejected_schema_request(record, request):
+                print(f"Schema rejected for batch request {request['custom_id']}, rerunning it without the schema")
+                record = run_batch_request(self.client, request)
+            retried.append(record)
+        return retried
+
+
+class LocalBatchBackend:
+    """
+    Stand-in for the Batch API for development and tests. Requests are run in a background
+    thread through a regular client and results are written in the Batch API output format,
+    so the same submit/poll/import flow can be exercised without waiting hours.
+
+    Each batch is run at most once at a time: within a process through _running_local_batches,
+    and across processes (e.g. several gunicorn workers) through a lock file per batch.
+    """
+
+    def __init__(self, client, storage_dir=LOCAL_BATCH_DIR, max_workers=4):
+        self.client = client
+        self.storage_dir = storage_dir
+        self.max_workers = max_workers
+
+    def _path(self, batch_id, suffix):
+        return os.path.join(self.storage_dir, f"{batch_id}.{suffix}")
+
+    def submit(self, jsonl_bytes):
+        os.makedirs(self.storage_dir, exist_ok=True)
+        batch_id = f"local_batch_{uuid.uuid4().hex[:12]}"
+        with open(self._path(batch_id, "input.jsonl"), "wb") as f:
+            f.write(jsonl_bytes)
+        self._start(batch_id)
+        return batch_id
+
+    def _start(self, batch_id):
+        run_key = self._path(batch_id, "input.jsonl")
+        with _running_local_batches_lock:
+            if run_key in _running_local_batches:
+                return
+            _running_local_batches.add(run_key)
+        threading.Thread(target=self._run, args=(batch_id, run_key), daemon=True).start()
+
+    def _run_request(self, request):
+        return run_batch_request(self.client, request)
+
+    def _run(self, batch_id, run_key):
+        lock_file = None
+        try:
+            if fcntl is not None:
+                lock_file = open(self._path(batch_id, "lock"), "a")
+                try:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    # Another process is running this batch
+                    return
+            if os.path.exists(self._path(batch_id, "output.jsonl")):
+                # Finished by another process while this one was starting
+                return
+
+            with open(self._path(batch_id, "input.jsonl"), encoding="utf-8") as f:
+                requests = [json.loads(line) for line in f if line.strip()]
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                records = list(executor.map(self._run_request, requests))
+            temp_path = self._path(batch_id, f"output.jsonl.{os.getpid()}.tmp")
+            with open(temp_path, "w", encoding="utf-8") as f:
+                f.writelines(json.dumps(record) + "\n" for record in records)
+            os.replace(temp_path, self._path(batch_id, "output.jsonl"))
+        except Exception as e:
+            print(f"Error running local batch {batch_id}: {str(e)}")
+            # Recorded so that polling reports the failure instead of starting the batch again
+            with open(self._path(batch_id, "error.txt"), "w", encoding="utf-8") as f:
+                f.write(str(e))
+        finally:
+            if lock_file is not None:
+                lock_file.close()
+            with _running_local_batches_lock:
+                _running_local_batches.discard(run_key)
+
+    def status(self, batch_id):
+        if os.path.exists(self._path(batch_id, "output.jsonl")):
+            return "completed"
+        if os.path.exists(self._path(batch_id, "error.txt")):
+            return "failed"
+        if os.path.exists(self._path(batch_id, "input.jsonl")):
+            # A batch submitted by a process that has since exited is picked up here
+            self._start(batch_id)
+            return "in_progress"
+        return "failed"
+
+    def results(self, batch_id):
+        with open(self._path(batch_id, "output.jsonl"), encoding="utf-8") as f:
+            return [json.loads(line) for line in f if line.strip()]
+
+
+def get_batch_backend(client, name=None):
+    """Returns the backend named by `name` or the BATCH_BACKEND env var ("openai" or "local")."""
+    name = (name or os.getenv("BATCH_BACKEND", "openai")).lower()
+    if name == "local":
+        return LocalBatchBackend(client)
+    return OpenAIBatchBackend(client)
+
+
+def submit_resume_batch(backend, resumes, requirements, model="o4-mini"):
+    """
+    Submits a batch of resume analyses and returns its manifest, which records everything
+    needed to import the results later (batch id, model and file name of each request).
+    """
+    requests, filenames = build_batch_requests(resumes, requirements, model)
+    batch_id = backend.submit(requests_to_jsonl(requests))
+    print(f"Submitted batch {batch_id} with {len(requests)} resume analyses")
+    return {
+        "batch_id": batch_id,
+        "model": model,
+        "submitted_at": time.strftime('%Y-%m-%dT%H:%M:%S'),
+        "filenames": filenames
+    }
+
+
+def wait_for_batch(backend, batch_id, poll_interval=DEFAULT_POLL_INTERVAL, timeout=None):
+    """Polls a batch until it reaches a final state (or the timeout passes) and returns its status."""
+    started = time.monotonic()
+    while True:
+        status = backend.status(batch_id)
+        if status in BATCH_FINAL_STATES:
+            return status
+        if timeout is not None and time.monotonic() - started >= timeout:
+            return status
+        print(f"Batch {batch_id} is {status}, checking again in {poll_interval}s")
+        time.sleep(poll_interval)
+
+
+def import_batch_results(records, manifest):
+    """
+    Turns Batch API output records into analyze_resume-style results.
+    Returns a dictionary mapping each file name to its result, or None if its request failed.
+    The semantic score is still computed per resume when results are imported.
+    """
+    results = {filename: None for filename in manifest["filenames"].values()}
+    for record in records:
+        filename = manifest["filenames"].get(record.get("custom_id"))
+        if filename is None:
+            continue
+        response = record.get("response") or {}
+        if record.get("error") or response.get("status_code") != 200:
+            print(f"Batch request for {filename} failed: {record.get('error') or response.get('status_code')}")
+            continue
+        try:
+            content = response["body"]["choices"][0]["message"]["content"]
+            analysis = parse_json_response(content, RESUME_ANALYSIS_KEYS)
+            results[filename] = finalize_resume_analysis(analysis)
+        except (KeyError, IndexError, TypeError, ResponseParseError) as e:
+            print(f"Invalid batch response for {filename}: {str(e)}")
+    return results
+
+
+def load_resume_texts(path):
+    """
+    Extracts the text of every resume in a directory or archive.
+    Returns (resumes, checkpoint_keys), both keyed by file name.
+    """
+    resumes = {}
+    checkpoint_keys = {}
+    for name, content in iter_resume_sources(path):
+        if content is None:
+            continue
+        try:
+            resume_text = extract_text(io.BytesIO(content), name)
+            if not resume_text.strip():
+                raise ValueError("no text could be extracted")
+            resumes[name] = resume_text
+            checkpoint_keys[name] = checkpoint_key(name, content)
+        except Exception as e:
+            print(f"Error processing {name}: {str(e)}")
+    return resumes, checkpoint_keys
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Screen resumes offline through the OpenAI Batch API")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    submit_parser = subparsers.add_parser("submit", help="Submit a batch and write its manifest")
+    submit_parser.add_argument("requirements", help="Requirements JSON produced by the JD analyzer")
+    submit_parser.add_argument("resumes", help="Directory, zip/tar archive or single resume file")
+    submit_parser.add_argument("--manifest", default="batch_manifest.json", help="Where to write the batch manifest")
+    submit_parser.add_argument("--model", default="o4-mini", help="OpenAI model used for resume analysis")
+
+    collect_parser = subparsers.add_parser("collect", help="Wait for a batch and import its results")
+    collect_parser.add_argument("--manifest", default="batch_manifest.json", help="Manifest written by submit")
+    collect_parser.add_argument("--checkpoint", default="analysis_results.jsonl",
+                                help="JSONL results file (same format as batch_runner.py)")
+    collect_parser.add_argument("--poll-interval", type=int, default=DEFAULT_POLL_INTERVAL)
+    collect_parser.add_argument("--no-wait", action="store_true", help="Only check the status once")
+
+    for subparser in (submit_parser, collect_parser):
+        subparser.add_argument("--backend", choices=("openai", "local"), default=None,
+                               help="Batch backend (default: BATCH_BACKEND env var or openai)")
+    args = parser.parse_args()
+
+    backend = get_batch_backend(get_client(), args.backend)
+
+    if args.command == "submit":
+        with open(args.requirements, encoding='utf-8') as f:
+            requirements = json.load(f)
+        try:
+            resumes, checkpoint_keys = load_resume_texts(args.resumes)
+        except ValueError as e:
+            print(f"Error: {str(e)}")
+            return 1
+        if not resumes:
+            print(f"No resumes found in {args.resumes}")
+            return 1
+        manifest = submit_resume_batch(backend, resumes, requirements, model=args.model)
+        # Lets batch_runner.py skip these files when resuming from the same checkpoint
+        manifest["checkpoint_keys"] = checkpoint_keys
+        with open(args.manifest, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2)
+        print(f"Manifest written to {args.manifest}")
+        return 0
+
+    with open(args.manifest, encoding='utf-8') as f:
+        manifest = json.load(f)
+    status = wait_for_batch(backend, manifest["batch_id"], args.poll_interval,
+                            timeout=0 if args.no_wait else None)
+    if status != "completed":
+        print(f"Batch {manifest['batch_id']} is {status}")
+        return 0 if status not in BATCH_FINAL_STATES else 1
+
+    results = import_batch_results(backend.results(manifest["batch_id"]), manifest)
+    writer = CheckpointWriter(args.checkpoint)
+    try:
+        for filename, analysis in results.items():
+            record = {'key': manifest.get("checkpoint_keys", {}).get(filename, filename), 'filename': filename,
+                      'batch_id': manifest["batch_id"], 'finished_at': time.strftime('%Y-%m-%dT%H:%M:%S')}
+            if analysis:
+                record.update({
+                    'status': 'ok',
+                    'quantitative_score': analysis['quantitative_score'],
+                    'semantic_score': analysis['semantic_score'],
+                    'analysis': analysis['analysis']
+                })
+            else:
+                record['status'] = 'failed'
+            writer.write(record)
+    finally:
+        writer.close()
+
+    failed = [filename for filename, analysis in results.items() if not analysis]
+    print(f"Imported {len(results) - len(failed)} results into {args.checkpoint}")
+    if failed:
+        print(f"Failed: {', '.join(failed)}")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
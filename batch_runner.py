@@ -0,0 +1,219 @@
+import argparse
+import hashlib
+import io
+import json
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from resume_analyzer import analyze_resume
+from text_extraction import SUPPORTED_EXTENSIONS, extract_text, is_archive, iter_archive_members
+
+# Default number of resumes processed at the same time
+DEFAULT_MAX_WORKERS = 4
+
+# Resumes submitted per worker before waiting for one to finish. Sources are read lazily,
+# so at most this many resumes per worker are held in memory at once.
+IN_FLIGHT_PER_WORKER = 2
+
+
+def iter_resume_sources(path):
+    """
+    Yields (name, content) pairs for every supported resume in a directory (searched
+    recursively), a zip/tar archive or a single resume file. Archive members are decompressed
+    one at a time; `content` is None for members over the archive size limit.
+    Raises ValueError if the path does not exist or is not a supported resume or archive.
+    """
+    if os.path.isfile(path):
+        if is_archive(path):
+            with open(path, 'rb') as archive_file:
+                yield from iter_archive_members(archive_file, path)
+            return
+        if not path.lower().endswith(SUPPORTED_EXTENSIONS):
+            raise ValueError(f"{path} is not a supported resume ({', '.join(SUPPORTED_EXTENSIONS)}) or archive")
+        with open(path, 'rb') as f:
+            yield os.path.basename(path), f.read()
+        return
+    if not os.path.isdir(path):
+        raise ValueError(f"{path} does not exist")
+
+    for root, _, files in sorted(os.walk(path)):
+        for filename in sorted(files):
+            if not filename.lower().endswith(SUPPORTED_EXTENSIONS):
+                continue
+            full_path = os.path.join(root, filename)
+            with open(full_path, 'rb') as f:
+                yield os.path.relpath(full_path, path), f.read()
+
+
+def checkpoint_key(name, content):
+    """Identifies a resume by name and content, so edited files are analyzed again."""
+    return f"{name}:{hashlib.sha256(content).hexdigest()[:16]}"
+
+
+def load_checkpoint(checkpoint_path):
+    """Returns the keys of resumes already analyzed successfully in a JSONL checkpoint."""
+    finished = set()
+    if not os.path.exists(checkpoint_path):
+        return finished
+    with open(checkpoint_path, encoding='utf-8') as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                # A torn last line from a crash (CheckpointWriter removes it before appending);
+                # the resume it belonged to is analyzed again
+                continue
+            if record.get('status') == 'ok':
+                finished.add(record['key'])
+    return finished
+
+
+def truncate_torn_line(checkpoint_path, chunk_size=4096):
+    """
+    Cuts a checkpoint back to its last complete line. A crash can leave a half-written
+    last record without a newline, and appending after it would merge the next record
+    into that unparseable line.
+    """
+    if not os.path.exists(checkpoint_path):
+        return
+    with open(checkpoint_path, 'r+b') as f:
+        end = f.seek(0, os.SEEK_END)
+        position = end
+        while position > 0:
+            start = max(0, position - chunk_size)
+            f.seek(start)
+            chunk = f.read(position - start)
+            newline = chunk.rfind(b"\n")
+            if newline != -1:
+                position = start + newline + 1
+                break
+            position = start
+        if position != end:
+            print(f"Removing a torn last line from {checkpoint_path}")
+            f.truncate(position)
+
+
+class CheckpointWriter:
+    """Appends one JSON record per line and flushes it to disk before returning."""
+
+    def __init__(self, checkpoint_path):
+        truncate_torn_line(checkpoint_path)
+        self._file = open(checkpoint_path, 'a', encoding='utf-8')
+        self._lock = threading.Lock()
+
+    def write(self, record):
+        line = json.dumps(record) + "\n"
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def close(self):
+        self._file.close()
+
+
+def analyze_source(name, content, requirements, model):
+    """Extracts and analyzes one resume, returning its checkpoint record."""
+    record = {
+        'key': checkpoint_key(name, content),
+        'filename': name,
+        'finished_at': None
+    }
+    try:
+        resume_text = extract_text(io.BytesIO(content), name)
+        if not resume_text.strip():
+            raise ValueError("no text could be extracted")
+        analysis = analyze_resume(resume_text, requirements, model=model)
+    except Exception as e:
+        print(f"Error processing {name}: {str(e)}")
+        analysis = None
+
+    if analysis:
+        record.update({
+            'status': 'ok',
+            'quantitative_score': analysis['quantitative_score'],
+            'semantic_score': analysis['semantic_score'],
+            'analysis': analysis['analysis']
+        })
+    else:
+        record['status'] = 'failed'
+    record['finished_at'] = time.strftime('%Y-%m-%dT%H:%M:%S')
+    return record
+
+
+def run_batch(requirements, source_path, checkpoint_path, model="o4-mini", max_workers=DEFAULT_MAX_WORKERS):
+    """
+    Analyzes every resume under `source_path` that is not yet marked as done in the
+    checkpoint, appending one record per resume as soon as it finishes. Resumes are read
+    from the source only as workers free up, so large archives are never held in memory.
+    Returns a (done, failed, skipped) tuple of counts.
+    """
+    finished = load_checkpoint(checkpoint_path)
+    writer = CheckpointWriter(checkpoint_path)
+    done = failed = skipped = 0
+    max_in_flight = max_workers * IN_FLIGHT_PER_WORKER
+
+    def record_finished(futures):
+        nonlocal done, failed
+        for future in futures:
+            record = future.result()
+            writer.write(record)
+            if record['status'] == 'ok':
+                done += 1
+            else:
+                failed += 1
+            print(f"[{done + failed}] {record['filename']}: {record['status']}")
+
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            in_flight = set()
+            for name, content in iter_resume_sources(source_path):
+                if content is None:
+                    writer.write({'key': name, 'filename': name, 'status': 'failed',
+                                  'error': 'larger than the archive member size limit',
+                                  'finished_at': time.strftime('%Y-%m-%dT%H:%M:%S')})
+                    failed += 1
+                    continue
+                if checkpoint_key(name, content) in finished:
+                    skipped += 1
+                    continue
+                if len(in_flight) >= max_in_flight:
+                    completed, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                    record_finished(completed)
+                in_flight.add(executor.submit(analyze_source, name, content, requirements, model))
+
+            record_finished(wait(in_flight).done)
+            print(f"Skipped {skipped} resumes already in the checkpoint")
+    finally:
+        writer.close()
+
+    return done, failed, skipped
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Analyze a directory or archive of resumes against a requirements JSON")
+    parser.add_argument("requirements", help="Requirements JSON produced by the JD analyzer")
+    parser.add_argument("resumes", help="Directory, zip/tar archive or single file of PDF/DOCX/TXT resumes")
+    parser.add_argument("--checkpoint", default="analysis_results.jsonl",
+                        help="JSONL file results are appended to; finished files are skipped on restart")
+    parser.add_argument("--model", default="o4-mini", help="OpenAI model used for resume analysis")
+    parser.add_argument("--workers", type=int, default=DEFAULT_MAX_WORKERS, help="Concurrent analyses")
+    args = parser.parse_args()
+
+    with open(args.requirements, encoding='utf-8') as f:
+        requirements = json.load(f)
+
+    try:
+        done, failed, skipped = run_batch(requirements, args.resumes, args.checkpoint,
+                                          model=args.model, max_workers=args.workers)
+    except ValueError as e:
+        print(f"Error: {str(e)}")
+        return 1
+    print(f"Finished: {done} analyzed, {failed} failed, {skipped} skipped. Results in {args.checkpoint}")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,108 @@
+"""
+Compares the streaming DOCX extractor (text_extraction.extract_text_from_docx) with the
+previous python-docx path on generated resumes of increasing size. Each measurement runs
+in a fresh interpreter so peak memory (the RSS high-water mark) is attributable to one extraction.
+
+Usage:
+    python benchmarks/docx_benchmark.py [--sizes 200 2000 20000] [--runs 3]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+EXTRACT_SCRIPT = """
+import resource, sys, time
+sys.path.insert(0, {repo_root!r})
+import docx
+from text_extraction import extract_text_from_docx
+
+def python_docx(path):
+    # The extractor before streaming: paragraphs only, tables are skipped
+    doc = docx.Document(path)
+    text = ""
+    for paragraph in doc.paragraphs:
+        text += paragraph.text + "\\n"
+    return text
+
+def peak_rss_kb():
+    # VmHWM is the resident-set high-water mark; ru_maxrss is used where /proc is missing
+    try:
+        with open("/proc/self/status") as status:
+            for line in status:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+extractors = {{"python-docx": python_docx, "streaming": extract_text_from_docx}}
+extractor = extractors[{name!r}]
+baseline = peak_rss_kb()
+start = time.perf_counter()
+text = extractor({path!r})
+elapsed = time.perf_counter() - start
+peak = peak_rss_kb()
+print(elapsed, peak - baseline, len(text))
+"""
+
+
+def build_fixture(path, paragraphs):
+    """Writes a resume-like DOCX with `paragraphs` paragraphs and a skills table every 50."""
+    import docx
+
+    document = docx.Document()
+    document.add_heading("Jane Doe", 0)
+    for i in range(paragraphs):
+        document.add_paragraph(
+            f"Project {i}: led the migration of a billing service to Python and PostgreSQL, "
+            f"cutting batch run time by {i % 90 + 10}% and on-call pages by half."
+        )
+        if i % 50 == 0:
+            table = document.add_table(rows=3, cols=2)
+            for row, (label, skills) in enumerate((("Languages", "Python, Go, SQL"),
+                                                    ("Tools", "Docker, Kubernetes, Terraform"),
+                                                    ("Cloud", "AWS, GCP"))):
+                table.cell(row, 0).text = label
+                table.cell(row, 1).text = skills
+    document.save(path)
+
+
+def measure(name, path, runs):
+    """Returns (median seconds, median extra max RSS in KB, characters extracted)."""
+    samples = []
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, "-c", EXTRACT_SCRIPT.format(repo_root=REPO_ROOT, name=name, path=path)],
+            capture_output=True, text=True, check=True
+        )
+        elapsed, rss, chars = result.stdout.split()
+        samples.append((float(elapsed), int(rss), int(chars)))
+    return (statistics.median(s[0] for s in samples), statistics.median(s[1] for s in samples), samples[0][2])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark DOCX text extraction")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[200, 2000, 20000],
+                        help="Paragraph counts of the generated documents")
+    parser.add_argument("--runs", type=int, default=3, help="Runs per extractor and size")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        print(f"{'paragraphs':>10} {'file KB':>8} {'extractor':>12} {'time ms':>9} {'extra RSS MB':>13} {'chars':>9}")
+        for size in args.sizes:
+            path = os.path.join(tmp_dir, f"resume_{size}.docx")
+            build_fixture(path, size)
+            file_kb = os.path.getsize(path) // 1024
+            for name in ("python-docx", "streaming"):
+                elapsed, rss_kb, chars = measure(name, path, args.runs)
+                print(f"{size:>10} {file_kb:>8} {name:>12} {elapsed * 1000:>9.1f} {rss_kb / 1024:>13.1f} {chars:>9}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
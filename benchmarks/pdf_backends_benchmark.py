@@ -0,0 +1,107 @@
+"""
+Compares the PDF text backends in text_extraction (PDFium, PyPDF2, pdfminer) on a
+fixture corpus: generated CVs with known text (one and two columns, plain and deflated
+content streams) plus, optionally, a directory of real PDFs. Reports pages per second
+and extraction quality for each installed backend, and what "auto" selection returns.
+
+Quality is measured against the known text of the generated fixtures:
+    words  - share of the expected words found in the output (as a multiset)
+    lines  - share of the expected lines found intact, as whole lines of the output
+Real PDFs have no known text, so only non-space characters per page are reported.
+
+Usage:
+    python benchmarks/pdf_backends_benchmark.py [--corpus DIR] [--runs 3]
+"""
+import argparse
+import collections
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pdf_benchmark import build_pdf, cv_lines
+from text_extraction import PDF_BACKENDS, choose_pdf_backends, normalize_extracted_text
+
+# (name, pages, columns, compress)
+FIXTURES = (
+    ("cv-2p", 2, 1, False),
+    ("cv-10p-deflate", 10, 1, True),
+    ("cv-4p-2col", 4, 2, False),
+    ("cv-40p-deflate", 40, 1, True),
+)
+
+
+def build_corpus(tmp_dir):
+    """Writes the generated fixtures; returns [(name, path, expected lines or None)]."""
+    corpus = []
+    for name, pages, columns, compress in FIXTURES:
+        lines = cv_lines(pages * columns)
+        path = os.path.join(tmp_dir, f"{name}.pdf")
+        build_pdf(path, lines, columns=columns, compress=compress)
+        corpus.append((name, path, [line for line in lines if line]))
+    return corpus
+
+
+def quality(text, expected_lines):
+    """Returns (word recall, line recall) of the extracted text against the known lines."""
+    expected_words = collections.Counter(word for line in expected_lines for word in line.split())
+    found_words = collections.Counter(text.split())
+    word_recall = sum((expected_words & found_words).values()) / sum(expected_words.values())
+    output_lines = set(text.splitlines())
+    line_recall = sum(1 for line in expected_lines if line in output_lines) / len(expected_lines)
+    return word_recall, line_recall
+
+
+def measure(backend, pdf_bytes, runs):
+    """Returns (median seconds for all pages, page count, normalized text)."""
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        pages = list(backend.iter_pages(pdf_bytes))
+        times.append(time.perf_counter() - start)
+    return statistics.median(times), len(pages), normalize_extracted_text('\n\n'.join(pages))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare PDF text backends")
+    parser.add_argument("--corpus", help="Directory of additional PDFs to include")
+    parser.add_argument("--runs", type=int, default=3, help="Runs per backend and file")
+    args = parser.parse_args()
+
+    installed = [backend for backend in PDF_BACKENDS.values() if backend.available()]
+    missing = [f"{backend.name} ({backend.module})" for backend in PDF_BACKENDS.values() if not backend.available()]
+    print(f"Installed backends: {', '.join(backend.name for backend in installed)}")
+    if missing:
+        print(f"Not installed, skipped: {', '.join(missing)}")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        corpus = build_corpus(tmp_dir)
+        if args.corpus:
+            corpus += [(name, os.path.join(args.corpus, name), None)
+                       for name in sorted(os.listdir(args.corpus)) if name.lower().endswith('.pdf')]
+
+        print(f"\n{'file':<24} {'backend':>9} {'pages':>6} {'pages/s':>9} {'words':>7} {'lines':>7} {'chars/page':>11}")
+        for name, path, expected_lines in corpus:
+            with open(path, 'rb') as f:
+                pdf_bytes = f.read()
+            for backend in installed:
+                try:
+                    elapsed, page_count, text = measure(backend, pdf_bytes, args.runs)
+                except Exception as e:
+                    print(f"{name:<24} {backend.name:>9}  failed: {str(e)}")
+                    continue
+                words, lines = quality(text, expected_lines) if expected_lines else (None, None)
+                print(f"{name:<24} {backend.name:>9} {page_count:>6} {page_count / elapsed:>9.1f} "
+                      f"{'-' if words is None else f'{words:.1%}':>7} {'-' if lines is None else f'{lines:.1%}':>7} "
+                      f"{len(''.join(text.split())) / max(page_count, 1):>11.0f}")
+            order = ', '.join(backend.name for backend in choose_pdf_backends(pdf_bytes))
+            print(f"{name:<24} {'auto':>9} tries: {order}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,156 @@
+"""
+Benchmarks PDF text extraction (text_extraction.extract_text_from_pdf) on generated
+academic-style CVs: a few pages of experience followed by a long publication list.
+Compares the previous extractor (every page, serially, whitespace collapsed) with the
+current one under its character budget, serially and with page-parallel workers.
+Each measurement runs in a fresh interpreter.
+
+Usage:
+    python benchmarks/pdf_benchmark.py [--pages 2 10 40] [--runs 3] [--workers 4]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import zlib
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+LINES_PER_PAGE = 48
+
+EXTRACT_SCRIPT = """
+import sys, time
+sys.path.insert(0, {repo_root!r})
+import PyPDF2
+import text_extraction
+
+def previous(path):
+    # The extractor before page-parallel extraction: all pages, whitespace collapsed
+    text = ""
+    for page in PyPDF2.PdfReader(path).pages:
+        text += page.extract_text()
+    return ' '.join(text.split())
+
+extractors = {{
+    "previous": previous,
+    "budget": text_extraction.extract_text_from_pdf,
+    "no-budget": lambda path: text_extraction.extract_text_from_pdf(path, max_chars=0),
+}}
+extractor = extractors[{name!r}]
+start = time.perf_counter()
+with open({path!r}, 'rb') as pdf_file:
+    text = extractor(pdf_file)
+elapsed = time.perf_counter() - start
+print(elapsed, len(text), text.count("\\n"))
+"""
+
+
+def _escape(line):
+    return line.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+
+
+def cv_lines(pages):
+    """Returns the text lines of a CV filling `pages` pages: sections first, publications after."""
+    lines = ["Dr. Jane Doe", "Cambridge, UK | jane.doe@example.org", "",
+             "EXPERIENCE"]
+    for i in range(20):
+        lines.append(f"Research Engineer {i}, Example Lab ({2000 + i}-{2001 + i}): built Python and "
+                     f"PostgreSQL pipelines for {i + 3} teams.")
+    lines += ["", "SKILLS", "Python, C++, SQL, PyTorch, Kubernetes, AWS", "", "PUBLICATIONS"]
+    i = 0
+    while len(lines) < pages * LINES_PER_PAGE:
+        lines.append(f"[{i + 1}] J. Doe et al. On scalable methods for problem {i}. "
+                     f"Proceedings of Example Conference, {1990 + i % 35}.")
+        i += 1
+    return lines[:pages * LINES_PER_PAGE]
+
+
+def build_pdf(path, lines, columns=1, compress=False):
+    """
+    Writes a minimal text PDF (Helvetica 9pt, LINES_PER_PAGE lines per column). With
+    columns=2 each page holds two columns side by side; compress=True deflates the
+    content streams, as most real PDFs do.
+    """
+    per_page = LINES_PER_PAGE * columns
+    page_lines = [lines[i:i + per_page] for i in range(0, len(lines), per_page)]
+    page_count = len(page_lines)
+    # Objects: 1 catalog, 2 page tree, 3 font, then a page and a content stream per page
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        ("<< /Type /Pages /Count %d /Kids [%s] >>" % (
+            page_count, ' '.join(f"{4 + 2 * i} 0 R" for i in range(page_count)))).encode(),
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    for i, chunk in enumerate(page_lines):
+        content = ""
+        for column in range(columns):
+            column_lines = chunk[column * LINES_PER_PAGE:(column + 1) * LINES_PER_PAGE]
+            content += (f"BT /F1 9 Tf 11 TL {40 + 280 * column} 800 Td "
+                        + ' '.join(f"({_escape(line)}) Tj T*" for line in column_lines) + " ET ")
+        content = content.encode('latin-1')
+        stream_dict = b"/Length %d" % len(content)
+        if compress:
+            content = zlib.compress(content)
+            stream_dict = b"/Length %d /Filter /FlateDecode" % len(content)
+        objects.append(("<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+                        "/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % (5 + 2 * i)).encode())
+        objects.append(b"<< " + stream_dict + b" >>\nstream\n" + content + b"\nendstream")
+
+    output = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(output))
+        output += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref = len(output)
+    output += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    output += b''.join(b"%010d 00000 n \n" % offset for offset in offsets)
+    output += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    with open(path, 'wb') as f:
+        f.write(output)
+
+
+def measure(name, path, runs, workers):
+    """Returns (median seconds, characters extracted, line breaks kept)."""
+    env = dict(os.environ, PDF_EXTRACTION_WORKERS=str(workers))
+    samples = []
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, "-c", EXTRACT_SCRIPT.format(repo_root=REPO_ROOT, name=name, path=path)],
+            env=env, capture_output=True, text=True, check=True
+        )
+        elapsed, chars, newlines = result.stdout.strip().splitlines()[-1].split()
+        samples.append((float(elapsed), int(chars), int(newlines)))
+    return statistics.median(s[0] for s in samples), samples[0][1], samples[0][2]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark PDF text extraction")
+    parser.add_argument("--pages", type=int, nargs="+", default=[2, 10, 40],
+                        help="Page counts of the generated CVs")
+    parser.add_argument("--runs", type=int, default=3, help="Runs per configuration")
+    parser.add_argument("--workers", type=int, default=4, help="Worker processes for the parallel runs")
+    args = parser.parse_args()
+
+    configurations = [
+        ("previous", "previous", 1),
+        ("budget, serial", "budget", 1),
+        ("no budget, serial", "no-budget", 1),
+        (f"no budget, {args.workers} workers", "no-budget", args.workers),
+        (f"budget, {args.workers} workers", "budget", args.workers),
+    ]
+    print(f"CPUs available: {os.cpu_count()}")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        print(f"{'pages':>6} {'extractor':>24} {'time ms':>9} {'chars':>8} {'lines':>6}")
+        for pages in args.pages:
+            path = os.path.join(tmp_dir, f"cv_{pages}.pdf")
+            build_pdf(path, cv_lines(pages))
+            for label, name, workers in configurations:
+                elapsed, chars, newlines = measure(name, path, args.runs, workers)
+                print(f"{pages:>6} {label:>24} {elapsed * 1000:>9.1f} {chars:>8} {newlines:>6}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
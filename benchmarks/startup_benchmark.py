@@ -0,0 +1,84 @@
+"""
+Measures cold-start time of the Flask backend: each run imports backend/app.py in a fresh
+interpreter, as a new worker process would. Also reports the import cost of the heavy
+modules the backend now defers (openai, pandas, PyPDF2, docx) and checks that none of
+them is loaded at startup.
+
+Usage:
+    python benchmarks/startup_benchmark.py [--runs 10]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BACKEND_DIR = os.path.join(REPO_ROOT, "backend")
+
+# Modules that are imported on first use instead of at startup
+DEFERRED_MODULES = ("openai", "pandas", "PyPDF2", "docx")
+
+STARTUP_SCRIPT = """
+import sys, time
+start = time.perf_counter()
+import app
+elapsed = time.perf_counter() - start
+loaded = [name for name in {deferred!r} if name in sys.modules]
+print(f"{{elapsed}}|{{','.join(loaded)}}")
+"""
+
+IMPORT_SCRIPT = """
+import time
+start = time.perf_counter()
+import {module}
+print(time.perf_counter() - start)
+"""
+
+
+def run_python(code, cwd):
+    env = dict(os.environ)
+    # backend/app.py exits without a key; no request is made, so any value works
+    env.setdefault("OPENAI_API_KEY", "sk-benchmark")
+    result = subprocess.run([sys.executable, "-c", code], cwd=cwd, env=env,
+                            capture_output=True, text=True, check=True)
+    return result.stdout.strip().splitlines()[-1]
+
+
+def measure_startup(runs):
+    """Returns (import times in seconds, deferred modules loaded at startup)."""
+    times = []
+    loaded = set()
+    for _ in range(runs):
+        elapsed, modules = run_python(STARTUP_SCRIPT.format(deferred=DEFERRED_MODULES), BACKEND_DIR).split("|")
+        times.append(float(elapsed))
+        loaded.update(name for name in modules.split(",") if name)
+    return times, loaded
+
+
+def measure_module(module, runs):
+    return [float(run_python(IMPORT_SCRIPT.format(module=module), REPO_ROOT)) for _ in range(runs)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure Flask backend cold-start time")
+    parser.add_argument("--runs", type=int, default=10, help="Fresh interpreters per measurement")
+    args = parser.parse_args()
+
+    times, loaded = measure_startup(args.runs)
+    print(f"backend/app.py import: median {statistics.median(times) * 1000:.0f} ms, "
+          f"min {min(times) * 1000:.0f} ms over {args.runs} runs")
+    print(f"Deferred modules loaded at startup: {', '.join(sorted(loaded)) or 'none'}")
+
+    print("\nImport cost avoided at startup (paid on first use instead):")
+    total = 0.0
+    for module in DEFERRED_MODULES:
+        cost = statistics.median(measure_module(module, max(3, args.runs // 2)))
+        total += cost
+        print(f"  {module:<8} {cost * 1000:6.0f} ms")
+    print(f"  {'total':<8} {total * 1000:6.0f} ms (modules share dependencies, so this overstates the sum)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
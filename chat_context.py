@@ -0,0 +1,149 @@
+import json
+
+from llm_utils import CHARS_PER_TOKEN, create_json_completion, estimate_tokens
+
+# Most recent turns (user + assistant message pairs) sent to the model verbatim
+CHAT_WINDOW_TURNS = 6
+
+# Older turns are folded into the rolling summary in groups of this many, so the
+# summary is refreshed every few turns instead of on every one
+CHAT_SUMMARY_BATCH_TURNS = 4
+
+# Upper bound on prompt tokens per chat turn (system prompt, summary and history)
+CHAT_MAX_PROMPT_TOKENS = 3000
+
+# Long messages in the window (e.g. a generated job description) are shortened to this
+CHAT_MAX_MESSAGE_TOKENS = 600
+
+# Model used to fold old turns into the summary
+CHAT_SUMMARY_MODEL = "gpt-4o-mini"
+
+# Length cap of the rolling summary; the prompt budget leaves room for it to grow this far
+CHAT_SUMMARY_MAX_TOKENS = 300
+
+# Context keys used for conversation bookkeeping rather than job details
+SUMMARY_KEY = "conversationSummary"
+SUMMARIZED_COUNT_KEY = "summarizedMessages"
+
+SUMMARY_PROMPT = """You maintain a running summary of a conversation in which an HR assistant helps a user write a job description.
+Update the summary with the new messages below. Keep every decision, requirement, preference and open question;
+drop greetings and repetition. Write at most 150 words of plain text.
+
+Current summary:
+{summary}
+
+New messages:
+{messages}"""
+
+
+def job_details(context):
+    """Returns the context without the conversation bookkeeping keys, for use in prompts."""
+    return {key: value for key, value in context.items() if key not in (SUMMARY_KEY, SUMMARIZED_COUNT_KEY)}
+
+
+def to_chat_messages(messages):
+    """Converts the frontend's message list ({type, content}) into chat messages."""
+    chat_messages = []
+    for msg in messages:
+        if msg.get('type') in ('user', 'assistant') and msg.get('content'):
+            chat_messages.append({"role": msg['type'], "content": msg['content']})
+    return chat_messages
+
+
+def _shorten(content, max_tokens=CHAT_MAX_MESSAGE_TOKENS):
+    """Cuts a message down to roughly `max_tokens`, keeping its beginning."""
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    if len(content) <= max_chars:
+        return content
+    return content[:max_chars].rstrip() + " [...]"
+
+
+def summarize_messages(client, summary, messages):
+    """Folds messages into the rolling summary. Falls back to the old summary plus excerpts on error."""
+    transcript = "\n".join(f"{msg['role']}: {_shorten(msg['content'], 200)}" for msg in messages)
+    try:
+        response = create_json_completion(
+            client,
+            model=CHAT_SUMMARY_MODEL,
+            messages=[{"role": "user", "content": SUMMARY_PROMPT.format(summary=summary or "(none)", messages=transcript)}],
+            max_tokens=CHAT_SUMMARY_MAX_TOKENS,
+            temperature=0.2
+        )
+        return response.choices[0].message.content.strip()
+    except Exception as e:
+        print(f"Error summarizing conversation: {str(e)}")
+        return _shorten(((summary or "") + "\n" + transcript).strip(), CHAT_SUMMARY_MAX_TOKENS)
+
+
+def update_conversation_summary(client, context, history):
+    """
+    Folds turns that have left the verbatim window into `context["conversationSummary"]`.
+    `context["summarizedMessages"]` records how many messages of `history` are already in
+    the summary, so each message is summarized once even though the client resends all of them.
+    Returns the number of messages already covered by the summary.
+    """
+    summarized = context.get(SUMMARIZED_COUNT_KEY, 0)
+    if not isinstance(summarized, int) or not 0 <= summarized <= len(history):
+        summarized = 0
+    window_start = max(0, len(history) - 2 * CHAT_WINDOW_TURNS)
+
+    if window_start - summarized >= 2 * CHAT_SUMMARY_BATCH_TURNS:
+        context[SUMMARY_KEY] = summarize_messages(client, context.get(SUMMARY_KEY, ""), history[summarized:window_start])
+        context[SUMMARIZED_COUNT_KEY] = summarized = window_start
+    return summarized
+
+
+def build_windowed_conversation(client, system_prompt, context, messages, message,
+                                max_prompt_tokens=CHAT_MAX_PROMPT_TOKENS):
+    """
+    Builds the chat messages for one turn: the system prompt, the rolling summary of older
+    turns, the unsummarized recent turns and the new user message, capped at
+    `max_prompt_tokens`; recent turns that do not fit are folded into the summary. Job
+    details extracted from older turns stay available through the structured context
+    embedded in the system prompt. Updates the summary keys in `context`.
+
+    Args:
+        client: OpenAI client used to refresh the summary
+        system_prompt (str): System prompt including the structured context
+        context (dict): Conversation context; receives the summary bookkeeping keys
+        messages (list): Previous messages from the client ({type, content})
+        message (str): The new user message
+        max_prompt_tokens (int): Token budget for the whole prompt
+    """
+    history = to_chat_messages(messages)
+    summarized = update_conversation_summary(client, context, history)
+    recent = [{"role": msg["role"], "content": _shorten(msg["content"])} for msg in history[summarized:]]
+    user_message = {"role": "user", "content": _shorten(message, max_prompt_tokens // 2)}
+
+    # When the recent messages do not fit the budget, the oldest ones are folded into the
+    # summary (not dropped), leaving room for the summary to grow to CHAT_SUMMARY_MAX_TOKENS
+    fixed_tokens = estimate_tokens(system_prompt) + estimate_tokens(user_message["content"])
+    summary_tokens = estimate_tokens(context.get(SUMMARY_KEY, ""))
+    recent_tokens = [estimate_tokens(msg["content"]) for msg in recent]
+    overflow = 0
+    if fixed_tokens + summary_tokens + sum(recent_tokens) > max_prompt_tokens:
+        available = max_prompt_tokens - fixed_tokens - max(summary_tokens, CHAT_SUMMARY_MAX_TOKENS)
+        while overflow < len(recent) and sum(recent_tokens[overflow:]) > available:
+            overflow += 1
+    if overflow:
+        print(f"Chat history is over the prompt budget; summarizing {overflow} more messages")
+        context[SUMMARY_KEY] = summarize_messages(client, context.get(SUMMARY_KEY, ""),
+                                                  history[summarized:summarized + overflow])
+        context[SUMMARIZED_COUNT_KEY] = summarized = summarized + overflow
+        recent = recent[overflow:]
+
+    system_content = system_prompt
+    if context.get(SUMMARY_KEY):
+        system_content += f"\n\nSummary of the earlier conversation: {context[SUMMARY_KEY]}"
+    system_message = {"role": "system", "content": system_content}
+    used = estimate_tokens(system_content) + estimate_tokens(user_message["content"])
+    used += sum(estimate_tokens(msg["content"]) for msg in recent)
+
+    print(f"Chat prompt: ~{used} tokens, {len(recent)} recent messages, "
+          f"{summarized} summarized of {len(history)}")
+    return [system_message] + recent + [user_message]
+
+
+def context_json(context):
+    """Serializes the job details of a context for the system prompt."""
+    return json.dumps(job_details(context))
@@ -0,0 +1,268 @@
+import copy
+import re
+import string
+import threading
+
+
+# Single-word job titles, in priority order: when several appear in a message the
+# earliest entry here wins (so "python developer lead" yields the "developer" title)
+COMMON_TITLES = [
+    'developer', 'analyst', 'designer', 'coordinator', 'engineer', 'manager', 'director',
+    'specialist', 'associate', 'lead', 'senior', 'junior', 'architect', 'consultant',
+    'representative', 'executive', 'administrator', 'technician', 'supervisor', 'officer',
+    'assistant'
+]
+
+# Skills picked up from chat messages, keyed by the name stored in the context
+COMMON_SKILLS = {
+    'Python': ['python'],
+    'Javascript': ['javascript'],
+    'React': ['react'],
+    'Node.Js': ['node.js'],
+    'Sql': ['sql'],
+    'Aws': ['aws'],
+    'Docker': ['docker'],
+    'Kubernetes': ['kubernetes'],
+    'Machine Learning': ['machine learning'],
+    'Data Analysis': ['data analysis'],
+    'Excel': ['excel'],
+    'Powerbi': ['powerbi'],
+    'Tableau': ['tableau'],
+    'Figma': ['figma'],
+    'Photoshop': ['photoshop'],
+}
+
+# Words after which the preceding word is taken as the company name ("Acme company")
+COMPANY_WORDS = ('company', 'organization', 'startup', 'corporation')
+
+# "3 years", "3-5 years", "3 to 5 years"
+_EXPERIENCE_RE = re.compile(r'(\d+)[-\s]?(?:to|-)?[\s]?(\d+)?\s*years?')
+
+# Leave ("cuti") days in an AI response, one pattern per phrasing
+_BENEFIT_CUTI_RE = re.compile(r'benefit(?:s?)\s*cuti\s*(\d+)\s*(?:hari|days?)')  # "Benefit cuti X hari"
+_DAYS_OF_LEAVE_RE = re.compile(r'(\d+)\s*(?:hari|days?)\s*(?:of\s*)?(?:leave|cuti)')  # "X days of leave", "X hari cuti"
+_BENEFIT_DAYS_RE = re.compile(r'benefit(?:s?).*?(\d+)\s*(?:hari|days?)')  # "Benefits... X days"
+_CUTI_DAYS_RE = re.compile(r'cuti\s*(\d+)\s*(?:hari|days?)')  # "cuti X hari"
+_DAYS_RE = re.compile(r'(\d+)\s*(?:hari|days?)')  # Just "X hari" or "X days"
+
+# Patterns tried, in priority order (the first one that matches wins), on any response that
+# mentions a cuti benefit, and on responses to a request to change the benefits
+_CUTI_PATTERNS = (_BENEFIT_CUTI_RE, _CUTI_DAYS_RE)
+_BENEFIT_CHANGE_PATTERNS = (_BENEFIT_CUTI_RE, _DAYS_OF_LEAVE_RE, _BENEFIT_DAYS_RE, _CUTI_DAYS_RE, _DAYS_RE)
+
+_FORMATTING_RE = re.compile(r'[*\-•]')
+_WHITESPACE_RE = re.compile(r'\s+')
+
+# Punctuation that separates words; ".", "+" and "#" stay part of words like "node.js" and "c++"
+_WORD_SEPARATORS = str.maketrans({char: ' ' for char in string.punctuation if char not in '.+#'})
+
+
+def _words(text_lower):
+    """Splits lowercased text into words, dropping surrounding punctuation and sentence stops."""
+    return [word.rstrip('.') for word in text_lower.translate(_WORD_SEPARATORS).split()]
+
+
+def asked_benefit_change(message_lower):
+    """Whether the user asked to change, update or revise the benefits."""
+    return 'benefit' in message_lower and any(word in message_lower for word in ('change', 'update', 'revise'))
+
+
+class ContextExtractor:
+    """
+    Extracts job details from chat messages in a single pass per vocabulary: titles and
+    company markers and skills through set lookups over the message's words, and experience
+    and leave days through precompiled regexes. New vocabulary extends the lookup
+    tables instead of adding more scans, so the cost per message does not grow with it.
+    """
+
+    def __init__(self, titles=COMMON_TITLES, skills=COMMON_SKILLS, company_words=COMPANY_WORDS):
+        self._lock = threading.Lock()
+        self._titles = list(titles)
+        self._skills = {name: list(aliases) for name, aliases in skills.items()}
+        self._company_words = set(company_words)
+        self._compile()
+
+    def _compile(self):
+        self._title_rank = {}
+        for rank, title in enumerate(self._titles):
+            self._title_rank.setdefault(title.lower(), rank)
+        # Aliases are matched as whole token sequences ("sql" does not match inside "mysql"),
+        # grouped by length so each length needs one set intersection per message
+        self._skill_order = {name: order for order, name in enumerate(self._skills)}
+        self._skill_words = {}
+        self._skill_ngrams = {}
+        for name, aliases in self._skills.items():
+            for alias in aliases:
+                tokens = tuple(_words(alias.lower()))
+                if len(tokens) == 1:
+                    self._skill_words.setdefault(tokens[0], name)
+                elif tokens:
+                    self._skill_ngrams.setdefault(len(tokens), {}).setdefault(tokens, name)
+        self._skill_first_words = {ngram[0] for aliases in self._skill_ngrams.values() for ngram in aliases}
+
+    def add_titles(self, titles):
+        """Adds single-word job titles at the lowest priority."""
+        with self._lock:
+            self._titles.extend(title for title in titles if title not in self._titles)
+            self._compile()
+
+    def add_skills(self, skills):
+        """Adds skills as {context name: [aliases]}."""
+        with self._lock:
+            for name, aliases in skills.items():
+                existing = self._skills.setdefault(name, [])
+                existing.extend(alias for alias in aliases if alias not in existing)
+            self._compile()
+
+    def job_title(self, words, lower_words):
+        """Returns the highest-priority title word with its neighbours ("Senior Python Developer")."""
+        found = self._title_rank.keys() & set(lower_words)
+        if not found:
+            return None
+        i = lower_words.index(min(found, key=self._title_rank.get))
+        return ' '.join(words[max(0, i - 1):i + 2]).title()
+
+    def company(self, words, lower_words):
+        """Returns the word before the first company marker ("Acme" in "Acme company")."""
+        found = self._company_words & set(lower_words)
+        if not found:
+            return None
+        i = min(lower_words.index(word) for word in found)
+        return words[i - 1] if i > 0 else None
+
+    def skills(self, text_lower):
+        """Returns the context names of the skills mentioned, in vocabulary order."""
+        # Plain split first; trailing dots are only stripped if multi-word aliases need the list
+        raw_words = text_lower.translate(_WORD_SEPARATORS).split()
+        word_set = set(raw_words)
+        word_set.update([word.rstrip('.') for word in word_set if word.endswith('.')])
+        found = {self._skill_words[word] for word in self._skill_words.keys() & word_set}
+        # Multi-word aliases ("machine learning") only when one of their first words occurs
+        if self._skill_first_words & word_set:
+            words = [word.rstrip('.') for word in raw_words]
+            for n, aliases in self._skill_ngrams.items():
+                ngrams = set(zip(*(words[k:] for k in range(n))))
+                found.update(aliases[ngram] for ngram in aliases.keys() & ngrams)
+        return sorted(found, key=self._skill_order.get)
+
+    def experience(self, text_lower):
+        """Returns "3-5 years" / "3+ years" if the text states a number of years."""
+        match = _EXPERIENCE_RE.search(text_lower)
+        if not match:
+            return None
+        if match.group(2):
+            return f"{match.group(1)}-{match.group(2)} years"
+        return f"{match.group(1)}+ years"
+
+    def cuti_days(self, text, loose=False):
+        """
+        Returns the number of leave days stated in the text (as a string), or None.
+        Only "benefit cuti X hari" and "cuti X hari" are trusted unless `loose` is set.
+        """
+        cleaned = _WHITESPACE_RE.sub(' ', _FORMATTING_RE.sub('', text)).lower()
+        for pattern in _BENEFIT_CHANGE_PATTERNS if loose else _CUTI_PATTERNS:
+            match = pattern.search(cleaned)
+            if match:
+                return match.group(1)
+        return None
+
+    def benefit_days(self, message_lower, ai_response):
+        """
+        Returns the leave days from the AI response that should replace the benefits, or None.
+        A response mentioning a cuti benefit is read first; when the user asked to change
+        the benefits, looser phrasings like "15 days" are accepted after that.
+        """
+        ai_lower = ai_response.lower()
+        days = None
+        if 'benefit' in ai_lower and 'cuti' in ai_lower:
+            days = self.cuti_days(ai_response)
+        if days is None and asked_benefit_change(message_lower):
+            days = self.cuti_days(ai_response, loose=True)
+        return days
+
+    def extract_message(self, message):
+        """
+        Extracts everything a user message can contribute in one go.
+        Returns a dict with job_title, company, experience and skills (missing ones are None/[]).
+        """
+        words = message.split()
+        lower = message.lower()
+        lower_words = lower.split()
+        wants_experience = 'year' in lower and ('experience' in lower or 'exp' in lower)
+        return {
+            'job_title': self.job_title(words, lower_words),
+            'company': self.company(words, lower_words) if 'company' in lower or 'organization' in lower else None,
+            'experience': self.experience(lower) if wants_experience else None,
+            'skills': self.skills(lower),
+        }
+
+
+context_extractor = ContextExtractor()
+
+
+def update_job_context(context, user_message, ai_response):
+    """
+    Updates the conversation context from a user message and the AI's reply.
+    Returns a new context; the one passed in is not modified.
+
+    Args:
+        context (dict): The current job context
+        user_message (str): The user's chat message
+        ai_response (str): The AI's reply to it
+    """
+    updated_context = copy.deepcopy(context)
+
+    # One pass over the user message for title, company, experience and skills
+    message_lower = user_message.lower()
+    extracted = context_extractor.extract_message(user_message)
+
+    # Extract job title
+    if not updated_context.get('jobTitle') and extracted['job_title']:
+        updated_context['jobTitle'] = extracted['job_title']
+
+    # Extract company info
+    if extracted['company']:
+        updated_context['company'] = extracted['company']
+
+    # Handle company overview from predefined profiles
+    overview_start = message_lower.find('company overview:')
+    if overview_start != -1:
+        # Extract company overview from message
+        overview_text = user_message[overview_start + len('company overview:'):].strip()
+        # Extract until benefits section if present
+        benefits_start = overview_text.lower().find('our benefits include:')
+        if benefits_start != -1:
+            updated_context['companyOverview'] = overview_text[:benefits_start].strip()
+            # Extract benefits
+            benefits_text = overview_text[benefits_start + len('our benefits include:'):].strip()
+            updated_context['benefits'] = [benefits_text]
+        else:
+            updated_context['companyOverview'] = overview_text
+
+    # Extract benefits information from user message
+    benefits_start = message_lower.find('benefits include:')
+    if benefits_start != -1:
+        benefits_text = user_message[benefits_start + len('benefits include:'):].strip()
+        updated_context.setdefault('benefits', []).append(benefits_text)
+
+    # Leave days ("cuti") stated in the AI response
+    days = context_extractor.benefit_days(message_lower, ai_response)
+    if days:
+        new_benefits = f"Benefit cuti {days} hari, BPJS, THR, Diskon karyawan"
+        updated_context['benefits'] = [new_benefits]
+        print(f"DEBUG: Updated benefits to: {new_benefits}")
+    elif asked_benefit_change(message_lower):
+        print(f"DEBUG: No days found in AI response. AI response: {ai_response[:500]}...")
+
+    # Extract experience requirements
+    if extracted['experience']:
+        updated_context['experience'] = extracted['experience']
+
+    # Extract skills mentioned
+    known_skills = {skill.lower() for skill in updated_context.get('skills', [])}
+    for skill in extracted['skills']:
+        if skill.lower() not in known_skills:
+            updated_context.setdefault('skills', []).append(skill)
+            known_skills.add(skill.lower())
+
+    return updated_context
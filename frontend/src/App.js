@@ -56,7 +56,7 @@ function App() {
   });
   const [jobDescription, setJobDescription] = useState('');
   const [requirements, setRequirements] = useState(null);
-  const [analysisResults, setAnalysisResults] = useState([]);
+  const [analysisResults, setAnalysisResults] = useState(null);
   const [loading, setLoading] = useState(false);
   const [error, setError] = useState('');
   const [success, setSuccess] = useState('');
@@ -98,9 +98,10 @@ function App() {
     setSuccess('Requirements updated successfully!');
   };
 
-  const handleResumeAnalyzed = (results) => {
-    setAnalysisResults(results);
-    setSuccess(`Analyzed ${results.length} resumes successfully!`);
+  // `analysis` holds the first page of results; ResultsDisplay fetches the rest on demand
+  const handleResumeAnalyzed = (analysis) => {
+    setAnalysisResults(analysis);
+    setSuccess(`Analyzed ${analysis.total} resumes successfully!`);
   };
 
   const clearMessages = () => {
@@ -217,9 +218,10 @@ function App() {
           </Paper>
 
           {/* Results Display */}
-          {analysisResults.length > 0 && (
+          {analysisResults?.total > 0 && (
             <ResultsDisplay
-              results={analysisResults}
+              key={analysisResults.results_version}
+              initialPage={analysisResults}
               setError={setError}
               setLoading={setLoading}
             />
@@ -17,7 +17,6 @@ import {
   ContentCopy,
   CheckCircle 
 } from '@mui/icons-material';
-import axios from 'axios';
 
 const JobDescriptionChat = ({ onJobDescriptionGenerated, onApplyJobDescription, clearMessages }) => {
   const [messages, setMessages] = useState([
@@ -75,33 +74,79 @@ Boga Group's diverse portfolio includes 9 Bakerzin, 86 Pepper Lunch, 71 Kimukats
     setInputMessage('');
     setIsLoading(true);
 
+    const assistantId = messages.length + 2;
+    const updateAssistant = (changes) => {
+      setMessages(prev => prev.map(msg => (msg.id === assistantId ? { ...msg, ...changes(msg) } : msg)));
+    };
+
     try {
-      const response = await axios.post('/api/job-description-chat', {
-        message: inputMessage.trim(),
-        context: conversationContext,
-        messages: messages
+      // Server-sent events: the reply is shown as it is generated
+      const response = await fetch('/api/job-description-chat/stream', {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({
+          message: inputMessage.trim(),
+          context: conversationContext,
+          messages: messages
+        })
       });
+      if (!response.ok || !response.body) {
+        throw new Error('Chat request failed');
+      }
+
+      setMessages(prev => [...prev, {
+        id: assistantId,
+        type: 'assistant',
+        content: '',
+        timestamp: new Date(),
+        jobDescription: null
+      }]);
+
+      const reader = response.body.getReader();
+      const decoder = new TextDecoder();
+      let buffer = '';
+      let streamedJobDescription = '';
+
+      while (true) {
+        const { done, value } = await reader.read();
+        if (done) break;
+
+        buffer += decoder.decode(value, { stream: true });
+        const events = buffer.split('\n\n');
+        buffer = events.pop();
 
-      if (response.data.success) {
-        const assistantMessage = {
-          id: messages.length + 2,
-          type: 'assistant',
-          content: response.data.response,
-          timestamp: new Date(),
-          jobDescription: response.data.jobDescription || null
-        };
+        for (const rawEvent of events) {
+          if (!rawEvent.startsWith('data: ')) continue;
+          const event = JSON.parse(rawEvent.slice(6));
 
-        setMessages(prev => [...prev, assistantMessage]);
-        setConversationContext(response.data.context);
+          if (event.type === 'delta') {
+            setIsLoading(false);
+            updateAssistant(msg => ({ content: msg.content + event.content }));
+          } else if (event.type === 'context') {
+            setConversationContext(event.context);
+          } else if (event.type === 'job_description_delta') {
+            streamedJobDescription += event.content;
+            const jobDescription = streamedJobDescription;
+            updateAssistant(() => ({ jobDescription }));
+          } else if (event.type === 'done') {
+            updateAssistant(() => ({
+              content: event.response,
+              jobDescription: event.jobDescription || null
+            }));
+            setConversationContext(event.context);
+          } else if (event.type === 'error') {
+            throw new Error(event.message);
+          }
+        }
       }
     } catch (error) {
       const errorMessage = {
-        id: messages.length + 2,
+        id: assistantId,
         type: 'assistant',
         content: "I apologize, but I'm having trouble processing your request. Please try again.",
         timestamp: new Date()
       };
-      setMessages(prev => [...prev, errorMessage]);
+      setMessages(prev => [...prev.filter(msg => msg.id !== assistantId), errorMessage]);
     } finally {
       setIsLoading(false);
     }
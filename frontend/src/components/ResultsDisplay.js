@@ -1,4 +1,4 @@
-import React from 'react';
+import React, { useEffect, useRef, useState } from 'react';
 import {
   Box,
   Typography,
@@ -13,7 +13,13 @@ import {
   LinearProgress,
   Button,
   Divider,
-  Link
+  Link,
+  FormControl,
+  InputLabel,
+  Select,
+  MenuItem,
+  TextField,
+  CircularProgress
 } from '@mui/material';
 import { 
   ExpandMore, 
@@ -29,7 +35,75 @@ import {
 } from '@mui/icons-material';
 import axios from 'axios';
 
-const ResultsDisplay = ({ results, setError, setLoading }) => {
+const PAGE_SIZE = 20;
+
+const DEFAULT_QUERY = { sort: 'semantic', order: 'desc', recommendation: '', minMustHave: '', location: '' };
+
+// Results are paged from the server; the full analysis of a candidate is only fetched when opened
+const ResultsDisplay = ({ initialPage, setError, setLoading }) => {
+  const [results, setResults] = useState(initialPage.results);
+  const [total, setTotal] = useState(initialPage.total);
+  const [nextCursor, setNextCursor] = useState(initialPage.next_cursor);
+  const [resultsVersion, setResultsVersion] = useState(initialPage.results_version);
+  const [query, setQuery] = useState(DEFAULT_QUERY);
+  const [filterInputs, setFilterInputs] = useState(DEFAULT_QUERY);
+  const [details, setDetails] = useState({});
+  const [loadingPage, setLoadingPage] = useState(false);
+  const firstQuery = useRef(true);
+
+  const fetchPage = async (cursor) => {
+    setLoadingPage(true);
+    try {
+      const params = { sort: query.sort, order: query.order, limit: PAGE_SIZE };
+      if (cursor) params.cursor = cursor;
+      if (query.recommendation) params.recommendation = query.recommendation;
+      if (query.minMustHave !== '') params.min_must_have = query.minMustHave;
+      if (query.location) params.location = query.location;
+
+      const response = await axios.get('/api/results', { params });
+      if (response.data.success) {
+        setResults(prev => (cursor ? [...prev, ...response.data.results] : response.data.results));
+        setTotal(response.data.total);
+        setNextCursor(response.data.next_cursor);
+        if (response.data.results_version !== resultsVersion) {
+          setResultsVersion(response.data.results_version);
+          setDetails({});
+        }
+      } else {
+        setError(response.data.message || 'Failed to load results');
+      }
+    } catch (error) {
+      setError(error.response?.data?.message || 'Failed to load results');
+    } finally {
+      setLoadingPage(false);
+    }
+  };
+
+  // The initial page comes with the analysis response; refetch from the start on query changes
+  useEffect(() => {
+    if (firstQuery.current) {
+      firstQuery.current = false;
+      return;
+    }
+    fetchPage(null);
+    // eslint-disable-next-line react-hooks/exhaustive-deps
+  }, [query]);
+
+  const handleExpand = async (resultId, expanded) => {
+    if (!expanded || details[resultId]) return;
+    try {
+      const response = await axios.get(`/api/results/${resultId}`, { params: { version: resultsVersion } });
+      if (response.data.success) {
+        setDetails(prev => ({ ...prev, [resultId]: response.data.result }));
+      }
+    } catch (error) {
+      setError(error.response?.data?.message || 'Failed to load candidate details');
+    }
+  };
+
+  const applyFilters = () => {
+    setQuery(filterInputs);
+  };
 
   const handleExportCSV = async () => {
     setLoading(true);
@@ -219,11 +293,84 @@ const ResultsDisplay = ({ results, setError, setLoading }) => {
     </Card>
   );
 
+  const ResultDetails = ({ result }) => (
+    <>
+      {/* Contact Information */}
+      {result.analysis?.contact_info && (
+        <ContactInfo contactInfo={result.analysis.contact_info} />
+      )}
+
+      {/* Requirements Match */}
+      <Typography variant="h6" gutterBottom>
+        Requirements Match
+      </Typography>
+      
+      <Grid container spacing={2} sx={{ mb: 3 }}>
+        <Grid item xs={12} md={6}>
+          <RequirementSection
+            title="Technical Skills"
+            items={result.analysis?.requirement_match?.must_have_requirements?.technical_skills}
+            color="error"
+          />
+        </Grid>
+        <Grid item xs={12} md={6}>
+          <RequirementSection
+            title="Core Responsibilities"
+            items={result.analysis?.requirement_match?.must_have_requirements?.core_responsibilities}
+            color="error"
+          />
+        </Grid>
+        <Grid item xs={12} md={6}>
+          <RequirementSection
+            title="Additional Skills"
+            items={result.analysis?.requirement_match?.good_to_have_requirements?.additional_skills}
+            color="warning"
+          />
+        </Grid>
+        <Grid item xs={12} md={6}>
+          <RequirementSection
+            title="Screening Criteria"
+            items={result.analysis?.requirement_match?.additional_screening_criteria}
+            color="info"
+          />
+        </Grid>
+      </Grid>
+
+      <Divider sx={{ my: 2 }} />
+
+      {/* Qualitative Assessment */}
+      <QualitativeFactors assessment={result.analysis?.qualitative_assessment} />
+
+      <Divider sx={{ my: 2 }} />
+
+      {/* Final Recommendation */}
+      <Card>
+        <CardContent>
+          <Typography variant="h6" gutterBottom>
+            Final Recommendation
+          </Typography>
+          <Typography variant="body1" sx={{ mb: 2 }}>
+            {result.analysis?.final_recommendation}
+          </Typography>
+          
+          <Typography variant="subtitle2" gutterBottom>
+            Key Factors:
+          </Typography>
+          {result.analysis?.summary_of_key_factors?.map((factor, index) => (
+            <Typography key={index} variant="body2" sx={{ ml: 2 }}>
+              • {factor}
+            </Typography>
+          ))}
+        </CardContent>
+      </Card>
+    </>
+  );
+
   return (
     <Paper sx={{ p: 3 }}>
       <Box sx={{ display: 'flex', justifyContent: 'space-between', alignItems: 'center', mb: 3 }}>
         <Typography variant="h5">
-          Analysis Results ({results.length} candidates)
+          Analysis Results ({total} candidates)
         </Typography>
         <Button
           variant="outlined"
@@ -234,12 +381,79 @@ const ResultsDisplay = ({ results, setError, setLoading }) => {
         </Button>
       </Box>
 
-      {results.map((result, index) => (
-        <Accordion key={index} defaultExpanded={index === 0}>
+      {/* Sort and filters, applied on the server */}
+      <Box sx={{ display: 'flex', flexWrap: 'wrap', gap: 2, mb: 3 }}>
+        <FormControl size="small" sx={{ minWidth: 160 }}>
+          <InputLabel>Sort by</InputLabel>
+          <Select
+            label="Sort by"
+            value={query.sort}
+            onChange={(e) => {
+              setQuery(prev => ({ ...prev, sort: e.target.value }));
+              setFilterInputs(prev => ({ ...prev, sort: e.target.value }));
+            }}
+          >
+            <MenuItem value="semantic">Semantic score</MenuItem>
+            <MenuItem value="quantitative">Quantitative score</MenuItem>
+          </Select>
+        </FormControl>
+        <FormControl size="small" sx={{ minWidth: 130 }}>
+          <InputLabel>Order</InputLabel>
+          <Select
+            label="Order"
+            value={query.order}
+            onChange={(e) => {
+              setQuery(prev => ({ ...prev, order: e.target.value }));
+              setFilterInputs(prev => ({ ...prev, order: e.target.value }));
+            }}
+          >
+            <MenuItem value="desc">Highest first</MenuItem>
+            <MenuItem value="asc">Lowest first</MenuItem>
+          </Select>
+        </FormControl>
+        <FormControl size="small" sx={{ minWidth: 160 }}>
+          <InputLabel>Recommendation</InputLabel>
+          <Select
+            label="Recommendation"
+            value={filterInputs.recommendation}
+            onChange={(e) => setFilterInputs(prev => ({ ...prev, recommendation: e.target.value }))}
+          >
+            <MenuItem value="">All</MenuItem>
+            <MenuItem value="Yes">Yes</MenuItem>
+            <MenuItem value="No">No</MenuItem>
+          </Select>
+        </FormControl>
+        <TextField
+          size="small"
+          type="number"
+          label="Min. must-have %"
+          value={filterInputs.minMustHave}
+          onChange={(e) => setFilterInputs(prev => ({ ...prev, minMustHave: e.target.value }))}
+          inputProps={{ min: 0, max: 100 }}
+          sx={{ width: 160 }}
+        />
+        <TextField
+          size="small"
+          label="Location"
+          value={filterInputs.location}
+          onChange={(e) => setFilterInputs(prev => ({ ...prev, location: e.target.value }))}
+          onKeyDown={(e) => e.key === 'Enter' && applyFilters()}
+        />
+        <Button variant="contained" onClick={applyFilters}>
+          Apply Filters
+        </Button>
+      </Box>
+
+      {results.map((result) => (
+        <Accordion
+          key={result.id}
+          TransitionProps={{ unmountOnExit: true }}
+          onChange={(event, expanded) => handleExpand(result.id, expanded)}
+        >
           <AccordionSummary expandIcon={<ExpandMore />}>
             <Box sx={{ display: 'flex', alignItems: 'center', gap: 2, width: '100%' }}>
               <Typography variant="h6">
-                {result.filename}
+                {result.full_name || result.filename}
               </Typography>
               <Chip
                 label={`${result.semantic_percentage}%`}
@@ -247,83 +461,37 @@ const ResultsDisplay = ({ results, setError, setLoading }) => {
                 size="small"
               />
               <Typography variant="body2" color="text.secondary">
-                Semantic: {result.semantic_percentage}% | Quantitative: {result.quantitative_percentage}%
+                Semantic: {result.semantic_percentage}% | Quantitative: {result.quantitative_percentage}% | Must-have: {result.must_have_coverage}%
+                {result.location ? ` | ${result.location}` : ''}
               </Typography>
             </Box>
           </AccordionSummary>
           
           <AccordionDetails>
-            {/* Contact Information */}
-            {result.analysis?.contact_info && (
-              <ContactInfo contactInfo={result.analysis.contact_info} />
+            {details[result.id] ? (
+              <ResultDetails result={details[result.id]} />
+            ) : (
+              <Box sx={{ display: 'flex', justifyContent: 'center', p: 2 }}>
+                <CircularProgress size={24} />
+              </Box>
             )}
-
-            {/* Requirements Match */}
-            <Typography variant="h6" gutterBottom>
-              Requirements Match
-            </Typography>
-            
-            <Grid container spacing={2} sx={{ mb: 3 }}>
-              <Grid item xs={12} md={6}>
-                <RequirementSection
-                  title="Technical Skills"
-                  items={result.analysis?.requirement_match?.must_have_requirements?.technical_skills}
-                  color="error"
-                />
-              </Grid>
-              <Grid item xs={12} md={6}>
-                <RequirementSection
-                  title="Core Responsibilities"
-                  items={result.analysis?.requirement_match?.must_have_requirements?.core_responsibilities}
-                  color="error"
-                />
-              </Grid>
-              <Grid item xs={12} md={6}>
-                <RequirementSection
-                  title="Additional Skills"
-                  items={result.analysis?.requirement_match?.good_to_have_requirements?.additional_skills}
-                  color="warning"
-                />
-              </Grid>
-              <Grid item xs={12} md={6}>
-                <RequirementSection
-                  title="Screening Criteria"
-                  items={result.analysis?.requirement_match?.additional_screening_criteria}
-                  color="info"
-                />
-              </Grid>
-            </Grid>
-
-            <Divider sx={{ my: 2 }} />
-
-            {/* Qualitative Assessment */}
-            <QualitativeFactors assessment={result.analysis?.qualitative_assessment} />
-
-            <Divider sx={{ my: 2 }} />
-
-            {/* Final Recommendation */}
-            <Card>
-              <CardContent>
-                <Typography variant="h6" gutterBottom>
-                  Final Recommendation
-                </Typography>
-                <Typography variant="body1" sx={{ mb: 2 }}>
-                  {result.analysis?.final_recommendation}
-                </Typography>
-                
-                <Typography variant="subtitle2" gutterBottom>
-                  Key Factors:
-                </Typography>
-                {result.analysis?.summary_of_key_factors?.map((factor, index) => (
-                  <Typography key={index} variant="body2" sx={{ ml: 2 }}>
-                    • {factor}
-                  </Typography>
-                ))}
-              </CardContent>
-            </Card>
           </AccordionDetails>
         </Accordion>
       ))}
+
+      {results.length === 0 && !loadingPage && (
+        <Typography variant="body2" color="text.secondary">
+          No candidates match these filters.
+        </Typography>
+      )}
+
+      {nextCursor && (
+        <Box sx={{ display: 'flex', justifyContent: 'center', mt: 2 }}>
+          <Button variant="outlined" onClick={() => fetchPage(nextCursor)} disabled={loadingPage}>
+            {loadingPage ? 'Loading...' : `Load More (${results.length} of ${total})`}
+          </Button>
+        </Box>
+      )}
     </Paper>
   );
 };
@@ -34,7 +34,10 @@ const ResumeAnalysis = ({
     accept: {
       'application/pdf': ['.pdf'],
       'application/vnd.openxmlformats-officedocument.wordprocessingml.document': ['.docx'],
-      'text/plain': ['.txt']
+      'text/plain': ['.txt'],
+      'application/zip': ['.zip'],
+      'application/x-tar': ['.tar'],
+      'application/gzip': ['.tar.gz', '.tgz']
     },
     multiple: true
   });
@@ -58,20 +61,27 @@ const ResumeAnalysis = ({
     setLoading(true);
 
     try {
+      // Fields go first so the server can start analyzing files while the rest upload
       const formData = new FormData();
+      formData.append('model', selectedModels.reasoning);
       files.forEach((file) => {
         formData.append('files', file);
       });
-      formData.append('model', selectedModels.reasoning);
 
-      const response = await axios.post('/api/analyze-resumes', formData, {
+      const response = await axios.post('/api/analyze-resumes/stream', formData, {
         headers: {
           'Content-Type': 'multipart/form-data'
         }
       });
 
       if (response.data.success) {
-        onResumeAnalyzed(response.data.results);
+        // Keep only the files that failed so they can be retried on their own
+        const failedFiles = response.data.failed_files || [];
+        setFiles(prev => prev.filter(file => failedFiles.includes(file.name)));
+        if (failedFiles.length > 0) {
+          setError(`Could not analyze: ${failedFiles.join(', ')}. Retry just these files.`);
+        }
+        onResumeAnalyzed(response.data);
       } else {
         setError(response.data.message || 'Failed to analyze resumes');
       }
@@ -89,7 +99,7 @@ const ResumeAnalysis = ({
       </Typography>
       
       <Typography variant="body1" color="text.secondary" sx={{ mb: 3 }}>
-        Upload resume files (PDF, DOCX, or TXT) to analyze against the job requirements. 
+        Upload resume files (PDF, DOCX, or TXT), or a zip/tar archive of them, to analyze against the job requirements. 
         The system will extract contact information, match requirements, and provide detailed analysis.
       </Typography>
 
@@ -115,7 +125,7 @@ const ResumeAnalysis = ({
           {isDragActive ? 'Drop the files here...' : 'Drag & drop resume files here'}
         </Typography>
         <Typography variant="body2" color="text.secondary">
-          or click to select files (PDF, DOCX, TXT)
+          or click to select files (PDF, DOCX, TXT, ZIP, TAR)
         </Typography>
       </Paper>
 
@@ -1,15 +1,221 @@
-import json
-from openai import OpenAI
-import os
-from dotenv import load_dotenv
+import re
+from llm_utils import (
+    MAX_PARSE_ATTEMPTS,
+    ResponseParseError,
+    create_completion_with_continuation,
+    estimate_tokens,
+    get_client,
+    json_response_format,
+    parse_json_response,
+)
 
-# Load environment variables
-load_dotenv()
+_STRING_LIST = {"type": "array", "items": {"type": "string"}}
 
-# Initialize OpenAI client
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+# Strict schema for the extracted requirements. The original job description is
+# attached locally after the call, so the model is not asked to echo it back.
+JOB_REQUIREMENTS_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "must_have_requirements": {
+            "type": "object",
+            "properties": {
+                "technical_skills": _STRING_LIST,
+                "experience": {"type": "string"},
+                "qualifications": _STRING_LIST,
+                "core_responsibilities": _STRING_LIST
+            },
+            "required": ["technical_skills", "experience", "qualifications", "core_responsibilities"],
+            "additionalProperties": False
+        },
+        "good_to_have_requirements": {
+            "type": "object",
+            "properties": {
+                "additional_skills": _STRING_LIST,
+                "extra_qualifications": _STRING_LIST,
+                "bonus_experience": _STRING_LIST
+            },
+            "required": ["additional_skills", "extra_qualifications", "bonus_experience"],
+            "additionalProperties": False
+        },
+        "additional_screening_criteria": _STRING_LIST
+    },
+    "required": ["must_have_requirements", "good_to_have_requirements", "additional_screening_criteria"],
+    "additionalProperties": False
+}
+
+JOB_REQUIREMENTS_KEYS = ("must_have_requirements", "good_to_have_requirements")
+
+# Output budget for analyze_job_description. The extracted requirements grow roughly
+# with the JD, so the budget scales with the input and is clamped to sane bounds.
+JD_MIN_OUTPUT_TOKENS = 1147
+JD_MAX_OUTPUT_TOKENS = 8192
+JD_BASE_OUTPUT_TOKENS = 400
+JD_OUTPUT_TOKENS_PER_INPUT_TOKEN = 0.8
+
+def job_description_output_budget(job_description):
+    """Returns the max_tokens budget for extracting requirements from a JD of this length."""
+    input_tokens = estimate_tokens(job_description)
+    budget = JD_BASE_OUTPUT_TOKENS + int(input_tokens * JD_OUTPUT_TOKENS_PER_INPUT_TOKEN)
+    return max(JD_MIN_OUTPUT_TOKENS, min(JD_MAX_OUTPUT_TOKENS, budget))
+
+# --- Rule-based fast path for templated job descriptions ---
+
+# Section headers recognised by the local parser, mapped to the kind of items they hold
+_SECTION_HEADERS = [
+    ("responsibilities", re.compile(
+        r"^(key |core |main |your |job |primary )?(responsibilities|duties|accountabilities)$"
+        r"|^what you('ll| will) (do|be doing)$|^the role$|^role responsibilities$")),
+    ("required", re.compile(
+        r"^(basic|minimum|required|mandatory|must[- ]have|essential)( qualifications| requirements| skills)?$"
+        r"|^(qualifications|requirements|skills|skills and qualifications|requirements and qualifications)$"
+        r"|^what (we're|we are) looking for$|^who you are$|^you have$")),
+    ("preferred", re.compile(
+        r"^(preferred|desired|desirable|bonus|additional|nice[- ]to[- ]have|good[- ]to[- ]have)"
+        r"( qualifications| requirements| skills| points)?$|^bonus points( if you have)?$")),
+    # Sections that never carry candidate requirements
+    ("ignore", re.compile(
+        r"^(about( the| us| the role| the company| the team)?.*|benefits|perks|perks and benefits|what we offer"
+        r"|compensation|salary|how to apply|equal (employment )?opportunity.*|who we are|our culture|why join us)$")),
+]
+
+# "Key: value" lines at the top of a JD that act as screening criteria or experience
+_METADATA_RE = re.compile(r"^(?P<key>[A-Za-z][A-Za-z /-]{1,30}):\s*(?P<value>.+)$")
+_SCREENING_METADATA_KEYS = {
+    "type", "job type", "employment type", "location", "work location", "work mode", "workplace",
+    "schedule", "shift", "work authorization", "visa", "visa sponsorship", "travel", "availability"
+}
+_BULLET_RE = re.compile(r"^\s*(?:[-*\u2022\u2013\u25aa\u25cf\u00b7]|\d{1,2}[.)])\s+(?P<item>.+)$")
+_EXPERIENCE_RE = re.compile(r"\b\d+\s*\+?\s*(?:(?:-|to)\s*\d+\s*)?\+?\s*(?:years?|yrs?)\b", re.IGNORECASE)
+_QUALIFICATION_RE = re.compile(
+    r"\b(degree|bachelor'?s?|master'?s?|ph\.?d|b\.?tech|m\.?tech|b\.?s\.?c?|m\.?s\.?c?|mba|diploma|certifi\w*|graduate)\b",
+    re.IGNORECASE
+)
+_BONUS_EXPERIENCE_RE = re.compile(
+    r"\b(prior|previous) experience\b|\bbackground in\b|\bindustry\b|\benvironment\b|\bdomain\b|\bstartups?\b",
+    re.IGNORECASE
+)
 
-def analyze_job_description(job_description, model="gpt-4.1"):
+def _match_section_header(line):
+    """Returns the section kind for a header line, "unknown" for an unrecognised header, or None."""
+    if _BULLET_RE.match(line) or _METADATA_RE.match(line) or len(line) > 60:
+        return None
+    header = line.strip().strip("#*").strip().rstrip(":").strip().lower()
+    if not header or header.endswith((".", ",", ";")):
+        return None
+    for kind, pattern in _SECTION_HEADERS:
+        if pattern.match(header):
+            return kind
+    # Short title-like lines ending with a colon (or all words capitalised) open a new section
+    if line.rstrip().endswith(":") or line.strip().istitle():
+        return "unknown"
+    return None
+
+def parse_structured_job_description(job_description):
+    """
+    Extracts requirements locally from a JD that uses explicit section headers
+    (e.g. "Responsibilities", "Basic Qualifications", "Preferred Qualifications").
+
+    Returns a tuple of (requirements, unclassified_text), where unclassified_text holds
+    the sections the rules could not place, or None when the JD is not structured
+    enough for the rules to be trusted.
+    """
+    must_have = {
+        "technical_skills": [],
+        "experience": "",
+        "qualifications": [],
+        "core_responsibilities": []
+    }
+    good_to_have = {
+        "additional_skills": [],
+        "extra_qualifications": [],
+        "bonus_experience": []
+    }
+    screening = []
+    experience = []
+    unclassified = []
+
+    section = None
+    seen_sections = set()
+    for raw_line in job_description.splitlines():
+        line = raw_line.strip()
+        if not line:
+            continue
+
+        kind = _match_section_header(line)
+        if kind is not None:
+            section = kind
+            seen_sections.add(kind)
+            if kind == "unknown":
+                unclassified.append(line)
+            continue
+
+        bullet = _BULLET_RE.match(line)
+        item = bullet.group("item").strip().rstrip(".;") if bullet else line
+
+        if section is None:
+            # Header block before the first section, e.g. "Location: Bangalore / Remote"
+            metadata = _METADATA_RE.match(line)
+            if metadata:
+                key = metadata.group("key").strip().lower()
+                if key in _SCREENING_METADATA_KEYS:
+                    screening.append(f"{metadata.group('key').strip()}: {metadata.group('value').strip()}")
+                elif key.startswith("experience"):
+                    experience.append(metadata.group("value").strip())
+            continue
+
+        if section == "ignore":
+            continue
+        if section == "unknown":
+            unclassified.append(line)
+        elif not bullet:
+            # Prose inside a requirements section may hide conditions the rules cannot judge
+            unclassified.append(line)
+        elif section == "responsibilities":
+            must_have["core_responsibilities"].append(item)
+        elif section == "required":
+            if _EXPERIENCE_RE.search(item):
+                experience.append(item)
+            elif _QUALIFICATION_RE.search(item):
+                must_have["qualifications"].append(item)
+            else:
+                must_have["technical_skills"].append(item)
+        elif section == "preferred":
+            if _QUALIFICATION_RE.search(item) and not _EXPERIENCE_RE.search(item):
+                good_to_have["extra_qualifications"].append(item)
+            elif _BONUS_EXPERIENCE_RE.search(item):
+                good_to_have["bonus_experience"].append(item)
+            else:
+                good_to_have["additional_skills"].append(item)
+
+    if "responsibilities" not in seen_sections or "required" not in seen_sections:
+        return None
+    if not must_have["core_responsibilities"] or not (must_have["technical_skills"] or must_have["qualifications"]):
+        return None
+
+    must_have["experience"] = "; ".join(experience)
+    requirements = {
+        "original_job_description": job_description,
+        "must_have_requirements": must_have,
+        "good_to_have_requirements": good_to_have,
+        "additional_screening_criteria": screening
+    }
+    return requirements, "\n".join(unclassified)
+
+def _merge_requirements(base, extra):
+    """Merges the lists of `extra` into `base` without duplicating items."""
+    for section in ("must_have_requirements", "good_to_have_requirements"):
+        base_section = base.setdefault(section, {})
+        for key, value in (extra.get(section) or {}).items():
+            if isinstance(value, list):
+                existing = base_section.setdefault(key, [])
+                existing.extend(item for item in value if item not in existing)
+            elif value and not base_section.get(key):
+                base_section[key] = value
+    existing = base.setdefault("additional_screening_criteria", [])
+    existing.extend(item for item in extra.get("additional_screening_criteria", []) if item not in existing)
+    return base
+
+def analyze_job_description(job_description, model="gpt-4.1", use_fast_path=True):
     """
     Analyzes a job description using GPT-4 and extracts structured requirements.
     Returns a dictionary with must-have, good-to-have, and additional screening criteria.
@@ -17,14 +223,32 @@ def analyze_job_description(job_description, model="gpt-4.1"):
     Args:
         job_description (str): The job description text to analyze
         model (str): The OpenAI model to use for analysis
+        use_fast_path (bool): Parse well-structured JDs locally and only send the
+            sections the rules cannot classify to the model
     """
+    if use_fast_path:
+        try:
+            parsed = parse_structured_job_description(job_description)
+        except Exception as e:
+            print(f"Error in rule-based JD parsing, using the model instead: {str(e)}")
+            parsed = None
+        
+        if parsed is not None:
+            requirements, unclassified_text = parsed
+            print("Extracted job requirements locally from JD section headers")
+            if unclassified_text.strip():
+                print(f"Sending {len(unclassified_text)} unclassified characters to {model}")
+                extra = analyze_job_description(unclassified_text, model=model, use_fast_path=False)
+                if extra:
+                    _merge_requirements(requirements, extra)
+            requirements["original_job_description"] = job_description
+            return requirements
+    
     try:
-        response = client.chat.completions.create(
-            model=model,
-            messages=[
-                {
-                    "role": "system",
-                    "content": """You are an experienced technical recruiter and job posting analyst.
+        messages = [
+            {
+                "role": "system",
+                "content": """You are an experienced technical recruiter and job posting analyst.
                     Your task is to extract a structured summary of candidate requirements from the job description.
                     These will be used to evaluate resumes later.
                     
@@ -51,7 +275,6 @@ def analyze_job_description(job_description, model="gpt-4.1"):
 
                     ## Output Format:
                     {
-                      "original_job_description": "The complete original job description text",
                       "must_have_requirements": {
                         "technical_skills": [],
                         "experience": "",
@@ -67,18 +290,40 @@ def analyze_job_description(job_description, model="gpt-4.1"):
                         // List any additional filtering statements or constraints that impact applicant suitability
                       ]
                     }"""
-                },
-                {
-                    "role": "user",
-                    "content": f"Please extract a structured summary of the candidate requirements from the following job description. Do not add any prefixes or suffixes to the output. Directly output in JSON format.\n---\n## Job Description:\n{job_description}\n---"
-                }
-            ],
-            temperature=0.19,
-            max_tokens=1147
-        )
+            },
+            {
+                "role": "user",
+                "content": f"Please extract a structured summary of the candidate requirements from the following job description. Do not add any prefixes or suffixes to the output. Directly output in JSON format.\n---\n## Job Description:\n{job_description}\n---"
+            }
+        ]
+        
+        # Use a strict schema where supported; other models rely on the local JSON repair
+        response_format = json_response_format(model, "job_requirements", JOB_REQUIREMENTS_SCHEMA)
+        
+        max_tokens = job_description_output_budget(job_description)
+        
+        extracted_data = None
+        for attempt in range(1, MAX_PARSE_ATTEMPTS + 1):
+            # Truncated output is continued in place rather than re-requested from scratch
+            content, finish_reason = create_completion_with_continuation(
+                get_client(),
+                messages,
+                response_format=response_format,
+                model=model,
+                temperature=0.19,
+                max_tokens=max_tokens
+            )
+            if finish_reason == "length":
+                print(f"Job description output still truncated after continuations ({len(content)} characters)")
+            try:
+                extracted_data = parse_json_response(content, JOB_REQUIREMENTS_KEYS)
+                break
+            except ResponseParseError as e:
+                print(f"Attempt {attempt}/{MAX_PARSE_ATTEMPTS}: invalid job description JSON: {str(e)}")
         
-        # Parse the response into a dictionary
-        extracted_data = json.loads(response.choices[0].message.content)
+        if extracted_data is None:
+            print("Error in analyze_job_description: no valid JSON response after retries")
+            return None
         
         # Add the original job description to the output
         extracted_data["original_job_description"] = job_description
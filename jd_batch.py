@@ -0,0 +1,167 @@
+import argparse
+import hashlib
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from jd_analyzer import analyze_job_description
+
+# Default number of job descriptions analyzed at the same time. Model calls are
+# additionally throttled by the shared rate limiter in llm_utils.
+DEFAULT_MAX_WORKERS = 4
+
+# File types picked up when a directory of job descriptions is given
+JD_FILE_EXTENSIONS = ('.txt', '.md')
+
+
+def requirements_id_for(job_description):
+    """Returns a stable requirements id derived from the job description text."""
+    return hashlib.sha256(job_description.strip().encode('utf-8')).hexdigest()[:12]
+
+
+def job_description_entry(job_description, requirements_id=None, title=None):
+    """Builds a normalized job description entry."""
+    return {
+        "id": requirements_id or requirements_id_for(job_description),
+        "title": title or "",
+        "job_description": job_description
+    }
+
+
+def parse_job_descriptions_jsonl(lines):
+    """
+    Parses JSONL job descriptions. Each line is an object with a `job_description`
+    (or `text`) field and optional `id` and `title` fields.
+    """
+    entries = []
+    for line_number, line in enumerate(lines, 1):
+        if isinstance(line, bytes):
+            line = line.decode('utf-8')
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            print(f"Skipping invalid JSONL line {line_number}: {str(e)}")
+            continue
+        job_description = record.get('job_description') or record.get('text')
+        if not job_description:
+            print(f"Skipping JSONL line {line_number}: no job_description field")
+            continue
+        entries.append(job_description_entry(job_description, record.get('id'), record.get('title')))
+    return entries
+
+
+def duplicate_ids(entries):
+    """Returns the requirements ids used by more than one entry, in first-seen order."""
+    seen = set()
+    duplicates = []
+    for entry in entries:
+        if entry['id'] in seen and entry['id'] not in duplicates:
+            duplicates.append(entry['id'])
+        seen.add(entry['id'])
+    return duplicates
+
+
+def load_job_descriptions(path):
+    """
+    Loads job descriptions from a JSONL file or from a directory of text files.
+    Files in a directory use their name (without extension) as the requirements id.
+    """
+    if os.path.isdir(path):
+        entries = []
+        for name in sorted(os.listdir(path)):
+            if not name.lower().endswith(JD_FILE_EXTENSIONS):
+                continue
+            with open(os.path.join(path, name), encoding='utf-8') as f:
+                job_description = f.read()
+            if job_description.strip():
+                stem = os.path.splitext(name)[0]
+                entries.append(job_description_entry(job_description, stem, stem))
+        return entries
+
+    with open(path, encoding='utf-8') as f:
+        return parse_job_descriptions_jsonl(f)
+
+
+def analyze_job_descriptions(entries, model="gpt-4.1", max_workers=DEFAULT_MAX_WORKERS):
+    """
+    Analyzes many job descriptions concurrently.
+    Returns a dictionary mapping each requirements id to its requirements (None on failure).
+    Raises ValueError if two entries share a requirements id, since one result would
+    silently replace the other.
+
+    Args:
+        entries (list): Entries with `id` and `job_description` keys
+        model (str): The OpenAI model to use for analysis
+        max_workers (int): Number of job descriptions analyzed at the same time
+    """
+    duplicates = duplicate_ids(entries)
+    if duplicates:
+        raise ValueError(f"Duplicate job description ids: {', '.join(duplicates)}")
+
+    results = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(analyze_job_description, entry['job_description'], model): entry
+            for entry in entries
+        }
+        for done, future in enumerate(as_completed(futures), 1):
+            entry = futures[future]
+            try:
+                requirements = future.result()
+            except Exception as e:
+                print(f"Error analyzing job description {entry['id']}: {str(e)}")
+                requirements = None
+            if requirements is not None and entry.get('title'):
+                requirements['title'] = entry['title']
+            results[entry['id']] = requirements
+            status = "ok" if requirements else "failed"
+            print(f"[{done}/{len(entries)}] {entry['id']}: {status}")
+    return results
+
+
+def save_requirements(results, output_dir):
+    """Writes each analyzed JD to <output_dir>/<id>.json and returns the ids written."""
+    os.makedirs(output_dir, exist_ok=True)
+    written = []
+    for requirements_id, requirements in results.items():
+        if requirements is None:
+            continue
+        with open(os.path.join(output_dir, f"{requirements_id}.json"), 'w', encoding='utf-8') as f:
+            json.dump(requirements, f, indent=2)
+        written.append(requirements_id)
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Analyze many job descriptions at once")
+    parser.add_argument("input", help="JSONL file or directory of .txt/.md job descriptions")
+    parser.add_argument("--output-dir", default="requirements", help="Directory for <id>.json requirement files")
+    parser.add_argument("--model", default="gpt-4.1", help="OpenAI model used for JD analysis")
+    parser.add_argument("--workers", type=int, default=DEFAULT_MAX_WORKERS, help="Concurrent analyses")
+    args = parser.parse_args()
+
+    entries = load_job_descriptions(args.input)
+    if not entries:
+        print(f"No job descriptions found in {args.input}")
+        return 1
+    duplicates = duplicate_ids(entries)
+    if duplicates:
+        print(f"Duplicate job description ids in {args.input}: {', '.join(duplicates)}")
+        return 1
+
+    print(f"Analyzing {len(entries)} job descriptions with {args.workers} workers...")
+    results = analyze_job_descriptions(entries, model=args.model, max_workers=args.workers)
+    written = save_requirements(results, args.output_dir)
+    failed = [requirements_id for requirements_id, requirements in results.items() if requirements is None]
+
+    print(f"Saved {len(written)} requirement sets to {args.output_dir}")
+    if failed:
+        print(f"Failed: {', '.join(failed)}")
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
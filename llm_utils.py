@@ -0,0 +1,608 @@
+import json
+import os
+import re
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dotenv import load_dotenv
+
+try:
+    import orjson
+except ImportError:  # orjson is optional, the stdlib parser is used as a fallback
+    orjson = None
+
+# Load environment variables once, for every module that reads its settings or the API key
+load_dotenv()
+
+# Model families that accept `response_format={"type": "json_schema", "strict": True}`
+STRUCTURED_OUTPUT_MODEL_PREFIXES = ("gpt-4o", "gpt-4.1", "o1", "o3", "o4-mini")
+STRUCTURED_OUTPUT_UNSUPPORTED = ("o1-mini", "o1-preview")
+
+# Number of times a single item is re-requested when its response cannot be parsed
+MAX_PARSE_ATTEMPTS = 2
+
+# Follow-up requests allowed when a response stops at the max_tokens limit
+MAX_CONTINUATIONS = 3
+CONTINUATION_PROMPT = (
+    "Your previous reply was cut off. Continue exactly where it stopped, "
+    "without repeating any earlier text and without any prefix."
+)
+
+# Rough characters-per-token ratio used for budgeting prompts and outputs
+CHARS_PER_TOKEN = 4
+
+# Shared client-side request rate limit for every model call made through this module
+REQUESTS_PER_MINUTE = int(os.getenv("OPENAI_REQUESTS_PER_MINUTE", "500"))
+
+# Hedged requests: when a call runs longer than the tracked p90 latency of its model, an
+# identical second request is sent and whichever answers first is used. Only call sites
+# that opt in (hedge=True) are hedged, and only while OPENAI_HEDGE_REQUESTS is enabled.
+HEDGE_REQUESTS = os.getenv("OPENAI_HEDGE_REQUESTS", "false").lower() in ("1", "true", "yes")
+HEDGE_PERCENTILE = 0.9
+# At most this fraction of hedged-eligible calls may send a second request
+HEDGE_MAX_RATE = float(os.getenv("OPENAI_HEDGE_MAX_RATE", "0.1"))
+# Latency samples needed per model before hedging starts, and samples kept per model
+HEDGE_MIN_SAMPLES = 20
+HEDGE_LATENCY_WINDOW = 200
+
+# API key verification results are reused for this long. Once a result is older than
+# API_KEY_REFRESH_SECONDS it is still served while a background check refreshes it.
+API_KEY_CHECK_TTL_SECONDS = int(os.getenv("API_KEY_CHECK_TTL_SECONDS", "900"))
+API_KEY_REFRESH_SECONDS = int(os.getenv("API_KEY_REFRESH_SECONDS", "600"))
+# Checks that failed for reasons other than the key itself (network, outage) are retried sooner
+API_KEY_ERROR_TTL_SECONDS = 30
+
+_CODE_FENCE_RE = re.compile(r"^\s*```(?:json)?\s*|\s*```\s*$", re.IGNORECASE)
+_TRAILING_COMMA_RE = re.compile(r",\s*([}\]])")
+
+
+class ResponseParseError(ValueError):
+    """Raised when a model response cannot be turned into the expected JSON object."""
+
+
+class RateLimiter:
+    """
+    Thread-safe limiter that spaces requests evenly so that no more than
+    `requests_per_minute` are started across all threads sharing it.
+    """
+
+    def __init__(self, requests_per_minute):
+        self.interval = 60.0 / requests_per_minute if requests_per_minute > 0 else 0.0
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+
+    def acquire(self):
+        """Blocks until the caller may start its request."""
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        delay = slot - now
+        if delay > 0:
+            time.sleep(delay)
+
+
+rate_limiter = RateLimiter(REQUESTS_PER_MINUTE)
+
+
+def _percentile(samples, fraction):
+    """Nearest-rank percentile of a list of numbers (None if empty)."""
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class RequestHedger:
+    """
+    Sends a backup request for calls that exceed the model's recent p90 latency and
+    returns whichever response arrives first. Hedges are capped at `max_rate` of all
+    calls, and the losing request is left to finish in the background (its result is dropped).
+    """
+
+    def __init__(self, enabled=HEDGE_REQUESTS, max_rate=HEDGE_MAX_RATE, percentile=HEDGE_PERCENTILE,
+                 min_samples=HEDGE_MIN_SAMPLES, window=HEDGE_LATENCY_WINDOW, max_workers=32):
+        self.enabled = enabled
+        self.max_rate = max_rate
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.window = window
+        self.max_workers = max_workers
+        self._executor = None
+        self._lock = threading.Lock()
+        self._latencies = {}
+        self._observed = deque(maxlen=window)
+        self.calls = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.seconds_saved = 0.0
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="hedge")
+            return self._executor
+
+    def _record_latency(self, model, seconds):
+        with self._lock:
+            self._latencies.setdefault(model, deque(maxlen=self.window)).append(seconds)
+
+    def hedge_delay(self, model):
+        """Returns the p90 latency after which a call to `model` is hedged, or None if unknown."""
+        with self._lock:
+            samples = list(self._latencies.get(model, ()))
+        if len(samples) < self.min_samples:
+            return None
+        return _percentile(samples, self.percentile)
+
+    def _take_hedge_budget(self):
+        with self._lock:
+            if self.hedges + 1 > self.max_rate * self.calls:
+                return False
+            self.hedges += 1
+            return True
+
+    def _timed(self, fn, model):
+        started = time.monotonic()
+        result = fn()
+        self._record_latency(model, time.monotonic() - started)
+        return result
+
+    def call(self, fn, model):
+        """Runs fn(), hedging it with a second fn() if it is slower than usual for `model`."""
+        with self._lock:
+            self.calls += 1
+        delay = self.hedge_delay(model)
+        if not self.enabled or delay is None:
+            started = time.monotonic()
+            result = self._timed(fn, model)
+            with self._lock:
+                self._observed.append(time.monotonic() - started)
+            return result
+
+        started = time.monotonic()
+        executor = self._get_executor()
+        primary = executor.submit(self._timed, fn, model)
+        done, _ = wait([primary], timeout=delay)
+        if done or not self._take_hedge_budget():
+            result = primary.result()
+            with self._lock:
+                self._observed.append(time.monotonic() - started)
+            return result
+
+        print(f"Request to {model} exceeded p90 latency ({delay:.1f}s), sending hedged request")
+        hedge = executor.submit(self._timed, fn, model)
+        pending = {primary, hedge}
+        error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is not None:
+                    error = future.exception()
+                    continue
+                elapsed = time.monotonic() - started
+                with self._lock:
+                    self._observed.append(elapsed)
+                if future is hedge:
+                    with self._lock:
+                        self.hedge_wins += 1
+                    primary.add_done_callback(lambda f: self._record_saving(f, started, elapsed))
+                return future.result()
+        raise error
+
+    def _record_saving(self, primary, started, hedged_elapsed):
+        """Once the overtaken primary request finishes, records how much time the hedge saved."""
+        if primary.exception() is None:
+            with self._lock:
+                self.seconds_saved += max(0.0, time.monotonic() - started - hedged_elapsed)
+
+    def stats(self):
+        with self._lock:
+            latencies = {model: list(samples) for model, samples in self._latencies.items()}
+            observed = list(self._observed)
+            stats = {
+                "enabled": self.enabled,
+                "calls": self.calls,
+                "hedges": self.hedges,
+                "hedge_rate": round(self.hedges / self.calls, 4) if self.calls else 0.0,
+                "hedge_wins": self.hedge_wins,
+                "seconds_saved": round(self.seconds_saved, 2),
+            }
+        stats["request_latency_p90"] = {
+            model: round(_percentile(samples, self.percentile), 3) for model, samples in latencies.items()
+        }
+        stats["observed_latency"] = {
+            name: (round(value, 3) if value is not None else None)
+            for name, value in (("p50", _percentile(observed, 0.5)), ("p90", _percentile(observed, 0.9)),
+                                ("p99", _percentile(observed, 0.99)))
+        }
+        return stats
+
+
+request_hedger = RequestHedger()
+
+
+def supports_structured_outputs(model):
+    """Returns True if the model supports strict JSON-schema structured outputs."""
+    if not model:
+        return False
+    if model.startswith(STRUCTURED_OUTPUT_UNSUPPORTED):
+        return False
+    return model.startswith(STRUCTURED_OUTPUT_MODEL_PREFIXES)
+
+
+def json_response_format(model, name, schema, fallback=None):
+    """
+    Builds the `response_format` argument for a chat completion.
+    Uses a strict JSON schema when the model supports it, otherwise returns `fallback`
+    (which may be None to omit the argument entirely).
+    """
+    if supports_structured_outputs(model):
+        return {
+            "type": "json_schema",
+            "json_schema": {"name": name, "strict": True, "schema": schema}
+        }
+    return fallback
+
+
+def estimate_tokens(text):
+    """Cheap token estimate for budgeting; avoids loading a tokenizer."""
+    return len(text or "") // CHARS_PER_TOKEN + 1
+
+
+def loads_json(text):
+    """Parses JSON text with orjson when available."""
+    if orjson is not None:
+        return orjson.loads(text)
+    return json.loads(text)
+
+
+def _close_truncated_json(text):
+    """
+    Closes an unterminated string and any open objects/arrays.
+    Returns the closed text and the offsets of top-level-safe cut points (commas outside strings).
+    """
+    stack = []
+    cut_points = []
+    in_string = False
+    escaped = False
+
+    for i, ch in enumerate(text):
+        if in_string:
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == '"':
+                in_string = False
+            continue
+
+        if ch == '"':
+            in_string = True
+        elif ch in "{[":
+            stack.append("}" if ch == "{" else "]")
+        elif ch in "}]":
+            if stack:
+                stack.pop()
+        elif ch == ",":
+            cut_points.append(i)
+
+    closed = text
+    if in_string:
+        if escaped:
+            closed = closed[:-1]
+        closed += '"'
+    closed = closed.rstrip()
+    # A dangling separator cannot be completed, drop it before closing the containers
+    while closed.endswith((",", ":")):
+        closed = closed[:-1].rstrip()
+    closed += "".join(reversed(stack))
+    return closed, cut_points
+
+
+def repair_json(text):
+    """
+    Best-effort local repair of a malformed or truncated JSON object.
+    Handles markdown code fences, leading/trailing prose, trailing commas and
+    output that was cut off mid-string or mid-object.
+    Returns the parsed object or raises ResponseParseError.
+    """
+    if not text:
+        raise ResponseParseError("Empty response")
+
+    candidate = _CODE_FENCE_RE.sub("", text.strip())
+    start = candidate.find("{")
+    if start == -1:
+        raise ResponseParseError("No JSON object found in response")
+    candidate = candidate[start:]
+
+    end = candidate.rfind("}")
+    attempts = []
+    if end != -1:
+        attempts.append(candidate[:end + 1])
+    attempts.append(candidate)
+
+    for attempt in attempts:
+        attempt = _TRAILING_COMMA_RE.sub(r"\1", attempt)
+        try:
+            return loads_json(attempt)
+        except ValueError:
+            pass
+
+    # Truncated output: close what is open, then walk back through earlier cut points
+    # until the remaining prefix forms a valid document
+    truncated = _TRAILING_COMMA_RE.sub(r"\1", candidate)
+    closed, cut_points = _close_truncated_json(truncated)
+    for cut in [None] + list(reversed(cut_points)):
+        if cut is not None:
+            closed, _ = _close_truncated_json(truncated[:cut])
+        try:
+            return loads_json(closed)
+        except ValueError:
+            continue
+
+    raise ResponseParseError("Could not repair JSON response")
+
+
+def parse_json_response(text, required_keys=()):
+    """
+    Parses a model response into a dictionary.
+    Tries a strict parse first, then the local repair pass, and finally checks that
+    every key in `required_keys` is present.
+
+    Args:
+        text (str): The raw message content returned by the model
+        required_keys (iterable): Top-level keys the result must contain
+    """
+    try:
+        data = loads_json(text)
+    except (TypeError, ValueError):
+        data = repair_json(text)
+        print("Repaired malformed JSON response locally")
+
+    if not isinstance(data, dict):
+        raise ResponseParseError(f"Expected a JSON object, got {type(data).__name__}")
+
+    missing = [key for key in required_keys if key not in data]
+    if missing:
+        raise ResponseParseError(f"Response is missing keys: {', '.join(missing)}")
+
+    return data
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def _observe_response(response):
+    """HTTP hook on the shared client: an authentication failure anywhere drops the cached key check."""
+    if response.status_code == 401:
+        api_key_verifier.invalidate()
+
+
+def get_client():
+    """
+    Returns the OpenAI client shared by every module, created on first use. The openai
+    package is only imported at that point, which keeps importing the analyzers cheap.
+    """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                from openai import DefaultHttpxClient, OpenAI
+                _client = OpenAI(
+                    api_key=os.getenv("OPENAI_API_KEY"),
+                    http_client=DefaultHttpxClient(event_hooks={"response": [_observe_response]})
+                )
+    return _client
+
+
+class ApiKeyVerifier:
+    """
+    Caches whether the OpenAI API key works. A check lists the available models, which
+    costs no tokens. Results are reused for `ttl` seconds and refreshed in the background
+    once older than `refresh_after`; a 401 seen on any request through the shared client
+    marks the key as rejected, so the next check verifies it again. A rejected key is
+    re-verified in the background when cached_status() is read, at most every `error_ttl`
+    seconds, so readiness recovers without a forced check.
+    """
+
+    def __init__(self, ttl=API_KEY_CHECK_TTL_SECONDS, refresh_after=API_KEY_REFRESH_SECONDS,
+                 error_ttl=API_KEY_ERROR_TTL_SECONDS):
+        self.ttl = ttl
+        self.refresh_after = refresh_after
+        self.error_ttl = error_ttl
+        self._lock = threading.Lock()
+        self._check_lock = threading.Lock()
+        self._result = None
+        self._refreshing = False
+        self._local = threading.local()  # Marks threads running a check, whose 401s are not invalidations
+        self.checks = 0
+        self.invalidations = 0
+
+    def _check(self):
+        """Verifies the key against the API and stores the result."""
+        from openai import AuthenticationError, PermissionDeniedError
+
+        with self._lock:
+            self.checks += 1
+        self._local.checking = True
+        try:
+            get_client().models.list()
+            result = {"valid": True, "message": "API key is working", "expires_after": self.ttl}
+        except (AuthenticationError, PermissionDeniedError) as e:
+            result = {"valid": False, "message": f"API key error: {str(e)}", "expires_after": self.ttl,
+                      "auth_failed": True}
+        except Exception as e:
+            result = {"valid": False, "message": f"Could not verify API key: {str(e)}", "expires_after": self.error_ttl}
+        finally:
+            self._local.checking = False
+        result["checked_at"] = time.time()
+        with self._lock:
+            self._result = result
+        return result
+
+    def _refresh_in_background(self):
+        try:
+            with self._check_lock:
+                self._check()
+        except Exception as e:
+            print(f"Background API key check failed: {str(e)}")
+        finally:
+            with self._lock:
+                self._refreshing = False
+
+    def status(self, force=False):
+        """
+        Returns {"valid", "message", "checked_at", "age_seconds"}, verifying the key only when
+        there is no usable cached result (or `force` is set).
+        """
+        with self._lock:
+            result = self._result
+            age = time.time() - result["checked_at"] if result else None
+            fresh = result is not None and not force and age < result["expires_after"]
+            start_refresh = fresh and result["valid"] and age >= self.refresh_after and not self._refreshing
+            if start_refresh:
+                self._refreshing = True
+
+        if start_refresh:
+            threading.Thread(target=self._refresh_in_background, daemon=True, name="api-key-refresh").start()
+
+        if not fresh:
+            # Concurrent callers wait for one check instead of each making their own
+            waiting_since = time.time()
+            with self._check_lock:
+                with self._lock:
+                    result = self._result
+                if result is None or result["checked_at"] < waiting_since:
+                    result = self._check()
+            age = time.time() - result["checked_at"]
+
+        return {"valid": result["valid"], "message": result["message"],
+                "checked_at": result["checked_at"], "age_seconds": round(age, 1)}
+
+    def cached_status(self):
+        """
+        Returns the last check's result without contacting the API. "valid" is None when the
+        key has not been checked recently; a rejected key stays invalid until checked again,
+        which this starts in the background.
+        """
+        with self._lock:
+            result = self._result
+            start_recheck = (result is not None and result.get("auth_failed") and not self._refreshing
+                             and time.time() - result["checked_at"] >= min(result["expires_after"], self.error_ttl))
+            if start_recheck:
+                self._refreshing = True
+
+        if start_recheck:
+            threading.Thread(target=self._refresh_in_background, daemon=True, name="api-key-recheck").start()
+
+        if result is None or (time.time() - result["checked_at"] >= result["expires_after"]
+                              and not result.get("auth_failed")):
+            return {"valid": None, "message": "API key not verified recently"}
+        return {"valid": result["valid"], "message": result["message"], "checked_at": result["checked_at"]}
+
+    def invalidate(self):
+        """Records an authentication failure seen in normal traffic; the next status() checks again."""
+        if getattr(self._local, "checking", False):
+            # The check itself got the 401 and records the result
+            return
+        with self._lock:
+            if self._result is None or self._result["valid"]:
+                self.invalidations += 1
+            self._result = {"valid": False, "message": "API key was rejected by a recent request",
+                            "expires_after": 0, "auth_failed": True, "checked_at": time.time()}
+
+    def stats(self):
+        with self._lock:
+            return {"checks": self.checks, "invalidations": self.invalidations,
+                    "cached": self._result is not None and self._result["expires_after"] > 0}
+
+
+api_key_verifier = ApiKeyVerifier()
+
+
+def create_json_completion(client, response_format=None, fallback_format=None, hedge=False, **kwargs):
+    """
+    Calls `client.chat.completions.create` with the given response format.
+    If the API rejects a strict JSON schema, the call is repeated once with `fallback_format`.
+    With `hedge=True`, unusually slow calls are raced against a second identical request
+    (see RequestHedger).
+    """
+    def call():
+        from openai import BadRequestError  # already imported by get_client()
+
+        rate_limiter.acquire()
+        if response_format is None:
+            return client.chat.completions.create(**kwargs)
+
+        try:
+            return client.chat.completions.create(response_format=response_format, **kwargs)
+        except BadRequestError as e:
+            if response_format.get("type") != "json_schema":
+                raise
+            print(f"Structured output schema rejected, retrying without it: {str(e)}")
+            rate_limiter.acquire()
+            if fallback_format is None:
+                return client.chat.completions.create(**kwargs)
+            return client.chat.completions.create(response_format=fallback_format, **kwargs)
+
+    if hedge:
+        return request_hedger.call(call, kwargs.get("model"))
+    return call()
+
+
+def create_completion_with_continuation(client, messages, max_continuations=MAX_CONTINUATIONS,
+                                       response_format=None, fallback_format=None, **kwargs):
+    """
+    Runs a chat completion and, while it stops with `finish_reason == "length"`,
+    asks the model to resume from the partial output instead of restarting.
+    Returns the concatenated content and the final finish reason.
+
+    Continuations are sent without `response_format`, since a schema would force
+    the model to start a new JSON document rather than extend the partial one.
+    """
+    response = create_json_completion(
+        client,
+        response_format=response_format,
+        fallback_format=fallback_format,
+        messages=messages,
+        **kwargs
+    )
+    choice = response.choices[0]
+    content = choice.message.content or ""
+
+    continuations = 0
+    while choice.finish_reason == "length" and continuations < max_continuations:
+        continuations += 1
+        print(f"Response hit the token limit after {len(content)} characters, "
+              f"requesting continuation {continuations}/{max_continuations}")
+        rate_limiter.acquire()
+        response = client.chat.completions.create(
+            messages=messages + [
+                {"role": "assistant", "content": content},
+                {"role": "user", "content": CONTINUATION_PROMPT}
+            ],
+            **kwargs
+        )
+        choice = response.choices[0]
+        content += choice.message.content or ""
+
+    return content, choice.finish_reason
+
+
+def stream_completion(client, **kwargs):
+    """
+    Runs a streaming chat completion and yields the text of each content delta as it arrives.
+    """
+    rate_limiter.acquire()
+    stream = client.chat.completions.create(stream=True, **kwargs)
+    for chunk in stream:
+        if not chunk.choices:
+            continue
+        delta = chunk.choices[0].delta.content
+        if delta:
+            yield delta
@@ -0,0 +1,71 @@
+import tempfile
+
+from werkzeug.sansio.multipart import Data, Epilogue, Field, File, MultipartDecoder, NeedData
+
+# Bytes read from the request body per step
+READ_CHUNK_SIZE = 64 * 1024
+
+# Uploaded files are kept in memory up to this size and spooled to disk beyond it
+SPOOL_MAX_BYTES = 1024 * 1024
+
+# Upper bound on the size of a single non-file form field
+MAX_FIELD_BYTES = 64 * 1024
+
+
+def iter_multipart_parts(stream, boundary, opened_files, chunk_size=READ_CHUNK_SIZE):
+    """
+    Parses a multipart/form-data body incrementally and yields each part as soon as
+    its last byte has arrived, instead of waiting for the whole body.
+    Yields ("field", name, value) for form fields and ("file", filename, file) for
+    uploads, where `file` is a rewound file-like object holding that part only.
+    Files are still being read by the caller after they are yielded, so closing them is
+    left to the caller: every file created is appended to `opened_files` (see close_files).
+
+    Args:
+        stream: The raw request body stream
+        boundary (bytes): Multipart boundary from the Content-Type header
+        opened_files (list): Receives every spooled file created for an uploaded part
+        chunk_size (int): Bytes read from the stream per step
+    """
+    decoder = MultipartDecoder(boundary, max_form_memory_size=MAX_FIELD_BYTES)
+    current = None
+
+    while True:
+        chunk = stream.read(chunk_size)
+        decoder.receive_data(chunk or None)
+
+        event = decoder.next_event()
+        while not isinstance(event, (NeedData, Epilogue)):
+            if isinstance(event, File):
+                current = ("file", event.filename, tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_BYTES))
+                opened_files.append(current[2])
+            elif isinstance(event, Field):
+                current = ("field", event.name, bytearray())
+            elif isinstance(event, Data) and current is not None:
+                kind, name, target = current
+                if kind == "file":
+                    target.write(event.data)
+                else:
+                    target.extend(event.data)
+                if not event.more_data:
+                    if kind == "file":
+                        target.seek(0)
+                        yield kind, name, target
+                    else:
+                        yield kind, name, target.decode("utf-8")
+                    current = None
+            event = decoder.next_event()
+
+        if isinstance(event, Epilogue):
+            return
+        if not chunk:
+            raise ValueError("Multipart body ended before the closing boundary")
+
+
+def close_files(files):
+    """Closes the spooled files from iter_multipart_parts, removing any rolled over to disk."""
+    for file in files:
+        try:
+            file.close()
+        except Exception as e:
+            print(f"Error closing uploaded part: {str(e)}")
@@ -0,0 +1,136 @@
+import base64
+import json
+
+# Fields returned for each result in list views; the nested analysis is fetched per result
+LIST_FIELDS = (
+    'id', 'filename', 'full_name', 'location', 'recommendation', 'semantic_percentage',
+    'quantitative_percentage', 'skill_coverage', 'must_have_coverage'
+)
+
+# Sortable fields, by the short names accepted in the query string
+SORT_FIELDS = {
+    'semantic': 'semantic_percentage',
+    'quantitative': 'quantitative_percentage',
+}
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+
+def must_have_coverage(analysis):
+    """Returns the percentage of must-have requirements the candidate meets."""
+    must_have = (analysis.get('requirement_match') or {}).get('must_have_requirements') or {}
+    verdicts = [value for group in must_have.values() if isinstance(group, dict) for value in group.values()]
+    return round(100 * sum(1 for value in verdicts if value) / len(verdicts)) if verdicts else 0
+
+
+def index_results(results):
+    """
+    Returns copies of the result entries with an `id` (their position) and the summary
+    fields list views filter and display on, computed once instead of per request.
+    """
+    indexed = []
+    for position, result in enumerate(results):
+        analysis = result.get('analysis') or {}
+        contact_info = analysis.get('contact_info') or {}
+        indexed.append({
+            **result,
+            'id': position,
+            'full_name': contact_info.get('full_name') or '',
+            'location': contact_info.get('location') or '',
+            'recommendation': analysis.get('final_recommendation') or '',
+            'must_have_coverage': must_have_coverage(analysis),
+        })
+    return indexed
+
+
+def filter_results(results, recommendation=None, min_must_have=None, location=None):
+    """
+    Keeps the results matching every given filter.
+
+    Args:
+        results (list): Indexed result entries
+        recommendation (str): Final recommendation to match, case-insensitively ("Yes"/"No")
+        min_must_have (int): Minimum must-have coverage percentage
+        location (str): Text the candidate's location must contain, case-insensitively
+    """
+    recommendation = recommendation.lower() if recommendation else None
+    location = location.lower() if location else None
+    return [
+        result for result in results
+        if (recommendation is None or result['recommendation'].lower() == recommendation)
+        and (min_must_have is None or result['must_have_coverage'] >= min_must_have)
+        and (location is None or location in result['location'].lower())
+    ]
+
+
+def project(result, fields):
+    """Returns only the requested fields of a result entry."""
+    return {field: result[field] for field in fields if field in result}
+
+
+def encode_cursor(state):
+    return base64.urlsafe_b64encode(json.dumps(state, separators=(',', ':')).encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(cursor):
+    """Decodes a cursor from encode_cursor. Raises ValueError for malformed cursors."""
+    try:
+        state = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+    except Exception:
+        raise ValueError("Malformed cursor")
+    if not isinstance(state, dict) or not isinstance(state.get('after'), list) or len(state['after']) != 2:
+        raise ValueError("Malformed cursor")
+    return state
+
+
+def query_results(results, sort='semantic', order='desc', limit=DEFAULT_PAGE_SIZE, cursor=None,
+                  version=None, **filters):
+    """
+    Returns one page of results as (page, next_cursor, total_matching).
+    Pages are keyed on (sort value, id) of the last result returned, so a cursor keeps
+    working when filters drop results before it. Cursors are tied to the sort, order and
+    results version they were issued for.
+
+    Args:
+        results (list): Indexed result entries
+        sort (str): "semantic" or "quantitative"
+        order (str): "desc" or "asc"
+        limit (int): Results per page, capped at MAX_PAGE_SIZE
+        cursor (str): next_cursor from the previous page, or None for the first page
+        version (int): Version of the stored results; cursors from other versions are rejected
+        **filters: Passed to filter_results
+    """
+    if sort not in SORT_FIELDS:
+        raise ValueError(f"Unknown sort field: {sort}")
+    if order not in ('asc', 'desc'):
+        raise ValueError(f"Unknown sort order: {order}")
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    field = SORT_FIELDS[sort]
+    descending = order == 'desc'
+
+    def sort_key(result):
+        # Ties are broken by ascending id in either order
+        return (result[field], -result['id'] if descending else result['id'])
+
+    matching = filter_results(results, **filters)
+    matching.sort(key=sort_key, reverse=descending)
+
+    if cursor:
+        state = decode_cursor(cursor)
+        if (state.get('sort'), state.get('order'), state.get('version')) != (sort, order, version):
+            raise ValueError("Cursor does not match this query or the results have changed")
+        after_value, after_id = state['after']
+        after_key = sort_key({field: after_value, 'id': after_id})
+        matching_after = [result for result in matching
+                          if (sort_key(result) < after_key if descending else sort_key(result) > after_key)]
+    else:
+        matching_after = matching
+
+    page = matching_after[:limit]
+    next_cursor = None
+    if len(matching_after) > limit:
+        last = page[-1]
+        next_cursor = encode_cursor({'sort': sort, 'order': order, 'version': version,
+                                     'after': [last[field], last['id']]})
+    return page, next_cursor, len(matching)
@@ -1,57 +1,122 @@
 import json
-from openai import OpenAI
-import os
-from dotenv import load_dotenv
+from llm_utils import (
+    MAX_PARSE_ATTEMPTS,
+    ResponseParseError,
+    create_json_completion,
+    get_client,
+    json_response_format,
+    parse_json_response,
+)
+from single_flight import single_flight
+from verdict_cache import (
+    analysis_cache_key,
+    prune_known_requirements,
+    reassemble_requirement_match,
+    remember_verdicts,
+    verdict_resume_key,
+)
 
-# Load environment variables
-load_dotenv()
+# Top-level keys every resume analysis must contain
+RESUME_ANALYSIS_KEYS = (
+    "contact_info",
+    "requirement_match",
+    "qualitative_assessment",
+    "final_recommendation",
+    "summary_of_key_factors"
+)
 
-# Initialize OpenAI client
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+def _unique_items(items):
+    """Returns the non-empty string items of a list (or dict keys), de-duplicated in order."""
+    if isinstance(items, dict):
+        items = list(items)
+    if not isinstance(items, list):
+        return []
+    return list(dict.fromkeys(str(item) for item in items if item))
 
-def analyze_resume(resume_text, requirements, model="o4-mini"):
+def _object_schema(properties):
+    """Builds a strict JSON-schema object where every property is required."""
+    return {
+        "type": "object",
+        "properties": properties,
+        "required": list(properties),
+        "additionalProperties": False
+    }
+
+_STRING = {"type": "string"}
+_STRING_LIST = {"type": "array", "items": _STRING}
+
+_CONTACT_INFO_SCHEMA = _object_schema({
+    "full_name": _STRING,
+    "email": _STRING,
+    "phone": _STRING,
+    "location": _STRING,
+    "linkedin": _STRING,
+    "other_links": _STRING_LIST,
+    "age": _STRING,
+    "gender": _STRING,
+    "total_work_experience": _STRING,
+    "last_position": _STRING
+})
+
+_QUALITATIVE_ASSESSMENT_SCHEMA = _object_schema({
+    "inferred_skills_from_projects": _STRING_LIST,
+    "project_gravity": _STRING,
+    "ownership_and_initiative": _STRING,
+    "transferability_to_role": _STRING,
+    "recruiter_style_summary": _STRING
+})
+
+def _boolean_map_schema(items):
+    """Builds an object schema with one required boolean per requirement item."""
+    return _object_schema({item: {"type": "boolean"} for item in _unique_items(items)})
+
+def _evaluation_schema_properties(requirements):
+    """Schema properties for the JD-specific part of an analysis (everything but contact_info)."""
+    must_have = requirements.get('must_have_requirements', {}) or {}
+    good_to_have = requirements.get('good_to_have_requirements', {}) or {}
+
+    requirement_match = _object_schema({
+        "must_have_requirements": _object_schema({
+            "technical_skills": _boolean_map_schema(must_have.get('technical_skills', [])),
+            "experience": {"type": "boolean"},
+            "qualifications": {"type": "boolean"},
+            "core_responsibilities": _boolean_map_schema(must_have.get('core_responsibilities', []))
+        }),
+        "good_to_have_requirements": _object_schema({
+            "additional_skills": _boolean_map_schema(good_to_have.get('additional_skills', []))
+        }),
+        "additional_screening_criteria": _boolean_map_schema(requirements.get('additional_screening_criteria', []))
+    })
+
+    return {
+        "requirement_match": requirement_match,
+        "qualitative_assessment": _QUALITATIVE_ASSESSMENT_SCHEMA,
+        "final_recommendation": {"type": "string", "enum": ["Yes", "No"]},
+        "summary_of_key_factors": _STRING_LIST
+    }
+
+def build_resume_analysis_schema(requirements):
     """
-    Analyzes a resume against the structured requirements from the JD analyzer.
-    Returns a comprehensive analysis including quantitative matches and qualitative assessment.
-    
-    Args:
-        resume_text (str): The text content of the resume
-        requirements (dict): The JSON output from the JD analyzer containing:
-            - original_job_description
-            - must_have_requirements
-            - good_to_have_requirements
-            - additional_screening_criteria
-        model (str): The OpenAI model to use for analysis
+    Builds a strict JSON schema for the resume analysis output.
+    The requirement items of the JD become the property names of the boolean maps,
+    so the model cannot skip, rename or invent requirements.
     """
-    try:
-        # Format the requirements for the prompt
-        requirements_str = f"""
-Original Job Description:
-{requirements.get('original_job_description', '')}
+    return _object_schema({
+        "contact_info": _CONTACT_INFO_SCHEMA,
+        **_evaluation_schema_properties(requirements)
+    })
 
-Must-Have Requirements:
-{json.dumps(requirements.get('must_have_requirements', {}), indent=2)}
+def build_resume_matrix_schema(requirements_by_id):
+    """Builds a strict JSON schema for one resume evaluated against several requirement sets."""
+    return _object_schema({
+        "contact_info": _CONTACT_INFO_SCHEMA,
+        "evaluations": _object_schema({
+            requirements_id: _object_schema(_evaluation_schema_properties(requirements))
+            for requirements_id, requirements in requirements_by_id.items()
+        })
+    })
 
-Good-to-Have Requirements:
-{json.dumps(requirements.get('good_to_have_requirements', {}), indent=2)}
-
-Additional Screening Criteria:
-{json.dumps(requirements.get('additional_screening_criteria', []), indent=2)}
-"""
-        
-        # Debug: Log the requirements being used
-        print("\n" + "="*80)
-        print("JOB REQUIREMENTS BEING USED FOR ANALYSIS:")
-        print("="*80)
-        print(requirements_str)
-        print("="*80)
-        
-        response = client.chat.completions.create(
-            model=model,
-            messages=[
-                {
-                    "role": "system",
-                    "content": """You are a recruiter evaluating a candidate's resume against a given job description (JD). Based on the JD, evaluate whether the candidate meets the necessary requirements.
+RESUME_ANALYSIS_SYSTEM_PROMPT = """You are a recruiter evaluating a candidate's resume against a given job description (JD). Based on the JD, evaluate whether the candidate meets the necessary requirements.
 
                     ## Step 0: Contact Information Extraction
                     First, extract all available contact information from the resume:
@@ -157,10 +222,46 @@ Additional Screening Criteria:
                     ]
                     }
                     """
-                },
-                {
-                    "role": "user",
-                    "content": f"""You are a recruiter evaluating a candidate's resume against a given job description. Act like a human recruiter—use your intuition and read between the lines to assess the candidate's suitability. 
+
+def format_requirements_for_prompt(requirements):
+    """Formats a requirements dictionary as the job requirements block of the analysis prompt."""
+    return f"""
+Original Job Description:
+{requirements.get('original_job_description', '')}
+
+Must-Have Requirements:
+{json.dumps(requirements.get('must_have_requirements', {}), indent=2)}
+
+Good-to-Have Requirements:
+{json.dumps(requirements.get('good_to_have_requirements', {}), indent=2)}
+
+Additional Screening Criteria:
+{json.dumps(requirements.get('additional_screening_criteria', []), indent=2)}
+"""
+
+# Closing instruction of a single-job analysis prompt
+RESUME_OUTPUT_INSTRUCTION = "Output ONLY the JSON object as specified in the system prompt, with no additional text or formatting."
+
+def build_resume_analysis_messages(resume_text, requirements_str, output_instruction=RESUME_OUTPUT_INSTRUCTION):
+    """
+    Builds the chat messages for a resume analysis.
+    The resume precedes the job requirements so that analyses of the same resume
+    against different JDs share the longest possible prompt prefix (and prompt cache).
+
+    Args:
+        resume_text (str): The text content of the resume
+        requirements_str (str): Requirements formatted by format_requirements_for_prompt
+        output_instruction (str): Closing instruction on what to output
+            (MATRIX_OUTPUT_INSTRUCTION when evaluating several jobs at once)
+    """
+    return [
+        {
+            "role": "system",
+            "content": RESUME_ANALYSIS_SYSTEM_PROMPT
+        },
+        {
+            "role": "user",
+            "content": f"""You are a recruiter evaluating a candidate's resume against a given job description. Act like a human recruiter—use your intuition and read between the lines to assess the candidate's suitability. 
 
                     **IMPORTANT MATCHING GUIDELINES:**
                     - For technical skills: Look for exact matches or very similar technologies
@@ -170,25 +271,96 @@ Additional Screening Criteria:
 
                     First, perform a quantitative check to determine if the candidate meets each required skill, responsibility, and screening criterion. Then, provide a qualitative assessment, including inferred skills, project impact, ownership, and transferability, while considering the context beyond what's explicitly stated. Finally, give a recommendation ("Yes" or "No") with a brief explanation of the key factors that influenced your decision.
 
+                    ## Resume:
+                    {resume_text}
+
                     ## Job Requirements:
                     {requirements_str}
 
-                    ## Resume:
-                    {resume_text}
+                    {output_instruction}"""
+        }
+    ]
 
-                    Output ONLY the JSON object as specified in the system prompt, with no additional text or formatting."""
-                }
-            ],
+def analyze_resume(resume_text, requirements, model="o4-mini", use_verdict_cache=True, coalesce=True):
+    """
+    Analyzes a resume against the structured requirements from the JD analyzer.
+    Returns a comprehensive analysis including quantitative matches and qualitative assessment.
+    
+    Args:
+        resume_text (str): The text content of the resume
+        requirements (dict): The JSON output from the JD analyzer containing:
+            - original_job_description
+            - must_have_requirements
+            - good_to_have_requirements
+            - additional_screening_criteria
+        model (str): The OpenAI model to use for analysis
+        use_verdict_cache (bool): Reuse per-requirement verdicts already decided for this
+            resume (e.g. under another JD) and only ask the model about the rest
+        coalesce (bool): Share one in-flight model call between concurrent identical requests
+            (same resume content, requirements and model), across threads and worker processes
+    """
+    if not coalesce:
+        return _analyze_resume(resume_text, requirements, model, use_verdict_cache)
+    
+    key = analysis_cache_key(resume_text, requirements, model)
+    return single_flight.do(key, lambda: _analyze_resume(resume_text, requirements, model, use_verdict_cache))
+
+def _analyze_resume(resume_text, requirements, model, use_verdict_cache):
+    """Runs one resume analysis; see analyze_resume."""
+    try:
+        # Only ask about requirement items whose verdict for this resume and model is not cached yet
+        resume_key = verdict_resume_key(resume_text, model)
+        prompt_requirements, known_verdicts = requirements, {}
+        if use_verdict_cache:
+            prompt_requirements, known_verdicts = prune_known_requirements(resume_key, requirements)
+            if known_verdicts:
+                print(f"Reusing {len(known_verdicts)} cached requirement verdicts for this resume")
+        
+        # Format the requirements for the prompt
+        requirements_str = format_requirements_for_prompt(prompt_requirements)
         
-            response_format={
-                "type": "json_object"
-            },
-            reasoning_effort="high",
-            store=False
+        # Debug: Log the requirements being used
+        print("\n" + "="*80)
+        print("JOB REQUIREMENTS BEING USED FOR ANALYSIS:")
+        print("="*80)
+        print(requirements_str)
+        print("="*80)
+        
+        messages = build_resume_analysis_messages(resume_text, requirements_str)
+        
+        # Constrain the output to the JD's requirement items where the model supports it
+        json_mode = {"type": "json_object"}
+        response_format = json_response_format(
+            model, "resume_analysis", build_resume_analysis_schema(prompt_requirements), fallback=json_mode
         )
         
-        # Parse the response into a dictionary
-        analysis = json.loads(response.choices[0].message.content)
+        # Parse (and locally repair) the response, re-requesting only this resume on failure
+        analysis = None
+        for attempt in range(1, MAX_PARSE_ATTEMPTS + 1):
+            response = create_json_completion(
+                get_client(),
+                response_format=response_format,
+                fallback_format=json_mode,
+                model=model,
+                messages=messages,
+                reasoning_effort="high",
+                store=False,
+                hedge=True
+            )
+            try:
+                analysis = parse_json_response(response.choices[0].message.content, RESUME_ANALYSIS_KEYS)
+                break
+            except ResponseParseError as e:
+                print(f"Attempt {attempt}/{MAX_PARSE_ATTEMPTS}: invalid resume analysis JSON: {str(e)}")
+        
+        if analysis is None:
+            print("Error in analyze_resume: no valid JSON response after retries")
+            return None
+        
+        # Rebuild the full requirement_match from cached and freshly decided verdicts
+        if use_verdict_cache:
+            reassemble_requirement_match(analysis, requirements, known_verdicts)
+            remember_verdicts(resume_key, analysis, requirements)
         
         # Log the complete JSON response for debugging
         print("\n" + "="*80)
@@ -197,21 +369,111 @@ Additional Screening Criteria:
         print(json.dumps(analysis, indent=2))
         print("="*80)
         
-        # Calculate both quantitative and semantic scores
-        quantitative_score = calculate_quantitative_score(analysis)
-        semantic_score = calculate_semantic_score(analysis)
-        
-        return {
-            "quantitative_score": quantitative_score,
-            "semantic_score": semantic_score,
-            "score": quantitative_score,  # Keep for backward compatibility
-            "analysis": analysis
-        }
+        return finalize_resume_analysis(analysis)
         
     except Exception as e:
         print(f"Error in analyze_resume: {str(e)}")
         return None
 
+def finalize_resume_analysis(analysis, semantic_score=None):
+    """
+    Adds the quantitative and semantic scores to a parsed analysis.
+    The semantic score is requested from the model unless it is passed in.
+    """
+    quantitative_score = calculate_quantitative_score(analysis)
+    if semantic_score is None:
+        semantic_score = calculate_semantic_score(analysis)
+    
+    return {
+        "quantitative_score": quantitative_score,
+        "semantic_score": semantic_score,
+        "score": quantitative_score,  # Keep for backward compatibility
+        "analysis": analysis
+    }
+
+# Requirement sets evaluated in one matrix request; larger groups make the output
+# long enough that a single malformed response costs too much to redo
+MATRIX_MAX_JDS_PER_CALL = 4
+
+# Closing instruction of a matrix prompt, used instead of RESUME_OUTPUT_INSTRUCTION
+MATRIX_OUTPUT_INSTRUCTION = """The candidate is being considered for several open roles at once, each listed above under a "## Job <id>" header.
+                    Evaluate the resume independently against EACH job, exactly as you would for a single job.
+                    Instead of the single-job object from the system prompt, output ONLY one JSON object with:
+                    - "contact_info": the candidate's contact information, extracted once
+                    - "evaluations": an object keyed by job id, where each value holds that job's "requirement_match", "qualitative_assessment", "final_recommendation" and "summary_of_key_factors" in the format from the system prompt
+                    Do not add any other text or formatting."""
+
+def analyze_resume_matrix(resume_text, requirements_by_id, model="o4-mini"):
+    """
+    Analyzes one resume against several requirement sets in a single model request,
+    so the resume is sent (and its contact information extracted) only once.
+    Returns a dictionary mapping each requirements id to the same structure that
+    analyze_resume returns, or None for jobs the response did not cover.
+    
+    Args:
+        resume_text (str): The text content of the resume
+        requirements_by_id (dict): Requirement sets from the JD analyzer keyed by requirements id
+        model (str): The OpenAI model to use for analysis
+    """
+    results = {requirements_id: None for requirements_id in requirements_by_id}
+    try:
+        jobs_str = "\n".join(
+            f"## Job {requirements_id}:\n{format_requirements_for_prompt(requirements)}"
+            for requirements_id, requirements in requirements_by_id.items()
+        )
+        messages = build_resume_analysis_messages(resume_text, jobs_str, MATRIX_OUTPUT_INSTRUCTION)
+
+        json_mode = {"type": "json_object"}
+        response_format = json_response_format(
+            model, "resume_matrix_analysis", build_resume_matrix_schema(requirements_by_id), fallback=json_mode
+        )
+        
+        matrix = None
+        for attempt in range(1, MAX_PARSE_ATTEMPTS + 1):
+            response = create_json_completion(
+                get_client(),
+                response_format=response_format,
+                fallback_format=json_mode,
+                model=model,
+                messages=messages,
+                reasoning_effort="high",
+                store=False
+            )
+            try:
+                matrix = parse_json_response(response.choices[0].message.content, ("contact_info", "evaluations"))
+                break
+            except ResponseParseError as e:
+                print(f"Attempt {attempt}/{MAX_PARSE_ATTEMPTS}: invalid matrix analysis JSON: {str(e)}")
+        
+        if matrix is None:
+            print("Error in analyze_resume_matrix: no valid JSON response after retries")
+            return results
+        
+        evaluations = matrix.get("evaluations") or {}
+        analyses = {}
+        for requirements_id in requirements_by_id:
+            evaluation = evaluations.get(requirements_id)
+            if not isinstance(evaluation, dict):
+                print(f"Matrix response has no evaluation for job {requirements_id}")
+                continue
+            analysis = {"contact_info": matrix.get("contact_info", {}), **evaluation}
+            missing = [key for key in RESUME_ANALYSIS_KEYS if key not in analysis]
+            if missing:
+                print(f"Matrix evaluation for job {requirements_id} is missing keys: {', '.join(missing)}")
+                continue
+            analyses[requirements_id] = analysis
+
+        # One semantic scoring request for all the jobs instead of one per job
+        semantic_scores = calculate_semantic_scores(list(analyses.values()))
+        for (requirements_id, analysis), semantic_score in zip(analyses.items(), semantic_scores):
+            results[requirements_id] = finalize_resume_analysis(analysis, semantic_score)
+
+        return results
+        
+    except Exception as e:
+        print(f"Error in analyze_resume_matrix: {str(e)}")
+        return results
+
 def calculate_quantitative_score(analysis):
     """
     Calculates a simple score by counting the number of true values in all boolean fields.
@@ -267,34 +529,8 @@ def calculate_quantitative_score(analysis):
         print(f"Error calculating quantitative score: {str(e)}")
         return "0/0"
 
-def calculate_semantic_score(analysis):
-    """
-    Uses an LLM to calculate a semantic score based on the qualitative assessment.
-    Returns a percentage (0-100) representing how well the candidate fits the role semantically.
-    """
-    try:
-        # Extract relevant information from the analysis
-        qual_assessment = analysis.get("qualitative_assessment", {})
-        final_recommendation = analysis.get("final_recommendation", "")
-        summary_factors = analysis.get("summary_of_key_factors", [])
-        
-        # Prepare the prompt for LLM scoring
-        assessment_data = {
-            "transferability_to_role": qual_assessment.get("transferability_to_role", "N/A"),
-            "project_gravity": qual_assessment.get("project_gravity", "N/A"),
-            "ownership_and_initiative": qual_assessment.get("ownership_and_initiative", "N/A"),
-            "inferred_skills": qual_assessment.get("inferred_skills_from_projects", []),
-            "recruiter_summary": qual_assessment.get("recruiter_style_summary", ""),
-            "final_recommendation": final_recommendation,
-            "key_factors": summary_factors
-        }
-        
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {
-                    "role": "system",
-                    "content": """You are an expert recruiter tasked with calculating a semantic fit score for a candidate based on their qualitative assessment. 
+# Scoring instructions shared by single and batched semantic scoring requests
+SEMANTIC_SCORING_GUIDELINES = """You are an expert recruiter tasked with calculating a semantic fit score for a candidate based on their qualitative assessment. 
 
 Your job is to analyze the qualitative factors and provide a numerical score from 0-100 that represents how well this candidate would fit the role semantically (beyond just checking boxes).
 
@@ -313,7 +549,92 @@ Scoring Guidelines:
 - 40-49: Poor fit, major skill/experience gaps
 - 0-39: Very poor fit, not suitable for the role
 
-Output ONLY a JSON object with this structure:
+"""
+
+def semantic_assessment_data(analysis):
+    """Returns the qualitative parts of an analysis that the semantic score is based on."""
+    qual_assessment = analysis.get("qualitative_assessment", {})
+    return {
+        "transferability_to_role": qual_assessment.get("transferability_to_role", "N/A"),
+        "project_gravity": qual_assessment.get("project_gravity", "N/A"),
+        "ownership_and_initiative": qual_assessment.get("ownership_and_initiative", "N/A"),
+        "inferred_skills": qual_assessment.get("inferred_skills_from_projects", []),
+        "recruiter_summary": qual_assessment.get("recruiter_style_summary", ""),
+        "final_recommendation": analysis.get("final_recommendation", ""),
+        "key_factors": analysis.get("summary_of_key_factors", [])
+    }
+
+def calculate_semantic_scores(analyses):
+    """
+    Calculates the semantic scores of several analyses (e.g. one resume against several
+    jobs) in a single LLM request. Returns the scores in the same order; analyses the
+    response does not score are scored individually with calculate_semantic_score.
+    """
+    if len(analyses) <= 1:
+        return [calculate_semantic_score(analysis) for analysis in analyses]
+    
+    scores = {}
+    try:
+        assessments = {str(index): semantic_assessment_data(analysis) for index, analysis in enumerate(analyses)}
+        response = create_json_completion(
+            get_client(),
+            response_format={"type": "json_object"},
+            model="gpt-4o-mini",
+            messages=[
+                {
+                    "role": "system",
+                    "content": SEMANTIC_SCORING_GUIDELINES + """Each assessment is for a different role; score each one independently.
+
+Output ONLY a JSON object with this structure, keyed by the assessment ids you were given:
+{
+    "scores": {
+        "0": {"semantic_score": 85, "reasoning": "Brief explanation of the score based on the key factors"}
+    }
+}"""
+                },
+                {
+                    "role": "user",
+                    "content": f"""Based on the following qualitative assessments, calculate a semantic fit score (0-100) for each:
+
+**Assessments (keyed by id):**
+{json.dumps(assessments, indent=2)}
+
+Provide semantic scores that reflect how well this candidate would actually perform in each role, considering their experience transferability, project quality, leadership potential, and skill relevance."""
+                }
+            ],
+            temperature=0.3
+        )
+        
+        llm_result = parse_json_response(response.choices[0].message.content, ("scores",))
+        for key, value in (llm_result.get("scores") or {}).items():
+            try:
+                scores[key] = max(0, min(100, int(value["semantic_score"])))
+            except (KeyError, TypeError, ValueError):
+                print(f"Invalid semantic score for assessment {key}: {value}")
+        print(f"Semantic scores for {len(analyses)} assessments from one request: {scores}")
+    except Exception as e:
+        print(f"Error calculating semantic scores with LLM: {str(e)}")
+    
+    return [scores[str(index)] if str(index) in scores else calculate_semantic_score(analysis)
+            for index, analysis in enumerate(analyses)]
+
+def calculate_semantic_score(analysis):
+    """
+    Uses an LLM to calculate a semantic score based on the qualitative assessment.
+    Returns a percentage (0-100) representing how well the candidate fits the role semantically.
+    """
+    try:
+        # Prepare the prompt for LLM scoring
+        assessment_data = semantic_assessment_data(analysis)
+        
+        response = create_json_completion(
+            get_client(),
+            response_format={"type": "json_object"},
+            model="gpt-4o-mini",
+            messages=[
+                {
+                    "role": "system",
+                    "content": SEMANTIC_SCORING_GUIDELINES + """Output ONLY a JSON object with this structure:
 {
     "semantic_score": 85,
     "reasoning": "Brief explanation of the score based on the key factors"
@@ -329,12 +650,11 @@ Output ONLY a JSON object with this structure:
 Provide a semantic score that reflects how well this candidate would actually perform in the role, considering their experience transferability, project quality, leadership potential, and skill relevance."""
                 }
             ],
-            response_format={"type": "json_object"},
             temperature=0.3
         )
         
         # Parse the LLM response
-        llm_result = json.loads(response.choices[0].message.content)
+        llm_result = parse_json_response(response.choices[0].message.content, ("semantic_score",))
         semantic_score = llm_result.get("semantic_score", 0)
         reasoning = llm_result.get("reasoning", "")
         
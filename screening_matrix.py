@@ -0,0 +1,84 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from resume_analyzer import MATRIX_MAX_JDS_PER_CALL, analyze_resume, analyze_resume_matrix
+
+# Default number of model requests in flight while filling a matrix
+DEFAULT_MAX_WORKERS = 4
+
+
+def plan_matrix_calls(candidate_ids, requirements_ids, jds_per_call=MATRIX_MAX_JDS_PER_CALL):
+    """
+    Splits a candidates x JDs matrix into model calls.
+    Each call covers one candidate and up to `jds_per_call` requirement sets, so the
+    matrix is filled with ceil(len(requirements_ids) / jds_per_call) calls per candidate.
+    Returns a list of (candidate_id, [requirements_id, ...]) tuples.
+    """
+    requirements_ids = list(requirements_ids)
+    jds_per_call = max(1, jds_per_call)
+    calls = []
+    for candidate_id in candidate_ids:
+        for start in range(0, len(requirements_ids), jds_per_call):
+            calls.append((candidate_id, requirements_ids[start:start + jds_per_call]))
+    return calls
+
+
+def _run_call(resume_text, requirements_by_id, requirements_ids, model):
+    """Runs one planned call and returns {requirements_id: result}."""
+    if len(requirements_ids) == 1:
+        requirements_id = requirements_ids[0]
+        return {requirements_id: analyze_resume(resume_text, requirements_by_id[requirements_id], model=model)}
+
+    group = {requirements_id: requirements_by_id[requirements_id] for requirements_id in requirements_ids}
+    return analyze_resume_matrix(resume_text, group, model=model)
+
+
+def fill_candidate_matrix(resumes, requirements_by_id, model="o4-mini",
+                          jds_per_call=MATRIX_MAX_JDS_PER_CALL, max_workers=DEFAULT_MAX_WORKERS):
+    """
+    Evaluates every resume against every requirement set with as few model calls as possible.
+    Cells a grouped call fails to produce are retried individually with analyze_resume.
+    Returns a dictionary mapping (candidate_id, requirements_id) to an analyze_resume-style
+    result, or None when the cell could not be analyzed.
+
+    Args:
+        resumes (dict): Resume texts keyed by candidate id (e.g. file name)
+        requirements_by_id (dict): Requirement sets keyed by requirements id
+        model (str): The OpenAI model to use for analysis
+        jds_per_call (int): Maximum number of requirement sets per model request
+        max_workers (int): Number of model requests in flight
+    """
+    calls = plan_matrix_calls(resumes.keys(), requirements_by_id.keys(), jds_per_call)
+    print(f"Filling {len(resumes)}x{len(requirements_by_id)} matrix with {len(calls)} model calls")
+
+    matrix = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(_run_call, resumes[candidate_id], requirements_by_id, requirements_ids, model):
+                (candidate_id, requirements_ids)
+            for candidate_id, requirements_ids in calls
+        }
+        retries = {}
+        for future in as_completed(futures):
+            candidate_id, requirements_ids = futures[future]
+            try:
+                call_results = future.result()
+            except Exception as e:
+                print(f"Error in matrix call for {candidate_id}: {str(e)}")
+                call_results = {}
+            for requirements_id in requirements_ids:
+                result = call_results.get(requirements_id)
+                matrix[(candidate_id, requirements_id)] = result
+                if result is None and len(requirements_ids) > 1:
+                    # Targeted retry of just the missing cell
+                    retry = executor.submit(_run_call, resumes[candidate_id], requirements_by_id,
+                                            [requirements_id], model)
+                    retries[retry] = (candidate_id, requirements_id)
+
+        for future in as_completed(retries):
+            cell = retries[future]
+            try:
+                matrix[cell] = future.result()[cell[1]]
+            except Exception as e:
+                print(f"Error retrying matrix cell {cell}: {str(e)}")
+
+    return matrix
@@ -0,0 +1,145 @@
+import copy
+import json
+import os
+import tempfile
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:  # No fcntl (e.g. Windows): calls are only coalesced within one process
+    fcntl = None
+
+# Directory holding the lock and result files shared by worker processes on this host
+LOCK_DIR = os.getenv("SINGLE_FLIGHT_DIR", os.path.join(tempfile.gettempdir(), "resume-analyzer-single-flight"))
+
+# Result files older than this are removed; they are only needed by processes that were
+# already waiting when the call finished. Lock files are kept (they are empty), since
+# deleting one another process has open would let two processes lock different files.
+RESULT_FILE_TTL_SECONDS = 600
+
+
+class _InFlightCall:
+    """A call being made by one thread that other threads can wait on."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls with the same key into one.
+    Within a process, duplicate callers wait on the thread making the call and share its
+    result. Across processes, the caller holding the key's file lock makes the call and
+    writes a JSON result file that callers blocked on the lock pick up afterwards.
+    """
+
+    def __init__(self, lock_dir=LOCK_DIR, use_file_locks=True):
+        self.lock_dir = lock_dir
+        self.use_file_locks = use_file_locks and fcntl is not None
+        self._calls = {}
+        self._lock = threading.Lock()
+        self.leaders = 0
+        self.shared = 0
+
+    def do(self, key, fn):
+        """
+        Returns fn() for the first caller with `key` and that same result for every
+        caller that arrives while it is in flight. Exceptions are shared as well.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _InFlightCall()
+                self.leaders += 1
+            else:
+                self.shared += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return copy.deepcopy(call.result)
+
+        try:
+            if self.use_file_locks:
+                call.result = self._do_across_processes(key, fn)
+            else:
+                call.result = fn()
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def _do_across_processes(self, key, fn):
+        """Runs fn() under the key's file lock, or reuses the result of the process that held it."""
+        os.makedirs(self.lock_dir, exist_ok=True)
+        lock_path = os.path.join(self.lock_dir, f"{key}.lock")
+        result_path = os.path.join(self.lock_dir, f"{key}.json")
+
+        with open(lock_path, "a") as lock_file:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                # Another process is making this call: wait for it and take its result
+                waiting_since = time.time()
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                result = self._read_result(result_path, waiting_since)
+                if result is not None:
+                    with self._lock:
+                        self.shared += 1
+                    return result
+
+            try:
+                result = fn()
+                if result is not None:
+                    self._write_result(result_path, result)
+                self._remove_stale_results()
+                return result
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _read_result(self, result_path, written_after):
+        """Returns the result file's content if it was written after `written_after`."""
+        try:
+            if os.path.getmtime(result_path) < written_after:
+                return None
+            with open(result_path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_result(self, result_path, result):
+        try:
+            temp_path = f"{result_path}.{os.getpid()}.tmp"
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(result, f)
+            os.replace(temp_path, result_path)
+        except (OSError, TypeError, ValueError) as e:
+            print(f"Could not share single-flight result: {str(e)}")
+
+    def _remove_stale_results(self):
+        cutoff = time.time() - RESULT_FILE_TTL_SECONDS
+        try:
+            for name in os.listdir(self.lock_dir):
+                if not name.endswith(".json"):
+                    continue
+                path = os.path.join(self.lock_dir, name)
+                if os.path.getmtime(path) < cutoff:
+                    os.remove(path)
+        except OSError:
+            pass
+
+    def stats(self):
+        with self._lock:
+            return {"in_flight": len(self._calls), "calls": self.leaders, "shared": self.shared}
+
+
+single_flight = SingleFlight()
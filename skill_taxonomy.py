@@ -0,0 +1,272 @@
+import re
+import threading
+from collections import deque
+
+# Canonical skill ids and the free-text aliases that map to them. Aliases are matched
+# case-insensitively on word boundaries, so "React.js", "ReactJS" and "react" all map to "react".
+# Only spellings of the same skill share an id: the ids are also verdict cache keys, so a
+# broader or related term ("containerization" for Docker, "Unix" for Linux) gets its own.
+SKILL_ALIASES = {
+    "python": ["python", "python3"],
+    "java": ["java", "core java", "java se", "java ee"],
+    "javascript": ["javascript", "java script", "ecmascript", "es6", "vanilla js"],
+    "typescript": ["typescript"],
+    "golang": ["golang", "go lang", "go"],
+    "cpp": ["c++", "cpp"],
+    "csharp": ["c#", "csharp", "c sharp"],
+    "dotnet": [".net", "dotnet", "asp.net", ".net core"],
+    "ruby": ["ruby"],
+    "rust": ["rust"],
+    "kotlin": ["kotlin"],
+    "swift": ["swift"],
+    "php": ["php"],
+    "scala": ["scala"],
+    "r": ["r programming", "r language"],
+    "react": ["react", "react.js", "reactjs", "react js"],
+    "react_native": ["react native"],
+    "angular": ["angular", "angularjs", "angular.js"],
+    "vue": ["vue", "vue.js", "vuejs"],
+    "nodejs": ["node.js", "nodejs", "node js", "node"],
+    "express": ["express", "express.js", "expressjs"],
+    "django": ["django"],
+    "flask": ["flask"],
+    "fastapi": ["fastapi"],
+    "spring": ["spring", "spring boot", "springboot"],
+    "html": ["html", "html5"],
+    "css": ["css", "css3"],
+    "sql": ["sql"],
+    "nosql": ["nosql", "no-sql"],
+    "postgresql": ["postgresql", "postgres", "postgre sql", "psql"],
+    "mysql": ["mysql", "my sql"],
+    "sqlite": ["sqlite"],
+    "mongodb": ["mongodb", "mongo db", "mongo"],
+    "redis": ["redis"],
+    "elasticsearch": ["elasticsearch", "elastic search"],
+    "kafka": ["kafka", "apache kafka"],
+    "spark": ["spark", "apache spark", "pyspark"],
+    "graphql": ["graphql"],
+    "rest_api": ["rest", "restful", "rest api", "rest apis", "restful api", "restful apis", "restful services"],
+    "microservices": ["microservices", "microservice", "micro-services", "micro services"],
+    "distributed_systems": ["distributed systems", "distributed system"],
+    "git": ["git"],
+    "version_control": ["version control"],
+    "docker": ["docker"],
+    "containerization": ["containerization", "containers"],
+    "kubernetes": ["kubernetes", "k8s"],
+    "terraform": ["terraform"],
+    "ci_cd": ["ci/cd", "ci cd", "cicd", "continuous integration", "continuous delivery", "continuous deployment"],
+    "jenkins": ["jenkins"],
+    "aws": ["aws", "amazon web services"],
+    "gcp": ["gcp", "google cloud", "google cloud platform"],
+    "azure": ["azure", "microsoft azure"],
+    "linux": ["linux"],
+    "unix": ["unix"],
+    "data_structures": ["data structures"],
+    "algorithms": ["algorithms", "dsa"],
+    "machine_learning": ["machine learning", "ml"],
+    "deep_learning": ["deep learning"],
+    "nlp": ["nlp", "natural language processing"],
+    "data_analysis": ["data analysis", "data analytics"],
+    "tensorflow": ["tensorflow"],
+    "pytorch": ["pytorch"],
+    "torch": ["torch"],
+    "pandas": ["pandas"],
+    "numpy": ["numpy"],
+    "excel": ["excel", "microsoft excel", "ms excel"],
+    "power_bi": ["power bi", "powerbi"],
+    "tableau": ["tableau"],
+    "figma": ["figma"],
+    "photoshop": ["photoshop", "adobe photoshop"],
+    "jest": ["jest"],
+    "mocha": ["mocha"],
+    "unit_testing": ["unit testing", "unit tests", "integration testing", "integration tests"],
+    "security": ["security best practices", "application security"],
+}
+
+# Words that may surround a skill in a requirement without changing what is required,
+# e.g. "SQL databases (especially PostgreSQL)" or "CI/CD tools such as Jenkins".
+# Conjunctions ("and", "or") and proficiency or level words ("basic", "strong", "expertise")
+# are deliberately absent: "Java or Python" is not "Java and Python", and "Basic Python" is
+# not "Advanced Python", so requirements using them get no skill key.
+FILLER_WORDS = {
+    "a", "an", "the", "of", "in", "with", "on", "for", "to", "as", "such", "like", "eg", "e.g",
+    "i.e", "ie", "etc", "especially", "including", "using",
+    "experience", "knowledge", "skills",
+    "skill", "databases", "database", "systems", "system", "tools", "tool", "frameworks",
+    "framework", "language", "languages", "programming", "platforms", "platform", "technologies",
+    "technology", "pipelines", "pipeline", "services", "modern", "practices",
+}
+
+# Separators between two skills that leave open whether all or any of them are required,
+# e.g. "Java/Python" or "Docker, Kubernetes"
+_SKILL_LIST_SEPARATOR_RE = re.compile(r"[,/&|;]")
+
+_WORD_CHARS_RE = re.compile(r"[a-z0-9]")
+_TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9.+#/-]*")
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_text(text):
+    """Lowercases and collapses whitespace; offsets in the result are what matches refer to."""
+    return _WHITESPACE_RE.sub(" ", str(text or "")).strip().lower()
+
+
+class SkillIndex:
+    """
+    Aho-Corasick automaton over all skill aliases. A scan of a text runs in
+    O(len(text) + matches) regardless of how many aliases are registered.
+    """
+
+    def __init__(self, aliases_by_skill):
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [[]]
+        for skill_id, aliases in aliases_by_skill.items():
+            for alias in aliases:
+                self._add(normalize_text(alias), skill_id)
+        self._build_failure_links()
+
+    def _add(self, alias, skill_id):
+        state = 0
+        for ch in alias:
+            next_state = self._goto[state].get(ch)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][ch] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            state = next_state
+        self._output[state].append((len(alias), skill_id))
+
+    def _build_failure_links(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[next_state] = self._goto[fail].get(ch, 0)
+                if self._fail[next_state] == next_state:
+                    self._fail[next_state] = 0
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+
+    def scan(self, text):
+        """
+        Returns non-overlapping (start, end, skill_id) matches in a normalized text,
+        preferring the leftmost and then the longest alias at each position.
+        """
+        candidates = []
+        state = 0
+        for i, ch in enumerate(text):
+            while state and ch not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(ch, 0)
+            for length, skill_id in self._output[state]:
+                start, end = i - length + 1, i + 1
+                # Only whole words count: "java" must not match inside "javascript"
+                if start > 0 and _WORD_CHARS_RE.match(text[start - 1]):
+                    continue
+                if end < len(text) and _WORD_CHARS_RE.match(text[end]):
+                    continue
+                candidates.append((start, end, skill_id))
+
+        candidates.sort(key=lambda match: (match[0], -(match[1] - match[0])))
+        matches = []
+        covered_until = 0
+        for start, end, skill_id in candidates:
+            if start >= covered_until:
+                matches.append((start, end, skill_id))
+                covered_until = end
+        return matches
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_skill_index():
+    """Returns the shared skill index, building it on first use."""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = SkillIndex(SKILL_ALIASES)
+    return _index
+
+
+def add_skill_aliases(skill_id, aliases):
+    """Registers extra aliases for a (new or existing) canonical skill id and rebuilds the index."""
+    global _index
+    with _index_lock:
+        existing = SKILL_ALIASES.setdefault(skill_id, [])
+        existing.extend(alias for alias in aliases if alias not in existing)
+        _index = SkillIndex(SKILL_ALIASES)
+
+
+def find_skills(text):
+    """Returns the canonical skill ids mentioned in a text, in order of first appearance."""
+    matches = get_skill_index().scan(normalize_text(text))
+    return list(dict.fromkeys(skill_id for _, _, skill_id in matches))
+
+
+def skill_key(text):
+    """
+    Returns a canonical key for a requirement that is purely about skills, such as
+    "postgresql" for "Postgres" or "postgresql+sql" for "SQL databases (especially PostgreSQL)".
+    Returns None when the text says more than which skills are needed (e.g. a responsibility,
+    a proficiency level, or a list of skills joined by "and", "or", "/" or commas), so such
+    requirements are never conflated just because they mention the same tools.
+    """
+    normalized = normalize_text(text)
+    matches = get_skill_index().scan(normalized)
+    if not matches:
+        return None
+
+    residual = []
+    position = 0
+    previous_skill = None
+    for start, end, skill_id in matches:
+        gap = normalized[position:start]
+        if previous_skill not in (None, skill_id) and _SKILL_LIST_SEPARATOR_RE.search(gap):
+            return None
+        residual.append(gap)
+        position = end
+        previous_skill = skill_id
+    residual.append(normalized[position:])
+    for token in _TOKEN_RE.findall(" ".join(residual)):
+        if token.strip(".-/") not in FILLER_WORDS:
+            return None
+
+    return "+".join(sorted({skill_id for _, _, skill_id in matches}))
+
+
+def requirement_skill_ids(requirements):
+    """Returns the canonical skill ids a JD asks for (must-have and good-to-have skills)."""
+    must_have = requirements.get("must_have_requirements", {}) or {}
+    good_to_have = requirements.get("good_to_have_requirements", {}) or {}
+    skill_ids = set()
+    for items in (must_have.get("technical_skills"), good_to_have.get("additional_skills")):
+        for item in (items or []):
+            skill_ids.update(find_skills(item))
+    return skill_ids
+
+
+def analysis_skill_ids(analysis):
+    """Returns the canonical skill ids a resume analysis credits the candidate with."""
+    qualitative = analysis.get("qualitative_assessment", {}) or {}
+    requirement_match = analysis.get("requirement_match", {}) or {}
+    skill_ids = set()
+    for skill in qualitative.get("inferred_skills_from_projects", []) or []:
+        skill_ids.update(find_skills(skill))
+    matched_maps = (
+        (requirement_match.get("must_have_requirements", {}) or {}).get("technical_skills", {}),
+        (requirement_match.get("good_to_have_requirements", {}) or {}).get("additional_skills", {}),
+    )
+    for matched in matched_maps:
+        for item, met in (matched or {}).items():
+            if met is True:
+                skill_ids.update(find_skills(item))
+    return skill_ids
@@ -0,0 +1,197 @@
+import importlib.util
+import json
+import os
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("flask")
+
+BACKEND_APP = os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend", "app.py")
+
+
+@pytest.fixture(scope="module")
+def backend():
+    """The Flask backend module, loaded with a placeholder API key (no request reaches OpenAI)."""
+    os.environ.setdefault("OPENAI_API_KEY", "test-key")
+    spec = importlib.util.spec_from_file_location("backend_app", BACKEND_APP)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture
+def client(backend):
+    return backend.app.test_client()
+
+
+def wait_until(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError("timed out")
+        time.sleep(0.01)
+
+
+def add_batch_job(backend, batch_id):
+    backend.batch_jobs[batch_id] = {
+        "manifest": {"batch_id": batch_id, "filenames": {"resume-0": "a.pdf", "resume-1": "b.pdf"}},
+        "required_skill_ids": set(),
+        "failed_files": [],
+        "lock": threading.Lock(),
+        "import_state": None,
+        "import_error": None,
+        "results": None,
+        "results_version": None
+    }
+
+
+class FakeBatchBackend:
+    def __init__(self, status="completed"):
+        self.batch_status = status
+
+    def status(self, batch_id):
+        return self.batch_status
+
+    def results(self, batch_id):
+        return []
+
+
+def test_completed_batch_is_imported_once_and_promoted_once(backend, client, monkeypatch):
+    release = threading.Event()
+    imports = []
+
+    def import_results(records, manifest):
+        imports.append(manifest["batch_id"])
+        release.wait(5)
+        return {"a.pdf": {"quantitative_score": 8, "semantic_score": 70, "analysis": {}}, "b.pdf": None}
+
+    monkeypatch.setattr(backend, "get_client", lambda: None)
+    monkeypatch.setattr(backend, "get_batch_backend", lambda client: FakeBatchBackend())
+    monkeypatch.setattr(backend, "import_batch_results", import_results)
+    add_batch_job(backend, "batch_once")
+
+    for _ in range(3):
+        response = client.get("/api/batch-jobs/batch_once").get_json()
+        assert response["status"] == "importing"
+    release.set()
+    wait_until(lambda: backend.batch_jobs["batch_once"]["import_state"] == "imported")
+
+    version = backend.results_version
+    responses = [client.get("/api/batch-jobs/batch_once").get_json() for _ in range(3)]
+    assert imports == ["batch_once"]
+    assert backend.results_version == version
+    assert all(response["results_version"] == version and response["status"] == "completed"
+               for response in responses)
+    assert [result["filename"] for result in responses[0]["results"]] == ["a.pdf"]
+    assert responses[0]["failed_files"] == ["b.pdf"]
+
+
+def test_unfinished_and_failed_imports_are_reported(backend, client, monkeypatch):
+    monkeypatch.setattr(backend, "get_client", lambda: None)
+    monkeypatch.setattr(backend, "get_batch_backend", lambda client: FakeBatchBackend("in_progress"))
+    add_batch_job(backend, "batch_pending")
+    response = client.get("/api/batch-jobs/batch_pending").get_json()
+    assert (response["success"], response["status"]) == (True, "in_progress")
+
+    def broken_import(records, manifest):
+        raise RuntimeError("output file missing")
+
+    monkeypatch.setattr(backend, "get_batch_backend", lambda client: FakeBatchBackend())
+    monkeypatch.setattr(backend, "import_batch_results", broken_import)
+    client.get("/api/batch-jobs/batch_pending")
+    wait_until(lambda: backend.batch_jobs["batch_pending"]["import_state"] == "failed")
+    response = client.get("/api/batch-jobs/batch_pending")
+    assert response.status_code == 500
+    assert "output file missing" in response.get_json()["message"]
+
+    assert client.get("/api/batch-jobs/unknown").status_code == 404
+
+
+def read_events(response):
+    """Checks the server-sent event framing and returns the decoded payloads in order."""
+    assert response.mimetype == "text/event-stream"
+    assert response.headers["Cache-Control"] == "no-cache"
+    body = response.get_data(as_text=True)
+    assert body.endswith("\n\n")
+    frames = body.split("\n\n")[:-1]
+    # One single-line `data:` field per event, even when the text has line breaks
+    assert all(frame.startswith("data: ") and "\n" not in frame for frame in frames)
+    return [json.loads(frame[len("data: "):]) for frame in frames]
+
+
+def stub_stream_completion(monkeypatch, backend, *replies):
+    """Makes each stream_completion call yield the next reply's chunks; an exception in a reply is raised there."""
+    calls = []
+    replies = list(replies)
+
+    def stream_completion(client, **kwargs):
+        calls.append(kwargs)
+        for chunk in replies.pop(0):
+            if isinstance(chunk, Exception):
+                raise chunk
+            yield chunk
+
+    monkeypatch.setattr(backend, "get_client", lambda: None)
+    monkeypatch.setattr(backend, "stream_completion", stream_completion)
+    return calls
+
+
+def test_sse_event_is_a_single_data_line(backend):
+    assert backend.sse_event({"type": "delta", "content": "a\nb"}) == 'data: {"type": "delta", "content": "a\\nb"}\n\n'
+
+
+def test_chat_stream_sends_deltas_context_and_done(backend, client, monkeypatch):
+    calls = stub_stream_completion(monkeypatch, backend, ["Great, a ", "Python role.\n", "Which city?"])
+
+    response = client.post("/api/job-description-chat/stream", json={
+        "message": "We need a Senior Software Engineer who knows Python", "context": {}, "messages": []})
+    events = read_events(response)
+
+    assert [event["type"] for event in events] == ["delta", "delta", "context", "delta", "done"]
+    assert "".join(event["content"] for event in events if event["type"] == "delta") == \
+        "Great, a Python role.\nWhich city?"
+    assert "Python" in events[2]["context"]["skills"]
+    done = events[-1]
+    assert done["success"] is True and done["jobDescription"] is None
+    assert done["response"] == "Great, a Python role.\nWhich city?"
+    assert done["context"] == events[2]["context"]
+    assert calls[0]["messages"][-1] == {"role": "user", "content": "We need a Senior Software Engineer who knows Python"}
+
+
+def test_chat_stream_generates_the_job_description_before_done(backend, client, monkeypatch):
+    stub_stream_completion(monkeypatch, backend, ["Let me generate a comprehensive job description."],
+                           ["# Data Engineer\n", "Build pipelines."])
+
+    response = client.post("/api/job-description-chat/stream", json={
+        "message": "Go ahead", "context": {"jobTitle": "Data Engineer"}, "messages": []})
+    events = read_events(response)
+
+    assert [event["type"] for event in events] == ["delta", "job_description_delta", "job_description_delta", "done"]
+    assert events[-1]["jobDescription"] == "# Data Engineer\nBuild pipelines."
+
+
+def test_chat_stream_reports_errors_as_a_final_event(backend, client, monkeypatch):
+    stub_stream_completion(monkeypatch, backend, ["Partial ", RuntimeError("connection reset")])
+
+    events = read_events(client.post("/api/job-description-chat/stream", json={"message": "Hi"}))
+
+    assert [event["type"] for event in events] == ["delta", "error"]
+    assert events[-1]["success"] is False and "connection reset" in events[-1]["message"]
+    assert client.post("/api/job-description-chat/stream", json={"message": ""}).status_code == 400
+
+
+def test_generate_job_description_stream(backend, client, monkeypatch):
+    calls = stub_stream_completion(monkeypatch, backend, ["# Backend Engineer\n", "Own our APIs. "],
+                                   ["# Title\n", RuntimeError("rate limited")])
+
+    events = read_events(client.post("/api/generate-job-description/stream",
+                                     json={"context": {"jobTitle": "Backend Engineer"}}))
+    assert [event["type"] for event in events] == ["job_description_delta", "job_description_delta", "done"]
+    assert events[-1] == {"type": "done", "success": True, "jobDescription": "# Backend Engineer\nOwn our APIs."}
+    assert "Job Title: Backend Engineer" in calls[0]["messages"][0]["content"]
+
+    events = read_events(client.post("/api/generate-job-description/stream", json={}))
+    assert [event["type"] for event in events] == ["job_description_delta", "error"]
+    assert "rate limited" in events[-1]["message"]
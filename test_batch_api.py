@@ -0,0 +1,138 @@
+import json
+import threading
+import time
+import types
+
+import httpx2
+import pytest
+from openai import BadRequestError
+
+import batch_api
+from batch_api import LocalBatchBackend, OpenAIBatchBackend, requests_to_jsonl, run_batch_request
+
+SCHEMA_FORMAT = {"type": "json_schema", "json_schema": {"name": "resume_analysis", "strict": True, "schema": {}}}
+
+
+def make_request(custom_id, response_format=SCHEMA_FORMAT):
+    return {"custom_id": custom_id, "method": "POST", "url": batch_api.BATCH_ENDPOINT,
+            "body": {"model": "o4-mini", "messages": [{"role": "user", "content": custom_id}],
+                     "response_format": response_format}}
+
+
+def completion(content):
+    message = types.SimpleNamespace(content=content)
+    return types.SimpleNamespace(choices=[types.SimpleNamespace(message=message, finish_reason="stop")])
+
+
+def schema_rejected():
+    response = httpx2.Response(400, request=httpx2.Request("POST", "https://api.openai.com/v1/chat/completions"))
+    return BadRequestError("Invalid schema for response_format", response=response, body=None)
+
+
+class FakeClient:
+    """Client whose completions either block until `release` is set or reject strict schemas."""
+
+    def __init__(self, reject_schemas=False):
+        self.calls = []
+        self.release = threading.Event()
+        self.reject_schemas = reject_schemas
+        self._lock = threading.Lock()
+        self.chat = types.SimpleNamespace(completions=types.SimpleNamespace(create=self.create))
+
+    def create(self, **kwargs):
+        with self._lock:
+            self.calls.append(kwargs)
+        if self.reject_schemas and (kwargs.get("response_format") or {}).get("type") == "json_schema":
+            raise schema_rejected()
+        self.release.wait(5)
+        return completion('{"score": 7}')
+
+
+def wait_until(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError("timed out")
+        time.sleep(0.01)
+
+
+def test_polling_an_unfinished_local_batch_does_not_rerun_it(tmp_path):
+    client = FakeClient()
+    batch_id = LocalBatchBackend(client, str(tmp_path)).submit(
+        requests_to_jsonl([make_request("resume-0"), make_request("resume-1")]))
+    wait_until(lambda: len(client.calls) == 2)
+
+    # The web backend creates a new backend for every poll
+    for _ in range(5):
+        assert LocalBatchBackend(client, str(tmp_path)).status(batch_id) == "in_progress"
+    client.release.set()
+    backend = LocalBatchBackend(client, str(tmp_path))
+    wait_until(lambda: backend.status(batch_id) == "completed")
+
+    assert len(client.calls) == 2
+    assert [record["custom_id"] for record in backend.results(batch_id)] == ["resume-0", "resume-1"]
+
+
+@pytest.mark.skipif(batch_api.fcntl is None, reason="lock files need fcntl")
+def test_local_batch_locked_by_another_process_is_not_run(tmp_path):
+    client = FakeClient()
+    client.release.set()
+    backend = LocalBatchBackend(client, str(tmp_path))
+    (tmp_path / "local_batch_x.input.jsonl").write_bytes(requests_to_jsonl([make_request("resume-0")]))
+
+    # flock locks belong to the open file, so this stands in for another worker process
+    with open(tmp_path / "local_batch_x.lock", "a") as lock_file:
+        batch_api.fcntl.flock(lock_file, batch_api.fcntl.LOCK_EX)
+        assert backend.status("local_batch_x") == "in_progress"
+        wait_until(lambda: not batch_api._running_local_batches)
+
+    assert client.calls == []
+    assert backend.status("local_batch_x") == "in_progress"
+    wait_until(lambda: backend.status("local_batch_x") == "completed")
+    assert len(client.calls) == 1
+
+
+def test_rejected_schema_is_retried_with_the_fallback_format():
+    client = FakeClient(reject_schemas=True)
+    client.release.set()
+    record = run_batch_request(client, make_request("resume-0"))
+
+    assert record["response"]["status_code"] == 200
+    assert [call["response_format"] for call in client.calls] == [SCHEMA_FORMAT, batch_api.FALLBACK_RESPONSE_FORMAT]
+
+
+def test_openai_results_rerun_schema_rejected_requests():
+    client = FakeClient(reject_schemas=True)
+    client.release.set()
+    requests = [make_request("resume-0"), make_request("resume-1")]
+    outputs = {
+        "input": requests_to_jsonl(requests).decode(),
+        "output": json.dumps({"custom_id": "resume-0", "error": None, "response": {
+            "status_code": 200, "body": {"choices": [{"message": {"content": '{"score": 9}'}}]}}}) + "\n",
+        "errors": json.dumps({"custom_id": "resume-1", "error": None, "response": {
+            "status_code": 400, "body": {"error": {"message": "Invalid schema"}}}}) + "\n",
+    }
+    batch = types.SimpleNamespace(input_file_id="input", output_file_id="output", error_file_id="errors")
+    client.batches = types.SimpleNamespace(retrieve=lambda batch_id: batch)
+    client.files = types.SimpleNamespace(content=lambda file_id: types.SimpleNamespace(text=outputs[file_id]))
+
+    records = OpenAIBatchBackend(client).results("batch_1")
+
+    assert [(record["custom_id"], record["response"]["status_code"]) for record in records] == [
+        ("resume-0", 200), ("resume-1", 200)
+    ]
+    assert [call["messages"][0]["content"] for call in client.calls] == ["resume-1", "resume-1"]
+
+
+def test_crashed_local_batch_is_reported_failed_and_not_restarted(tmp_path):
+    client = FakeClient()
+    client.release.set()
+    backend = LocalBatchBackend(client, str(tmp_path))
+    (tmp_path / "local_batch_bad.input.jsonl").write_text("not json\n")
+
+    assert backend.status("local_batch_bad") == "in_progress"
+    wait_until(lambda: backend.status("local_batch_bad") == "failed")
+    for _ in range(3):
+        assert LocalBatchBackend(client, str(tmp_path)).status("local_batch_bad") == "failed"
+    assert not batch_api._running_local_batches
+    assert client.calls == []
@@ -0,0 +1,110 @@
+import json
+import threading
+import time
+import zipfile
+
+import pytest
+
+import batch_runner
+from batch_runner import CheckpointWriter, checkpoint_key, iter_resume_sources, load_checkpoint, run_batch
+
+
+def fake_record(name, content, status='ok'):
+    return {'key': checkpoint_key(name, content), 'filename': name, 'status': status,
+            'finished_at': '2026-01-01T00:00:00'}
+
+
+def test_run_batch_reads_sources_only_as_workers_free_up(monkeypatch, tmp_path):
+    lock = threading.Lock()
+    state = {'read': 0, 'finished': 0, 'max_ahead': 0}
+
+    def sources(path):
+        for i in range(40):
+            with lock:
+                state['read'] += 1
+                state['max_ahead'] = max(state['max_ahead'], state['read'] - state['finished'])
+            yield f"resume_{i}.txt", f"resume {i}".encode()
+
+    def analyze(name, content, requirements, model):
+        time.sleep(0.002)
+        with lock:
+            state['finished'] += 1
+        return fake_record(name, content)
+
+    monkeypatch.setattr(batch_runner, "iter_resume_sources", sources)
+    monkeypatch.setattr(batch_runner, "analyze_source", analyze)
+
+    done, failed, skipped = run_batch({}, "unused", str(tmp_path / "checkpoint.jsonl"), max_workers=2)
+
+    assert (done, failed, skipped) == (40, 0, 0)
+    # At most max_workers * IN_FLIGHT_PER_WORKER submitted resumes plus the one being read
+    assert state['max_ahead'] <= 2 * batch_runner.IN_FLIGHT_PER_WORKER + 1
+
+
+def test_run_batch_skips_checkpointed_resumes_and_records_oversized_members(monkeypatch, tmp_path):
+    checkpoint = tmp_path / "checkpoint.jsonl"
+    checkpoint.write_text(json.dumps(fake_record("a.txt", b"A")) + "\n" + '{"torn li')
+    analyzed = []
+
+    def sources(path):
+        yield "a.txt", b"A"
+        yield "b.txt", b"B"
+        yield "huge.pdf", None
+
+    def analyze(name, content, requirements, model):
+        analyzed.append(name)
+        return fake_record(name, content, status='failed' if name == "b.txt" else 'ok')
+
+    monkeypatch.setattr(batch_runner, "iter_resume_sources", sources)
+    monkeypatch.setattr(batch_runner, "analyze_source", analyze)
+
+    assert run_batch({}, "unused", str(checkpoint)) == (0, 2, 1)
+    assert analyzed == ["b.txt"]
+    assert load_checkpoint(str(checkpoint)) == {checkpoint_key("a.txt", b"A")}
+
+
+def test_records_written_after_a_torn_line_are_read_back(monkeypatch, tmp_path):
+    checkpoint = tmp_path / "checkpoint.jsonl"
+    checkpoint.write_text(json.dumps(fake_record("a.txt", b"A")) + "\n" + '{"torn li')
+
+    def sources(path):
+        yield "a.txt", b"A"
+        yield "b.txt", b"B"
+
+    monkeypatch.setattr(batch_runner, "iter_resume_sources", sources)
+    monkeypatch.setattr(batch_runner, "analyze_source", lambda name, content, requirements, model:
+                        fake_record(name, content))
+
+    assert run_batch({}, "unused", str(checkpoint)) == (1, 0, 1)
+    assert load_checkpoint(str(checkpoint)) == {checkpoint_key("a.txt", b"A"), checkpoint_key("b.txt", b"B")}
+    # Nothing left to do on the next resume
+    assert run_batch({}, "unused", str(checkpoint)) == (0, 0, 2)
+
+
+def test_checkpoint_writer_truncates_a_file_that_is_only_a_torn_line(tmp_path):
+    checkpoint = tmp_path / "checkpoint.jsonl"
+    checkpoint.write_text('{"key": "x", "sta' * 1000)
+    writer = CheckpointWriter(str(checkpoint))
+    writer.write(fake_record("b.txt", b"B"))
+    writer.close()
+    assert load_checkpoint(str(checkpoint)) == {checkpoint_key("b.txt", b"B")}
+
+
+def test_resume_sources_from_a_directory_an_archive_or_a_single_file(tmp_path):
+    (tmp_path / "nested").mkdir()
+    (tmp_path / "a.txt").write_bytes(b"A")
+    (tmp_path / "nested" / "b.PDF").write_bytes(b"B")
+    (tmp_path / "notes.md").write_bytes(b"skip")
+    assert list(iter_resume_sources(str(tmp_path))) == [("a.txt", b"A"), ("nested/b.PDF", b"B")]
+
+    with zipfile.ZipFile(tmp_path / "pack.zip", 'w') as archive:
+        archive.writestr("c.docx", b"C")
+    assert list(iter_resume_sources(str(tmp_path / "pack.zip"))) == [("c.docx", b"C")]
+    assert list(iter_resume_sources(str(tmp_path / "nested" / "b.PDF"))) == [("b.PDF", b"B")]
+
+
+@pytest.mark.parametrize("name", ["notes.md", "missing.txt"])
+def test_unsupported_or_missing_resume_paths_are_rejected(tmp_path, name):
+    (tmp_path / "notes.md").write_bytes(b"skip")
+    with pytest.raises(ValueError):
+        list(iter_resume_sources(str(tmp_path / name)))
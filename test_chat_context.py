@@ -0,0 +1,114 @@
+import types
+
+import pytest
+
+import chat_context
+import llm_utils
+from chat_context import SUMMARIZED_COUNT_KEY, SUMMARY_KEY, build_windowed_conversation
+
+
+class SummaryClient:
+    """Answers summary requests with a short numbered summary and records each transcript."""
+
+    def __init__(self):
+        self.transcripts = []
+        self.chat = types.SimpleNamespace(completions=types.SimpleNamespace(create=self.create))
+
+    def create(self, **kwargs):
+        prompt = kwargs["messages"][0]["content"]
+        self.transcripts.append(prompt.split("New messages:\n", 1)[1])
+        message = types.SimpleNamespace(content=f"summary {len(self.transcripts)}")
+        return types.SimpleNamespace(choices=[types.SimpleNamespace(message=message, finish_reason="stop")])
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(llm_utils.rate_limiter, "interval", 0.0)
+    return SummaryClient()
+
+
+def conversation(turns, length=10):
+    """Client-side messages for `turns` user/assistant turns, numbered m0, m1, ..."""
+    messages = []
+    for i in range(2 * turns):
+        messages.append({"type": "user" if i % 2 == 0 else "assistant", "content": f"m{i} " + "x" * length})
+    return messages
+
+
+def contents(chat_messages):
+    return [msg["content"].split()[0] for msg in chat_messages]
+
+
+def test_short_conversations_are_sent_verbatim(client):
+    context = {}
+    chat = build_windowed_conversation(client, "system", context, conversation(3), "next")
+
+    assert chat[0] == {"role": "system", "content": "system"}
+    assert contents(chat[1:-1]) == [f"m{i}" for i in range(6)]
+    assert chat[-1] == {"role": "user", "content": "next"}
+    assert client.transcripts == [] and SUMMARY_KEY not in context
+
+
+def test_turns_leaving_the_window_are_summarized_once_per_batch(client):
+    window = 2 * chat_context.CHAT_WINDOW_TURNS
+    batch = 2 * chat_context.CHAT_SUMMARY_BATCH_TURNS
+    context = {}
+    summarized_after = []
+    for turns in range(1, 20):
+        chat = build_windowed_conversation(client, "system", context, conversation(turns), "next")
+        summarized = context.get(SUMMARIZED_COUNT_KEY, 0)
+        summarized_after.append(summarized)
+        # Everything not in the summary is sent verbatim, and nothing is sent twice
+        assert contents(chat[1:-1]) == [f"m{i}" for i in range(summarized, 2 * turns)]
+
+    # The summary is refreshed only when a whole batch of turns has left the window
+    expected = [0] * 9 + [batch] * 4 + [2 * batch] * 4 + [3 * batch] * 2
+    assert summarized_after == expected
+    assert len(client.transcripts) == 3
+    assert all(f"m{i} " in client.transcripts[1] for i in range(batch, 2 * batch))
+    assert "m7 " not in client.transcripts[1] and f"m{2 * batch} " not in client.transcripts[1]
+    assert context[SUMMARY_KEY] == "summary 3"
+    assert window == 12 and batch == 8  # the expectations above assume the default window and batch
+
+
+def test_the_summary_is_sent_with_the_system_prompt(client):
+    context = {}
+    chat = build_windowed_conversation(client, "system", context, conversation(10), "next")
+    assert chat[0]["content"] == "system\n\nSummary of the earlier conversation: summary 1"
+    assert chat_context.job_details(context) == {}
+
+
+@pytest.mark.parametrize("summarized", ["8", -3, 99, None])
+def test_invalid_summarized_counts_start_over(client, summarized):
+    context = {SUMMARIZED_COUNT_KEY: summarized}
+    build_windowed_conversation(client, "system", context, conversation(10), "next")
+    assert context[SUMMARIZED_COUNT_KEY] == 8
+    assert "m0 " in client.transcripts[0]
+
+
+def test_messages_over_the_budget_are_folded_into_the_summary(client):
+    context = {}
+    # Four turns of ~100 tokens each: well inside the window, but over a 600 token budget
+    messages = conversation(4, length=100 * llm_utils.CHARS_PER_TOKEN)
+    chat = build_windowed_conversation(client, "system", context, messages, "next", max_prompt_tokens=600)
+
+    # Room is left for the summary to grow to CHAT_SUMMARY_MAX_TOKENS
+    assert contents(chat[1:-1]) == ["m6", "m7"]
+    assert context[SUMMARIZED_COUNT_KEY] == 6
+    assert [f"m{i} " in client.transcripts[0] for i in range(8)] == [True] * 6 + [False] * 2
+    assert chat[0]["content"].endswith("summary 1")
+    assert sum(llm_utils.estimate_tokens(msg["content"]) for msg in chat) <= 600
+
+    # The next turn keeps the folded messages in the summary instead of resending them
+    messages += conversation(5, length=10)[8:]
+    chat = build_windowed_conversation(client, "system", context, messages, "next", max_prompt_tokens=600)
+    assert contents(chat[1:-1]) == ["m6", "m7", "m8", "m9"]
+    assert len(client.transcripts) == 1
+
+
+def test_messages_within_the_budget_are_not_summarized(client):
+    context = {}
+    messages = conversation(4, length=100 * llm_utils.CHARS_PER_TOKEN)
+    chat = build_windowed_conversation(client, "system", context, messages, "next", max_prompt_tokens=3000)
+    assert contents(chat[1:-1]) == [f"m{i}" for i in range(8)]
+    assert client.transcripts == [] and SUMMARIZED_COUNT_KEY not in context
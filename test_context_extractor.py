@@ -0,0 +1,233 @@
+import pytest
+
+from context_extractor import ContextExtractor, context_extractor, update_job_context
+
+
+def previous_update_job_context(context, user_message, ai_response):
+    """update_job_context as it was before ContextExtractor (debug prints removed)."""
+    updated_context = context.copy()
+
+    # Simple keyword-based context extraction from user message
+    message_lower = user_message.lower()
+    ai_lower = ai_response.lower()
+
+    # Extract job title
+    if not updated_context.get('jobTitle'):
+        # Try to extract job title from message
+        common_titles = ['software engineer', 'data scientist', 'product manager', 'marketing manager',
+                        'sales manager', 'developer', 'analyst', 'designer', 'coordinator', 'engineer',
+                        'manager', 'director', 'specialist', 'associate', 'lead', 'senior', 'junior',
+                        'architect', 'consultant', 'representative', 'executive', 'administrator',
+                        'technician', 'supervisor', 'officer', 'assistant']
+
+        for title in common_titles:
+            if title in message_lower:
+                # Extract a more complete job title from the message
+                words = user_message.split()
+                for i, word in enumerate(words):
+                    if word.lower() == title:
+                        # Try to get a 2-3 word job title
+                        title_parts = []
+                        if i > 0:
+                            title_parts.append(words[i-1])
+                        title_parts.append(word)
+                        if i < len(words) - 1:
+                            title_parts.append(words[i+1])
+
+                        updated_context['jobTitle'] = ' '.join(title_parts).title()
+                        break
+                if updated_context.get('jobTitle'):
+                    break
+
+    # Extract company info
+    if 'company' in message_lower or 'organization' in message_lower:
+        words = user_message.split()
+        for i, word in enumerate(words):
+            if word.lower() in ['company', 'organization', 'startup', 'corporation']:
+                if i > 0:
+                    updated_context['company'] = words[i-1]
+                break
+
+    # Handle company overview from predefined profiles
+    if 'company overview:' in user_message.lower():
+        # Extract company overview from message
+        overview_start = user_message.lower().find('company overview:')
+        if overview_start != -1:
+            overview_text = user_message[overview_start + len('company overview:'):].strip()
+            # Extract until benefits section if present
+            benefits_start = overview_text.lower().find('our benefits include:')
+            if benefits_start != -1:
+                updated_context['companyOverview'] = overview_text[:benefits_start].strip()
+                # Extract benefits
+                benefits_text = overview_text[benefits_start + len('our benefits include:'):].strip()
+                updated_context['benefits'] = [benefits_text]
+            else:
+                updated_context['companyOverview'] = overview_text
+
+    # Extract benefits information from user message
+    if 'benefits include:' in user_message.lower() or 'benefit' in user_message.lower():
+        benefits_start = user_message.lower().find('benefits include:')
+        if benefits_start != -1:
+            benefits_text = user_message[benefits_start + len('benefits include:'):].strip()
+            if 'benefits' not in updated_context:
+                updated_context['benefits'] = []
+            updated_context['benefits'].append(benefits_text)
+
+    # Handle benefits updates from AI response (when user asks to change benefits)
+    if ('change' in message_lower or 'update' in message_lower or 'revise' in message_lower) and 'benefit' in message_lower:
+        # Look for updated benefits in AI response
+        import re
+
+        # Clean the AI response to handle formatting
+        ai_clean = re.sub(r'[*\-•]', '', ai_response)  # Remove bullet points and formatting
+        ai_clean = re.sub(r'\s+', ' ', ai_clean)  # Normalize whitespace
+
+        # Multiple patterns to find updated benefits
+        patterns = [
+            r'benefit(?:s?)\s*cuti\s*(\d+)\s*(?:hari|days?)',  # "Benefit cuti X hari"
+            r'(\d+)\s*(?:hari|days?)\s*(?:of\s*)?(?:leave|cuti)',  # "X days of leave" or "X hari cuti"
+            r'benefit(?:s?).*?(\d+)\s*(?:hari|days?)',  # "Benefits... X days"
+            r'cuti\s*(\d+)\s*(?:hari|days?)',  # "cuti X hari"
+            r'(\d+)\s*(?:hari|days?)',  # Just "X hari" or "X days"
+        ]
+
+        benefit_match = None
+        days = None
+
+        # Try patterns on cleaned AI response
+        for pattern in patterns:
+            benefit_match = re.search(pattern, ai_clean.lower())
+            if benefit_match:
+                days = benefit_match.group(1)
+                break
+
+        # If no pattern match, try to extract from Benefits section
+        if not days and 'benefits:' in ai_lower:
+            benefits_start = ai_response.lower().find('benefits:')
+            if benefits_start != -1:
+                # Extract the benefits section
+                benefits_section = ai_response[benefits_start:].split('\n\n')[0]  # Get until next section
+
+                # Look for days in this section
+                for pattern in patterns:
+                    section_match = re.search(pattern, benefits_section.lower())
+                    if section_match:
+                        days = section_match.group(1)
+                        break
+
+        # If we found days, update the context
+        if days:
+            new_benefits = f"Benefit cuti {days} hari, BPJS, THR, Diskon karyawan"
+            updated_context['benefits'] = [new_benefits]
+        else:
+
+            # Try to extract the entire benefits line if formatted properly
+            if 'benefit cutix' in ai_lower:
+                # Find lines containing "benefit cuti"
+                lines = ai_response.split('\n')
+                for line in lines:
+                    if 'benefit cuti' in line.lower():
+                        # Clean the line and use it
+                        clean_line = re.sub(r'^[*\-•\s]*', '', line).strip()
+                        if clean_line:
+                            updated_context['benefits'] = [clean_line]
+                            break
+
+    # Also check for any benefits information in AI response (not just when user asks for changes)
+    if 'benefit' in ai_lower and 'cuti' in ai_lower:
+        import re
+
+        # Clean the AI response to handle formatting
+        ai_clean = re.sub(r'[*\-•]', '', ai_response)  # Remove bullet points and formatting
+        ai_clean = re.sub(r'\s+', ' ', ai_clean)  # Normalize whitespace
+
+        # Look for benefit cuti pattern
+        patterns = [
+            r'benefit(?:s?)\s*cuti\s*(\d+)\s*(?:hari|days?)',  # "Benefit cuti X hari"
+            r'cuti\s*(\d+)\s*(?:hari|days?)',  # "cuti X hari"
+        ]
+
+        for pattern in patterns:
+            match = re.search(pattern, ai_clean.lower())
+            if match:
+                days = match.group(1)
+                new_benefits = f"Benefit cuti {days} hari, BPJS, THR, Diskon karyawan"
+                updated_context['benefits'] = [new_benefits]
+                break
+
+    # Extract experience requirements
+    if 'year' in message_lower and ('experience' in message_lower or 'exp' in message_lower):
+        import re
+        exp_match = re.search(r'(\d+)[-\s]?(?:to|-)?[\s]?(\d+)?\s*years?', message_lower)
+        if exp_match:
+            if exp_match.group(2):
+                updated_context['experience'] = f"{exp_match.group(1)}-{exp_match.group(2)} years"
+            else:
+                updated_context['experience'] = f"{exp_match.group(1)}+ years"
+
+    # Extract skills mentioned
+    common_skills = ['python', 'javascript', 'react', 'node.js', 'sql', 'aws', 'docker', 'kubernetes',
+                    'machine learning', 'data analysis', 'excel', 'powerbi', 'tableau', 'figma', 'photoshop']
+
+    for skill in common_skills:
+        if skill in message_lower and skill not in updated_context.get('skills', []):
+            if 'skills' not in updated_context:
+                updated_context['skills'] = []
+            updated_context['skills'].append(skill.title())
+
+    return updated_context
+
+
+# (user message, AI response) pairs on which the new implementation must agree with the old one
+EQUIVALENT_TURNS = [
+    ("We need a senior python developer at Acme company with 3-5 years experience", "Sure."),
+    ("Looking for a data analyst, sql and excel, 2 years exp", "Great, noted."),
+    ("Hiring a lead generation specialist", "ok"),
+    ("Our organization Globex is hiring a Product Manager", "ok"),
+    ("I work at Acme startup and need an engineer", "ok"),
+    ("company", "ok"),
+    ("Machine learning engineer with docker, kubernetes and aws. 4 years of experience", "ok"),
+    ("React, Node.js and JavaScript frontend developer; Figma/Photoshop a plus", "ok"),
+    ("Analyst for data analysis with powerbi and tableau, 5 to 7 years experience", "ok"),
+    ("Company overview: We build rockets. Our benefits include: health insurance, gym", "Thanks!"),
+    ("Benefits include: remote work", "ok"),
+    # Leave days
+    ("Please change the benefit", "Updated: 5 days of leave per year. Benefit cuti 12 hari, BPJS"),
+    ("Please update the benefits", "Leave is now 15 days"),
+    ("revise benefit", "Benefits: annual leave 14 hari and more"),
+    ("Update benefit to 12 hari", "- Benefit cuti: **18** hari\n- BPJS"),
+    ("Hi", "Benefit cuti 20 hari, BPJS"),
+    ("Hi", "We offer 5 days of leave and cuti 10 hari as a benefit"),
+    ("Hi", "5 days of leave, benefit without cuti days"),
+    ("Hi", "You get 8 days of leave"),
+    ("change benefit please", "Sorry, I can't."),
+    ("Change the benefits", "**Benefits:**\n* Cuti 21 hari\n* BPJS"),
+    ("update benefit", "Benefit: 10 days of leave, plus cuti 3 hari bersama"),
+]
+
+
+@pytest.mark.parametrize("user_message, ai_response", EQUIVALENT_TURNS)
+def test_update_job_context_matches_the_previous_implementation(user_message, ai_response):
+    expected = previous_update_job_context({}, user_message, ai_response)
+    assert update_job_context({}, user_message, ai_response) == expected
+
+
+def test_benefit_cuti_wins_over_an_earlier_days_of_leave():
+    days = context_extractor.benefit_days("hi", "5 days of leave ... Benefit cuti 12 hari")
+    assert days == "12"
+    assert context_extractor.benefit_days("hi", "5 days of leave") is None
+
+
+def test_skills_are_matched_as_whole_words_and_not_repeated():
+    context = {'skills': ['Python']}
+    updated = update_job_context(context, "python and mysql", "ok")
+    assert updated['skills'] == ['Python']
+    assert context == {'skills': ['Python']}
+
+
+def test_added_vocabulary_is_picked_up():
+    extractor = ContextExtractor()
+    extractor.add_titles(['recruiter'])
+    extractor.add_skills({'Rust': ['rust']})
+    extracted = extractor.extract_message("Tech recruiter who knows rust")
+    assert (extracted['job_title'], extracted['skills']) == ("Tech Recruiter Who", ['Rust'])
@@ -0,0 +1,87 @@
+import jd_analyzer
+from jd_analyzer import job_description_output_budget, parse_structured_job_description
+from llm_utils import CHARS_PER_TOKEN
+
+STRUCTURED_JD = """Job Title: Backend Engineer
+Location: Bangalore / Remote
+Experience: 3-5 years
+Type: Full-time
+
+About the Role
+We build payment systems used by millions.
+
+Responsibilities
+- Design and build backend services.
+- Review code and mentor engineers.
+
+Basic Qualifications
+- Bachelor's degree in Computer Science.
+- 3+ years of professional experience in Python.
+- Strong knowledge of PostgreSQL.
+
+Preferred Qualifications
+- Experience with Kubernetes.
+- AWS certification.
+- Prior experience in a fintech environment.
+
+Team Rituals:
+- Weekly demos.
+
+Benefits
+- Health insurance.
+"""
+
+
+def test_structured_jd_is_parsed_into_sections():
+    requirements, unclassified = parse_structured_job_description(STRUCTURED_JD)
+
+    must_have = requirements["must_have_requirements"]
+    assert must_have["core_responsibilities"] == ["Design and build backend services", "Review code and mentor engineers"]
+    assert must_have["qualifications"] == ["Bachelor's degree in Computer Science"]
+    assert must_have["technical_skills"] == ["Strong knowledge of PostgreSQL"]
+    assert must_have["experience"] == "3-5 years; 3+ years of professional experience in Python"
+
+    good_to_have = requirements["good_to_have_requirements"]
+    assert good_to_have["additional_skills"] == ["Experience with Kubernetes"]
+    assert good_to_have["extra_qualifications"] == ["AWS certification"]
+    assert good_to_have["bonus_experience"] == ["Prior experience in a fintech environment"]
+
+    assert requirements["additional_screening_criteria"] == ["Location: Bangalore / Remote", "Type: Full-time"]
+    assert requirements["original_job_description"] == STRUCTURED_JD
+
+
+def test_unknown_sections_are_left_for_the_model():
+    _, unclassified = parse_structured_job_description(STRUCTURED_JD)
+    assert unclassified == "Team Rituals:\n- Weekly demos."
+
+
+def test_ignored_sections_are_dropped():
+    requirements, unclassified = parse_structured_job_description(STRUCTURED_JD)
+    assert "Health insurance" not in str(requirements["must_have_requirements"])
+    assert "Health insurance" not in unclassified
+    assert "payment systems" not in unclassified
+
+
+def test_unstructured_jd_is_not_parsed():
+    prose = ("We are looking for a backend engineer with strong Python skills who enjoys "
+             "working on payments. You will design services and review code.")
+    assert parse_structured_job_description(prose) is None
+
+
+def test_jd_without_required_section_is_not_parsed():
+    jd = "Responsibilities\n- Build services.\n\nBenefits\n- Free lunch."
+    assert parse_structured_job_description(jd) is None
+
+
+def test_output_budget_scales_with_the_job_description():
+    short = job_description_output_budget("Python developer")
+    assert short == jd_analyzer.JD_MIN_OUTPUT_TOKENS
+
+    # Past the minimum, the budget grows with the input at JD_OUTPUT_TOKENS_PER_INPUT_TOKEN
+    medium = job_description_output_budget("x" * (2000 * CHARS_PER_TOKEN))
+    longer = job_description_output_budget("x" * (4000 * CHARS_PER_TOKEN))
+    assert jd_analyzer.JD_MIN_OUTPUT_TOKENS < medium < longer < jd_analyzer.JD_MAX_OUTPUT_TOKENS
+    assert longer - medium == int(2000 * jd_analyzer.JD_OUTPUT_TOKENS_PER_INPUT_TOKEN)
+
+    assert job_description_output_budget("x" * (50000 * CHARS_PER_TOKEN)) == jd_analyzer.JD_MAX_OUTPUT_TOKENS
+    assert job_description_output_budget("") == jd_analyzer.JD_MIN_OUTPUT_TOKENS
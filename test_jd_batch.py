@@ -0,0 +1,46 @@
+import pytest
+
+import jd_batch
+from jd_batch import analyze_job_descriptions, duplicate_ids, job_description_entry, parse_job_descriptions_jsonl
+
+
+def test_parse_job_descriptions_jsonl_skips_invalid_lines():
+    lines = [
+        '{"id": "be", "title": "Backend", "job_description": "Build APIs"}',
+        'not json',
+        '{"title": "no text"}',
+        '',
+        b'{"text": "Run the data platform"}',
+    ]
+    entries = parse_job_descriptions_jsonl(lines)
+    assert [entry['job_description'] for entry in entries] == ["Build APIs", "Run the data platform"]
+    assert entries[0]['id'] == "be" and entries[0]['title'] == "Backend"
+    assert entries[1]['id'] == jd_batch.requirements_id_for("Run the data platform")
+
+
+def test_duplicate_ids_lists_each_repeated_id_once():
+    entries = [job_description_entry("a", "x"), job_description_entry("b", "y"),
+               job_description_entry("c", "x"), job_description_entry("d", "x")]
+    assert duplicate_ids(entries) == ["x"]
+    assert duplicate_ids(entries[:2]) == []
+
+
+def test_analyze_job_descriptions_rejects_duplicate_ids(monkeypatch):
+    calls = []
+    monkeypatch.setattr(jd_batch, "analyze_job_description", lambda text, model: calls.append(text))
+    entries = [job_description_entry("Backend JD", "jd-1"), job_description_entry("Frontend JD", "jd-1")]
+
+    with pytest.raises(ValueError, match="jd-1"):
+        analyze_job_descriptions(entries)
+    assert calls == []
+
+
+def test_analyze_job_descriptions_keys_results_by_id(monkeypatch):
+    def fake_analyze(text, model):
+        return None if text == "broken" else {"source": text}
+
+    monkeypatch.setattr(jd_batch, "analyze_job_description", fake_analyze)
+    entries = [job_description_entry("Backend JD", "be", "Backend"), job_description_entry("broken", "bad")]
+
+    results = analyze_job_descriptions(entries, max_workers=2)
+    assert results == {"be": {"source": "Backend JD", "title": "Backend"}, "bad": None}
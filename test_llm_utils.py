@@ -0,0 +1,260 @@
+import threading
+import time
+import types
+
+import httpx2
+import pytest
+from openai import AuthenticationError
+
+import llm_utils
+from llm_utils import ApiKeyVerifier, RequestHedger, ResponseParseError, _percentile, parse_json_response, repair_json
+
+
+def test_repair_json_strips_code_fences_and_prose():
+    text = 'Here is the analysis:\n```json\n{"score": 7, "skills": ["python"]}\n```\nLet me know!'
+    assert repair_json(text) == {"score": 7, "skills": ["python"]}
+
+
+def test_repair_json_removes_trailing_commas():
+    assert repair_json('{"a": [1, 2,], "b": {"c": true,},}') == {"a": [1, 2], "b": {"c": True}}
+
+
+def test_repair_json_closes_truncated_output():
+    assert repair_json('{"a": 1, "b": [1, 2, {"c": "unfinish') == {"a": 1, "b": [1, 2, {"c": "unfinish"}]}
+
+
+def test_repair_json_drops_a_dangling_key():
+    assert repair_json('{"a": 1, "b": {"c": 2}, "d":') == {"a": 1, "b": {"c": 2}}
+
+
+@pytest.mark.parametrize("text", ["", "no json here", "[1, 2, 3]"])
+def test_repair_json_rejects_responses_without_an_object(text):
+    with pytest.raises(ResponseParseError):
+        repair_json(text)
+
+
+def test_parse_json_response_parses_valid_json():
+    assert parse_json_response('{"a": 1, "b": 2}', required_keys=("a", "b")) == {"a": 1, "b": 2}
+
+
+def test_parse_json_response_falls_back_to_repair():
+    assert parse_json_response('```json\n{"a": 1,}\n```', required_keys=("a",)) == {"a": 1}
+
+
+def test_parse_json_response_requires_an_object():
+    with pytest.raises(ResponseParseError, match="Expected a JSON object"):
+        parse_json_response('[{"a": 1}]')
+
+
+def test_parse_json_response_reports_missing_keys():
+    with pytest.raises(ResponseParseError, match="missing keys: b"):
+        parse_json_response('{"a": 1}', required_keys=("a", "b"))
+
+
+def make_hedger(**kwargs):
+    settings = dict(enabled=True, max_rate=1.0, min_samples=3, window=10, max_workers=4)
+    settings.update(kwargs)
+    return RequestHedger(**settings)
+
+
+def slow_then_fast(delay=0.5):
+    """fn() whose first call is slow and later calls return at once."""
+    lock = threading.Lock()
+    calls = []
+
+    def fn():
+        with lock:
+            calls.append(1)
+            first = len(calls) == 1
+        if first:
+            time.sleep(delay)
+            return "slow"
+        return "fast"
+    return fn, calls
+
+
+def test_percentile_uses_nearest_rank():
+    assert _percentile([], 0.9) is None
+    assert _percentile([5, 1, 3, 2, 4], 0.5) == 3
+    assert _percentile(list(range(1, 11)), 0.9) == 10
+
+
+def test_hedger_does_not_hedge_without_enough_latency_samples():
+    hedger = make_hedger()
+    fn, calls = slow_then_fast(delay=0.05)
+    assert hedger.call(fn, "o4-mini") == "slow"
+    assert len(calls) == 1
+    assert hedger.hedge_delay("o4-mini") is None
+    assert hedger.stats()["hedges"] == 0
+
+
+def test_hedger_returns_the_hedged_response_when_the_primary_is_slow():
+    hedger = make_hedger()
+    for _ in range(3):
+        hedger.call(lambda: "warm-up", "o4-mini")
+    assert hedger.hedge_delay("o4-mini") is not None
+
+    fn, calls = slow_then_fast()
+    assert hedger.call(fn, "o4-mini") == "fast"
+    assert len(calls) == 2
+    stats = hedger.stats()
+    assert (stats["calls"], stats["hedges"], stats["hedge_wins"]) == (4, 1, 1)
+
+
+def test_hedger_respects_the_hedge_budget():
+    hedger = make_hedger(max_rate=0.0)
+    for _ in range(3):
+        hedger.call(lambda: "warm-up", "o4-mini")
+
+    fn, calls = slow_then_fast(delay=0.1)
+    assert hedger.call(fn, "o4-mini") == "slow"
+    assert len(calls) == 1
+    assert hedger.stats()["hedges"] == 0
+
+
+def test_disabled_hedger_only_records_latency():
+    hedger = make_hedger(enabled=False)
+    for _ in range(3):
+        hedger.call(lambda: "warm-up", "o4-mini")
+    fn, calls = slow_then_fast(delay=0.05)
+    assert hedger.call(fn, "o4-mini") == "slow"
+    assert len(calls) == 1
+    assert hedger._executor is None
+
+
+def test_api_key_checks_are_counted_under_concurrency(monkeypatch):
+    client = types.SimpleNamespace(models=types.SimpleNamespace(list=lambda: []))
+    monkeypatch.setattr(llm_utils, "get_client", lambda: client)
+    verifier = ApiKeyVerifier()
+
+    threads = [threading.Thread(target=lambda: [verifier._check() for _ in range(200)]) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert verifier.stats()["checks"] == 1600
+
+
+def test_api_key_status_is_cached_until_invalidated(monkeypatch):
+    client = types.SimpleNamespace(models=types.SimpleNamespace(list=lambda: []))
+    monkeypatch.setattr(llm_utils, "get_client", lambda: client)
+    verifier = ApiKeyVerifier()
+
+    assert verifier.status()["valid"] and verifier.status()["valid"]
+    assert verifier.stats()["checks"] == 1
+    verifier.invalidate()
+    assert verifier.cached_status()["valid"] is False
+    assert verifier.status()["valid"]
+    assert verifier.stats() == {"checks": 2, "invalidations": 1, "cached": True}
+
+
+def auth_error():
+    response = httpx2.Response(401, request=httpx2.Request("GET", "https://api.openai.com/v1/models"))
+    return AuthenticationError("Incorrect API key provided", response=response, body=None)
+
+
+class ModelsClient:
+    """Client whose models.list goes through the shared client's response hook, like the real one."""
+
+    def __init__(self, valid=True):
+        self.valid = valid
+        self.models = types.SimpleNamespace(list=self.list)
+
+    def list(self):
+        if self.valid:
+            return []
+        llm_utils._observe_response(types.SimpleNamespace(status_code=401))
+        raise auth_error()
+
+
+def wait_until(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError("timed out")
+        time.sleep(0.01)
+
+
+def test_rejected_key_is_rechecked_in_the_background(monkeypatch):
+    client = ModelsClient()
+    monkeypatch.setattr(llm_utils, "get_client", lambda: client)
+    verifier = ApiKeyVerifier()
+    monkeypatch.setattr(llm_utils, "api_key_verifier", verifier)
+
+    # A 401 on normal traffic makes the service unready until a check passes again
+    llm_utils._observe_response(types.SimpleNamespace(status_code=401))
+    assert verifier.cached_status()["valid"] is False
+    wait_until(lambda: verifier.cached_status()["valid"] is True)
+    assert verifier.stats() == {"checks": 1, "invalidations": 1, "cached": True}
+
+
+def test_failed_checks_are_not_counted_as_invalidations(monkeypatch):
+    client = ModelsClient(valid=False)
+    monkeypatch.setattr(llm_utils, "get_client", lambda: client)
+    verifier = ApiKeyVerifier(error_ttl=0.2)
+    monkeypatch.setattr(llm_utils, "api_key_verifier", verifier)
+
+    assert verifier.status()["valid"] is False
+    assert verifier.stats()["invalidations"] == 0
+
+    # Rechecks of a rejected key are spaced by error_ttl rather than run on every read
+    for _ in range(5):
+        assert verifier.cached_status()["valid"] is False
+    assert verifier.stats()["checks"] == 1
+    client.valid = True
+    time.sleep(0.2)
+    wait_until(lambda: verifier.cached_status()["valid"] is True)
+    assert verifier.stats() == {"checks": 2, "invalidations": 0, "cached": True}
+
+
+class ContinuationClient:
+    """Returns the given (content, finish_reason) pairs in order and records every request."""
+
+    def __init__(self, replies):
+        self.replies = list(replies)
+        self.calls = []
+        self.chat = types.SimpleNamespace(completions=types.SimpleNamespace(create=self.create))
+
+    def create(self, **kwargs):
+        self.calls.append(kwargs)
+        content, finish_reason = self.replies.pop(0)
+        message = types.SimpleNamespace(content=content)
+        return types.SimpleNamespace(choices=[types.SimpleNamespace(message=message, finish_reason=finish_reason)])
+
+
+def test_truncated_completions_are_continued_and_joined(monkeypatch):
+    monkeypatch.setattr(llm_utils.rate_limiter, "interval", 0.0)
+    client = ContinuationClient([('{"skills": ["py', "length"), ('thon", "sq', "length"), ('l"]}', "stop")])
+    messages = [{"role": "user", "content": "Extract the skills"}]
+    response_format = {"type": "json_object"}
+
+    content, finish_reason = llm_utils.create_completion_with_continuation(
+        client, messages, response_format=response_format, model="o4-mini")
+
+    assert (content, finish_reason) == ('{"skills": ["python", "sql"]}', "stop")
+    assert client.calls[0]["response_format"] == response_format
+    # Continuations extend the partial output and are sent without the response format
+    second, third = client.calls[1:]
+    assert "response_format" not in second and "response_format" not in third
+    assert second["messages"][-2:] == [{"role": "assistant", "content": '{"skills": ["py'},
+                                       {"role": "user", "content": llm_utils.CONTINUATION_PROMPT}]
+    assert third["messages"][-2]["content"] == '{"skills": ["python", "sq'
+    assert third["model"] == "o4-mini"
+
+
+def test_continuations_stop_at_the_cap(monkeypatch):
+    monkeypatch.setattr(llm_utils.rate_limiter, "interval", 0.0)
+    client = ContinuationClient([("a", "length"), ("b", "length"), ("c", "length"), ("d", "length")])
+
+    content, finish_reason = llm_utils.create_completion_with_continuation(
+        client, [{"role": "user", "content": "x"}], max_continuations=2, model="o4-mini")
+
+    assert (content, finish_reason) == ("abc", "length")
+    assert len(client.calls) == 3
+
+
+def test_complete_responses_are_not_continued(monkeypatch):
+    monkeypatch.setattr(llm_utils.rate_limiter, "interval", 0.0)
+    client = ContinuationClient([("{}", "stop")])
+    assert llm_utils.create_completion_with_continuation(client, [], model="o4-mini") == ("{}", "stop")
+    assert len(client.calls) == 1
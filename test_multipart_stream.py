@@ -0,0 +1,78 @@
+import io
+
+import pytest
+
+import multipart_stream
+from multipart_stream import close_files, iter_multipart_parts
+
+BOUNDARY = b"----resume-boundary"
+
+
+def multipart_body(parts, closed=True):
+    body = b""
+    for kind, name, value in parts:
+        body += b"--" + BOUNDARY + b"\r\n"
+        if kind == "file":
+            body += b'Content-Disposition: form-data; name="files"; filename="' + name.encode() + b'"\r\n'
+            body += b"Content-Type: application/octet-stream\r\n\r\n"
+        else:
+            body += b'Content-Disposition: form-data; name="' + name.encode() + b'"\r\n\r\n'
+        body += value + b"\r\n"
+    if closed:
+        body += b"--" + BOUNDARY + b"--\r\n"
+    return body
+
+
+class RecordingStream(io.BytesIO):
+    """Counts how many bytes have been read when each part is yielded."""
+
+    def __init__(self, data):
+        super().__init__(data)
+        self.bytes_read = 0
+
+    def read(self, size=-1):
+        chunk = super().read(size)
+        self.bytes_read += len(chunk)
+        return chunk
+
+
+def test_parts_are_yielded_in_order_and_files_are_rewound():
+    body = multipart_body([("field", "model", b"o4-mini"), ("file", "a.txt", b"Resume A"),
+                           ("file", "b.txt", b"Resume B")])
+    opened = []
+    parts = [(kind, name, value.read() if kind == "file" else value)
+             for kind, name, value in iter_multipart_parts(io.BytesIO(body), BOUNDARY, opened, chunk_size=7)]
+
+    assert parts == [("field", "model", "o4-mini"), ("file", "a.txt", b"Resume A"), ("file", "b.txt", b"Resume B")]
+    assert len(opened) == 2
+
+
+def test_parts_are_yielded_before_the_body_has_been_read():
+    first = b"A" * 10000
+    body = multipart_body([("file", "a.txt", first), ("file", "b.txt", b"B" * 100000)])
+    stream = RecordingStream(body)
+
+    parts = iter_multipart_parts(stream, BOUNDARY, [], chunk_size=1024)
+    kind, name, file = next(parts)
+    assert (kind, name, file.read()) == ("file", "a.txt", first)
+    assert stream.bytes_read < len(body) // 2
+
+
+def test_truncated_body_raises_and_still_registers_the_partial_file():
+    body = multipart_body([("file", "a.txt", b"Resume A")], closed=False)[:-10]
+    opened = []
+    with pytest.raises(ValueError):
+        list(iter_multipart_parts(io.BytesIO(body), BOUNDARY, opened))
+    assert len(opened) == 1
+
+
+def test_close_files_closes_spooled_and_rolled_over_parts(monkeypatch):
+    monkeypatch.setattr(multipart_stream, "SPOOL_MAX_BYTES", 100)
+    body = multipart_body([("file", "small.txt", b"tiny"), ("file", "large.txt", b"L" * 1000)])
+    opened = []
+    files = [value for _, _, value in iter_multipart_parts(io.BytesIO(body), BOUNDARY, opened)]
+
+    assert files == opened
+    assert files[1]._rolled and not files[0]._rolled
+    close_files(opened)
+    assert all(file.closed for file in opened)
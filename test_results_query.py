@@ -0,0 +1,102 @@
+import pytest
+
+from results_query import decode_cursor, encode_cursor, index_results, must_have_coverage, project, query_results
+
+
+def make_result(name, semantic, quantitative=50, recommendation="Yes", location="Jakarta", must_have=None):
+    return {
+        'filename': f"{name}.pdf",
+        'semantic_percentage': semantic,
+        'quantitative_percentage': quantitative,
+        'analysis': {
+            'contact_info': {'full_name': name, 'location': location},
+            'final_recommendation': recommendation,
+            'requirement_match': {'must_have_requirements': {'skills': must_have or {}}},
+        },
+    }
+
+
+def all_pages(results, **query):
+    """Follows next_cursor until the last page; returns the ids in the order they were returned."""
+    ids, cursor = [], None
+    while True:
+        page, cursor, _ = query_results(results, cursor=cursor, **query)
+        ids.extend(result['id'] for result in page)
+        if cursor is None:
+            return ids
+
+
+@pytest.fixture
+def results():
+    # Several ties on the semantic score, so paging has to break them by id
+    scores = [70, 90, 70, 40, 90, 70, 55, 90, 10, 70]
+    return index_results([make_result(f"c{i}", score, quantitative=100 - i) for i, score in enumerate(scores)])
+
+
+def test_must_have_coverage_and_indexing():
+    assert must_have_coverage({'requirement_match': {'must_have_requirements': {
+        'skills': {'python': True, 'sql': False}, 'education': {'degree': True}, 'note': 'ignored'}}}) == 67
+    assert must_have_coverage({}) == 0
+    indexed = index_results([make_result("Ana", 80, location="Bandung", must_have={'python': True})])
+    assert project(indexed[0], ('id', 'full_name', 'location', 'must_have_coverage', 'missing')) == {
+        'id': 0, 'full_name': "Ana", 'location': "Bandung", 'must_have_coverage': 100}
+
+
+@pytest.mark.parametrize("sort, order", [("semantic", "desc"), ("semantic", "asc"),
+                                         ("quantitative", "desc"), ("quantitative", "asc")])
+@pytest.mark.parametrize("limit", [1, 3, 4, 10, 20])
+def test_pages_cover_every_result_once_in_sorted_order(results, sort, order, limit):
+    field = 'semantic_percentage' if sort == "semantic" else 'quantitative_percentage'
+    descending = order == "desc"
+    expected = [result['id'] for result in sorted(
+        results, key=lambda r: (r[field], -r['id'] if descending else r['id']), reverse=descending)]
+
+    assert all_pages(results, sort=sort, order=order, limit=limit) == expected
+
+
+def test_ties_are_broken_by_ascending_id(results):
+    page, cursor, total = query_results(results, limit=4)
+    assert [result['id'] for result in page] == [1, 4, 7, 0]
+    assert total == 10 and cursor is not None
+
+
+def test_filters_apply_to_every_page():
+    entries = [make_result(f"c{i}", 100 - i, recommendation="Yes" if i % 2 else "No",
+                           location="Jakarta" if i < 6 else "Surabaya") for i in range(10)]
+    results = index_results(entries)
+    assert all_pages(results, limit=2, recommendation="yes", location="jak") == [1, 3, 5]
+    assert query_results(results, limit=2, recommendation="yes", location="jak")[2] == 3
+
+
+def test_cursor_survives_results_dropping_out_of_the_filter():
+    results = index_results([make_result(f"c{i}", 100 - i) for i in range(6)])
+    page, cursor, _ = query_results(results, limit=2, version=1)
+    assert [result['id'] for result in page] == [0, 1]
+
+    # The result the cursor points after is no longer a "Yes"
+    results[1]['recommendation'] = "No"
+    page, _, _ = query_results(results, limit=2, cursor=cursor, version=1, recommendation="yes")
+    assert [result['id'] for result in page] == [2, 3]
+
+
+def test_cursor_is_tied_to_sort_order_and_version(results):
+    _, cursor, _ = query_results(results, limit=2, version=3)
+    for query in ({'version': 4}, {'version': 3, 'order': 'asc'}, {'version': 3, 'sort': 'quantitative'}):
+        with pytest.raises(ValueError, match="Cursor does not match"):
+            query_results(results, limit=2, cursor=cursor, **query)
+
+
+@pytest.mark.parametrize("cursor", ["not base64!", encode_cursor([1, 2]), encode_cursor({'after': [1]}),
+                                    encode_cursor({'sort': 'semantic'})])
+def test_malformed_cursors_are_rejected(cursor):
+    with pytest.raises(ValueError, match="Malformed cursor"):
+        decode_cursor(cursor)
+
+
+def test_unknown_sort_and_order_and_limit_bounds(results):
+    with pytest.raises(ValueError):
+        query_results(results, sort="name")
+    with pytest.raises(ValueError):
+        query_results(results, order="sideways")
+    assert len(query_results(results, limit=0)[0]) == 1
+    assert len(query_results(results * 20, limit=1000)[0]) == 100
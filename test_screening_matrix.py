@@ -0,0 +1,172 @@
+import json
+import threading
+import types
+
+import llm_utils
+import resume_analyzer
+import screening_matrix
+from resume_analyzer import MATRIX_OUTPUT_INSTRUCTION, RESUME_OUTPUT_INSTRUCTION, analyze_resume_matrix
+from screening_matrix import fill_candidate_matrix, plan_matrix_calls
+
+
+def requirements(skill):
+    return {
+        'original_job_description': f"{skill} engineer",
+        'must_have_requirements': {'technical_skills': [skill], 'experience': "3 years",
+                                   'qualifications': [], 'core_responsibilities': []},
+        'good_to_have_requirements': {'additional_skills': []},
+        'additional_screening_criteria': []
+    }
+
+
+def evaluation(skill, recommendation="Yes"):
+    return {
+        'requirement_match': {
+            'must_have_requirements': {'technical_skills': {skill: True}, 'experience': True,
+                                       'qualifications': True, 'core_responsibilities': {}},
+            'good_to_have_requirements': {'additional_skills': {}},
+            'additional_screening_criteria': {}
+        },
+        'qualitative_assessment': {'transferability_to_role': "High"},
+        'final_recommendation': recommendation,
+        'summary_of_key_factors': [f"knows {skill}"]
+    }
+
+
+def completion(content):
+    message = types.SimpleNamespace(content=content)
+    return types.SimpleNamespace(choices=[types.SimpleNamespace(message=message, finish_reason="stop")])
+
+
+class FakeClient:
+    """Answers matrix requests with `matrix_replies` and semantic scoring requests with fixed scores."""
+
+    def __init__(self, matrix_replies, scores=None):
+        self.matrix_replies = list(matrix_replies)
+        self.scores = scores or {}
+        self.calls = []
+        self.chat = types.SimpleNamespace(completions=types.SimpleNamespace(create=self.create))
+
+    def create(self, **kwargs):
+        self.calls.append(kwargs)
+        if kwargs["model"] != "gpt-4o-mini":
+            return completion(self.matrix_replies.pop(0))
+        if '"scores"' in kwargs["messages"][0]["content"]:
+            return completion(json.dumps({"scores": {key: {"semantic_score": score, "reasoning": "ok"}
+                                                      for key, score in self.scores.items()}}))
+        return completion(json.dumps({"semantic_score": 40, "reasoning": "single"}))
+
+
+def use_client(monkeypatch, client):
+    monkeypatch.setattr(resume_analyzer, "get_client", lambda: client)
+    monkeypatch.setattr(llm_utils.rate_limiter, "interval", 0.0)
+
+
+def test_plan_splits_jds_into_groups_per_candidate():
+    calls = plan_matrix_calls(["ana", "ben"], ["j1", "j2", "j3", "j4", "j5"], jds_per_call=2)
+    assert calls == [("ana", ["j1", "j2"]), ("ana", ["j3", "j4"]), ("ana", ["j5"]),
+                     ("ben", ["j1", "j2"]), ("ben", ["j3", "j4"]), ("ben", ["j5"])]
+    assert plan_matrix_calls(["ana"], ["j1", "j2"], jds_per_call=0) == [("ana", ["j1"]), ("ana", ["j2"])]
+    assert plan_matrix_calls(["ana"], []) == []
+
+
+def test_matrix_response_is_parsed_per_job_and_scored_in_one_request(monkeypatch):
+    reply = json.dumps({"contact_info": {"full_name": "Ana"},
+                        "evaluations": {"j1": evaluation("python"), "j2": evaluation("sql", "No")}})
+    client = FakeClient([reply], scores={"0": 81, "1": 150})
+    use_client(monkeypatch, client)
+
+    results = analyze_resume_matrix("Ana, python", {"j1": requirements("python"), "j2": requirements("sql")})
+
+    assert results["j1"]["analysis"]["contact_info"] == {"full_name": "Ana"}
+    assert results["j1"]["analysis"]["final_recommendation"] == "Yes"
+    assert results["j2"]["analysis"]["final_recommendation"] == "No"
+    assert (results["j1"]["semantic_score"], results["j2"]["semantic_score"]) == (81, 100)
+    assert results["j1"]["quantitative_score"] == "3/3"
+    # One matrix request plus one semantic scoring request for both jobs
+    assert [call["model"] for call in client.calls] == ["o4-mini", "gpt-4o-mini"]
+
+
+def test_matrix_prompt_has_a_single_output_instruction(monkeypatch):
+    reply = json.dumps({"contact_info": {}, "evaluations": {"j1": evaluation("python")}})
+    client = FakeClient([reply], scores={"0": 70})
+    use_client(monkeypatch, client)
+    analyze_resume_matrix("resume", {"j1": requirements("python"), "j2": requirements("sql")})
+
+    prompt = client.calls[0]["messages"][1]["content"]
+    assert prompt.rstrip().endswith(MATRIX_OUTPUT_INSTRUCTION)
+    assert RESUME_OUTPUT_INSTRUCTION not in prompt
+    assert "## Job j1:" in prompt and "## Job j2:" in prompt
+
+
+def test_jobs_missing_from_the_matrix_response_are_none(monkeypatch):
+    incomplete = evaluation("sql")
+    del incomplete['final_recommendation']
+    reply = json.dumps({"contact_info": {}, "evaluations": {"j1": evaluation("python"), "j2": incomplete}})
+    client = FakeClient([reply])
+    use_client(monkeypatch, client)
+
+    results = analyze_resume_matrix("resume", {"j1": requirements("python"), "j2": requirements("sql"),
+                                               "j3": requirements("go")})
+    assert results["j2"] is None and results["j3"] is None
+    # A single valid job is scored with the regular single-assessment request
+    assert results["j1"]["semantic_score"] == 40
+    assert '"scores"' not in client.calls[-1]["messages"][0]["content"]
+
+
+def test_unparseable_matrix_responses_leave_every_cell_empty(monkeypatch):
+    client = FakeClient(["not json", "still not json"])
+    use_client(monkeypatch, client)
+    assert analyze_resume_matrix("resume", {"j1": requirements("python"), "j2": requirements("sql")}) == {
+        "j1": None, "j2": None}
+    assert len(client.calls) == resume_analyzer.MAX_PARSE_ATTEMPTS
+
+
+def test_fill_retries_only_the_missing_cells(monkeypatch):
+    lock = threading.Lock()
+    grouped, single = [], []
+
+    def fake_matrix(resume_text, group, model="o4-mini"):
+        with lock:
+            grouped.append((resume_text, sorted(group)))
+        # Every grouped call drops its last job
+        return {requirements_id: (None if requirements_id == sorted(group)[-1] else f"{resume_text}/{requirements_id}")
+                for requirements_id in group}
+
+    def fake_analyze(resume_text, requirements, model="o4-mini"):
+        with lock:
+            single.append((resume_text, requirements['original_job_description']))
+        return f"{resume_text}/retried"
+
+    monkeypatch.setattr(screening_matrix, "analyze_resume_matrix", fake_matrix)
+    monkeypatch.setattr(screening_matrix, "analyze_resume", fake_analyze)
+
+    jobs = {f"j{i}": requirements(f"skill{i}") for i in range(1, 6)}
+    matrix = fill_candidate_matrix({"ana": "A", "ben": "B"}, jobs, jds_per_call=2, max_workers=2)
+
+    assert sorted(grouped) == [("A", ["j1", "j2"]), ("A", ["j3", "j4"]), ("B", ["j1", "j2"]), ("B", ["j3", "j4"])]
+    # j5 is a single-job call; j2 and j4 are retried because their grouped calls dropped them
+    assert sorted(single) == sorted([(resume, f"skill{i} engineer") for resume in "AB" for i in (2, 4, 5)])
+    assert matrix[("ana", "j1")] == "A/j1" and matrix[("ben", "j3")] == "B/j3"
+    assert matrix[("ana", "j2")] == "A/retried" and matrix[("ben", "j5")] == "B/retried"
+    assert len(matrix) == 10
+
+
+def test_fill_records_failed_cells_as_none(monkeypatch):
+    def broken_matrix(resume_text, group, model="o4-mini"):
+        raise RuntimeError("model down")
+
+    monkeypatch.setattr(screening_matrix, "analyze_resume_matrix", broken_matrix)
+    monkeypatch.setattr(screening_matrix, "analyze_resume", lambda resume_text, requirements, model="o4-mini": None)
+
+    matrix = fill_candidate_matrix({"ana": "A"}, {"j1": requirements("a"), "j2": requirements("b")})
+    assert matrix == {("ana", "j1"): None, ("ana", "j2"): None}
+
+
+def test_scores_missing_from_the_batched_response_are_requested_individually(monkeypatch):
+    client = FakeClient([], scores={"1": 77})
+    use_client(monkeypatch, client)
+    analyses = [dict(evaluation("python"), contact_info={}), dict(evaluation("sql"), contact_info={})]
+
+    assert resume_analyzer.calculate_semantic_scores(analyses) == [40, 77]
+    assert len(client.calls) == 2
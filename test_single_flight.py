@@ -0,0 +1,98 @@
+import multiprocessing
+import os
+import threading
+import time
+
+import pytest
+
+from single_flight import SingleFlight, fcntl
+
+
+def run_concurrently(single_flight, key, fn, callers):
+    """Starts `callers` threads calling single_flight.do(key, fn); returns their results."""
+    results = [None] * callers
+
+    def call(index):
+        try:
+            results[index] = single_flight.do(key, fn)
+        except Exception as e:
+            results[index] = e
+
+    threads = [threading.Thread(target=call, args=(i,)) for i in range(callers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def slow(result, calls, delay=0.2):
+    def fn():
+        calls.append(1)
+        time.sleep(delay)
+        if isinstance(result, Exception):
+            raise result
+        return result
+    return fn
+
+
+def test_concurrent_identical_calls_share_one_result():
+    flight = SingleFlight(use_file_locks=False)
+    calls = []
+    results = run_concurrently(flight, "key", slow({"score": 7}, calls), callers=5)
+
+    assert len(calls) == 1
+    assert results == [{"score": 7}] * 5
+    assert flight.stats() == {"in_flight": 0, "calls": 1, "shared": 4}
+
+
+def test_shared_results_are_copies():
+    flight = SingleFlight(use_file_locks=False)
+    results = run_concurrently(flight, "key", slow({"skills": []}, []), callers=3)
+    results[0]["skills"].append("python")
+    assert [result["skills"] for result in results[1:]] == [[], []]
+
+
+def test_errors_are_shared_with_waiting_callers():
+    flight = SingleFlight(use_file_locks=False)
+    calls = []
+    results = run_concurrently(flight, "key", slow(RuntimeError("model down"), calls), callers=3)
+
+    assert len(calls) == 1
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+
+def test_different_keys_and_later_calls_are_not_coalesced():
+    flight = SingleFlight(use_file_locks=False)
+    calls = []
+    assert flight.do("a", slow(1, calls, delay=0)) == 1
+    assert flight.do("a", slow(2, calls, delay=0)) == 2
+    assert flight.do("b", slow(3, calls, delay=0)) == 3
+    assert len(calls) == 3
+
+
+def _call_in_process(lock_dir, calls_dir, queue):
+    def fn():
+        open(os.path.join(calls_dir, str(os.getpid())), "w").close()
+        time.sleep(0.5)
+        return {"score": 9}
+
+    queue.put(SingleFlight(lock_dir=lock_dir).do("shared-key", fn))
+
+
+@pytest.mark.skipif(fcntl is None, reason="file locks need fcntl")
+def test_calls_are_coalesced_across_processes(tmp_path):
+    lock_dir, calls_dir = tmp_path / "locks", tmp_path / "calls"
+    calls_dir.mkdir()
+    context = multiprocessing.get_context("fork")
+    queue = context.Queue()
+    processes = [context.Process(target=_call_in_process, args=(str(lock_dir), str(calls_dir), queue))
+                 for _ in range(3)]
+    for process in processes:
+        process.start()
+    results = [queue.get(timeout=10) for _ in processes]
+    for process in processes:
+        process.join()
+
+    assert results == [{"score": 9}] * 3
+    assert len(os.listdir(calls_dir)) == 1
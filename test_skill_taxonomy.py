@@ -0,0 +1,90 @@
+import pytest
+
+import skill_taxonomy
+from skill_taxonomy import SkillIndex, find_skills, normalize_text, skill_key
+
+
+@pytest.mark.parametrize("text, key", [
+    ("Python", "python"),
+    ("Postgres", "postgresql"),
+    ("Experience with PostgreSQL", "postgresql"),
+    ("Knowledge of SQL", "sql"),
+    ("SQL databases (especially PostgreSQL)", "postgresql+sql"),
+    ("CI/CD tools such as Jenkins", "ci_cd+jenkins"),
+    ("Containerization", "containerization"),
+])
+def test_skill_key_canonicalizes_pure_skill_requirements(text, key):
+    assert skill_key(text) == key
+
+
+@pytest.mark.parametrize("text", [
+    "Java or Python",
+    "Java and Python",
+    "Java/Python/Go/C++",
+    "Docker, Kubernetes",
+    "Version control systems (e.g., Git)",
+    "Basic Python",
+    "Advanced Python",
+    "Strong Python skills",
+    "Proficiency in Python",
+    "Exposure to Kubernetes",
+    "Hands-on experience with Docker",
+    "Design scalable services in Python",
+])
+def test_skill_key_is_none_when_the_text_says_more_than_which_skills(text):
+    assert skill_key(text) is None
+
+
+@pytest.mark.parametrize("first, second", [
+    ("Java or Python", "Java and Python"),
+    ("Basic Python", "Advanced Python"),
+    ("Basic Python", "Python"),
+    ("Strong SQL", "Working knowledge of SQL"),
+    ("Java/Python", "Java and Python"),
+])
+def test_different_requirements_do_not_share_a_key(first, second):
+    from verdict_cache import canonical_requirement
+
+    assert canonical_requirement(first) != canonical_requirement(second)
+
+
+@pytest.mark.parametrize("broader, specific", [
+    ("Containerization", "Docker"),
+    ("Containers", "Docker"),
+    ("Unix", "Linux"),
+    ("Version control", "Git"),
+    ("Torch", "PyTorch"),
+])
+def test_related_skills_are_not_merged(broader, specific):
+    assert skill_key(broader) is not None and skill_key(specific) is not None
+    assert skill_key(broader) != skill_key(specific)
+
+
+def test_scan_matches_whole_words_only():
+    index = SkillIndex({"java": ["java"], "javascript": ["javascript", "js"]})
+    text = normalize_text("JavaScript and Java, not JSON")
+    assert [(text[start:end], skill_id) for start, end, skill_id in index.scan(text)] == [
+        ("javascript", "javascript"), ("java", "java")
+    ]
+
+
+def test_scan_prefers_the_longest_alias_at_a_position():
+    index = SkillIndex({"ml": ["machine learning"], "deep_learning": ["deep learning"], "learning": ["learning"]})
+    assert [skill_id for _, _, skill_id in index.scan("deep learning and machine learning")] == ["deep_learning", "ml"]
+
+
+def test_scan_of_text_without_skills_is_empty():
+    assert SkillIndex({"go": ["golang"]}).scan("nothing to see here") == []
+
+
+def test_find_skills_returns_ids_in_order_of_first_appearance():
+    assert find_skills("Postgres, Python and PostgreSQL") == ["postgresql", "python"]
+
+
+def test_add_skill_aliases_extends_the_index(monkeypatch):
+    monkeypatch.setattr(skill_taxonomy, "SKILL_ALIASES", {key: list(value) for key, value in skill_taxonomy.SKILL_ALIASES.items()})
+    monkeypatch.setattr(skill_taxonomy, "_index", None)
+
+    assert find_skills("Experience with Dagster") == []
+    skill_taxonomy.add_skill_aliases("dagster", ["dagster"])
+    assert find_skills("Experience with Dagster") == ["dagster"]
@@ -0,0 +1,276 @@
+import io
+import tarfile
+import zipfile
+import zlib
+
+import pytest
+
+import text_extraction
+from text_extraction import extract_text, is_archive, iter_archive_members, iter_docx_blocks
+
+
+def make_zip(members):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as archive:
+        for name, content in members:
+            archive.writestr(name, content)
+    buffer.seek(0)
+    return buffer
+
+
+def make_docx(body_xml):
+    """Builds a minimal .docx whose word/document.xml has the given body content."""
+    document = (
+        '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"'
+        ' xmlns:mc="http://schemas.openxmlformats.org/markup-compatibility/2006"'
+        ' xmlns:wps="http://schemas.microsoft.com/office/word/2010/wordprocessingShape"'
+        ' xmlns:v="urn:schemas-microsoft-com:vml">'
+        f'<w:body>{body_xml}<w:sectPr/></w:body></w:document>'
+    )
+    return make_zip([("[Content_Types].xml", "<Types/>"), ("word/document.xml", document)])
+
+
+def paragraph(*runs):
+    return '<w:p>' + ''.join(f'<w:r>{run}</w:r>' for run in runs) + '</w:p>'
+
+
+def text(value):
+    return f'<w:t xml:space="preserve">{value}</w:t>'
+
+
+def cell(*paragraphs, properties=''):
+    return f'<w:tc><w:tcPr>{properties}</w:tcPr>' + ''.join(paragraphs) + '</w:tc>'
+
+
+def table(*rows):
+    return '<w:tbl>' + ''.join('<w:tr>' + ''.join(cells) + '</w:tr>' for cells in rows) + '</w:tbl>'
+
+
+def make_pdf(pages):
+    """Builds a minimal PDF with one Helvetica text line per entry of `pages`, deflated as most PDFs are."""
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        ("<< /Type /Pages /Count %d /Kids [%s] >>" % (
+            len(pages), ' '.join(f"{4 + 2 * i} 0 R" for i in range(len(pages))))).encode(),
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    for i, line in enumerate(pages):
+        content = zlib.compress(f"BT /F1 9 Tf 40 800 Td ({line}) Tj ET".encode('latin-1'))
+        objects.append(("<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+                        "/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % (5 + 2 * i)).encode())
+        objects.append(b"<< /Length %d /Filter /FlateDecode >>\nstream\n" % len(content) + content + b"\nendstream")
+
+    output = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(output))
+        output += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref = len(output)
+    output += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    output += b''.join(b"%010d 00000 n \n" % offset for offset in offsets)
+    output += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(output)
+
+
+def make_tar(members, mode='w:gz'):
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode=mode) as archive:
+        for name, content in members:
+            info = tarfile.TarInfo(name)
+            info.size = len(content)
+            archive.addfile(info, io.BytesIO(content))
+    buffer.seek(0)
+    return buffer
+
+
+def test_is_archive():
+    assert is_archive("resumes.zip") and is_archive("resumes.TAR.GZ") and is_archive("pack.tgz")
+    assert not is_archive("resume.pdf") and not is_archive("resume.pdf.gz") and not is_archive(None)
+
+
+def test_zip_members_are_filtered_to_resumes():
+    archive = make_zip([
+        ("a.pdf", b"%PDF"), ("nested/b.TXT", b"text"), ("notes.md", b"skip"),
+        (".hidden.txt", b"skip"), ("__MACOSX/._a.pdf", b"skip"), ("folder/", b""),
+    ])
+    assert list(iter_archive_members(archive, "pack.zip")) == [("a.pdf", b"%PDF"), ("nested/b.TXT", b"text")]
+
+
+def test_oversized_members_are_reported_without_content():
+    # Highly compressible, so the limit is enforced on decompressed bytes
+    members = [("small.txt", b"ok"), ("bomb.txt", b"0" * 5000), ("after.txt", b"still read")]
+    for archive, filename in ((make_zip(members), "pack.zip"), (make_tar(members), "pack.tar.gz")):
+        assert list(iter_archive_members(archive, filename, max_member_bytes=1000)) == [
+            ("small.txt", b"ok"), ("bomb.txt", None), ("after.txt", b"still read")
+        ]
+
+
+def test_member_count_is_limited():
+    members = [(f"r{i}.txt", b"x") for i in range(5)]
+    for archive, filename in ((make_zip(members), "pack.zip"), (make_tar(members, 'w'), "pack.tar")):
+        names = [name for name, _ in iter_archive_members(archive, filename, max_members=3)]
+        assert names == ["r0.txt", "r1.txt", "r2.txt"]
+
+
+def test_docx_paragraphs_keep_runs_tabs_and_breaks():
+    docx = make_docx(
+        paragraph(text("Jane "), text("Doe")) +
+        paragraph(text("Skills:"), '<w:tab/>', text("Python"), '<w:br/>', text("SQL")) +
+        paragraph() +
+        paragraph(text("Kept "), '<w:delText>deleted </w:delText>', text("text"))
+    )
+    assert list(iter_docx_blocks(docx)) == ["Jane Doe", "Skills:\tPython\nSQL", "", "Kept text"]
+
+
+def test_docx_tables_are_read_row_by_row_in_document_order():
+    docx = make_docx(
+        paragraph(text("Experience")) +
+        table(
+            [cell(paragraph(text("2020-2023"))), cell(paragraph(text("Engineer")), paragraph(text("Acme")))],
+            # Vertically merged continuation cells are empty and skipped
+            [cell(paragraph(), properties='<w:vMerge/>'), cell(paragraph(text("Lead")))],
+            [cell(paragraph(text("Spans two columns")), properties='<w:gridSpan w:val="2"/>')],
+        ) +
+        paragraph(text("Education"))
+    )
+    assert list(iter_docx_blocks(docx)) == [
+        "Experience", "2020-2023 | Engineer Acme", "Lead", "Spans two columns", "Education"
+    ]
+
+
+def test_docx_nested_tables_are_flattened_into_their_cell():
+    inner = table([cell(paragraph(text("Python"))), cell(paragraph(text("5 years")))])
+    docx = make_docx(table([cell(paragraph(text("Skills"))), cell(inner)]))
+    assert list(iter_docx_blocks(docx)) == ["Skills | Python | 5 years"]
+
+
+def test_docx_text_boxes_are_read_once_before_their_anchor():
+    text_box = paragraph(text("Contact: jane@example.com"))
+    anchor = (
+        '<w:p><w:r><w:t>Header</w:t></w:r><w:r><mc:AlternateContent>'
+        f'<mc:Choice Requires="wps"><w:drawing><wps:txbx><w:txbxContent>{text_box}</w:txbxContent>'
+        '</wps:txbx></w:drawing></mc:Choice>'
+        f'<mc:Fallback><w:pict><v:textbox><w:txbxContent>{text_box}</w:txbxContent></v:textbox></w:pict>'
+        '</mc:Fallback></mc:AlternateContent></w:r></w:p>'
+    )
+    docx = make_docx(anchor + paragraph(text("Summary")))
+    assert list(iter_docx_blocks(docx)) == ["Contact: jane@example.com", "Header", "Summary"]
+
+
+def test_extract_text_reads_docx_one_block_per_line():
+    docx = make_docx(paragraph(text("Jane Doe")) + table([cell(paragraph(text("A"))), cell(paragraph(text("B")))]))
+    assert extract_text(docx, "resume.DOCX") == "Jane Doe\nA | B\n"
+
+
+def test_parallel_pdf_extraction_matches_serial_extraction(monkeypatch):
+    pdf_bytes = make_pdf([f"Page {i}: Research Engineer, Python and PostgreSQL pipelines" for i in range(6)])
+    backend = text_extraction.PDF_BACKENDS['pypdf2']
+    serial, page_count = text_extraction.extract_pdf_pages(backend, pdf_bytes, max_chars=0)
+
+    monkeypatch.setattr(text_extraction, "PDF_EXTRACTION_WORKERS", 2)
+    monkeypatch.setattr(text_extraction, "PDF_PARALLEL_MIN_PAGES", 2)
+    try:
+        parallel, _ = text_extraction.extract_pdf_pages(backend, pdf_bytes, max_chars=0)
+        # Workers are not forked from this (possibly multithreaded) process
+        assert text_extraction._pdf_executor._mp_context.get_start_method() in ('forkserver', 'spawn')
+    finally:
+        text_extraction._shutdown_pdf_executor()
+
+    assert page_count == 6 and parallel == serial
+    assert text_extraction._pdf_executor is None
+
+
+class FakePdfBackend(text_extraction.PdfBackend):
+    """Returns fixed page texts for any PDF and records which files it was asked to read."""
+
+    def __init__(self, name, pages, installed=True):
+        self.name = name
+        self.pages = pages
+        self.installed = installed
+        self.calls = 0
+
+    def available(self):
+        return self.installed
+
+    def page_count(self, pdf_bytes):
+        self.calls += 1
+        return len(self.pages)
+
+    def iter_pages(self, pdf_bytes, first_page=0, last_page=None):
+        yield from self.pages[first_page:last_page]
+
+
+def use_backends(monkeypatch, *backends, choice='auto'):
+    monkeypatch.setattr(text_extraction, "PDF_BACKENDS", {backend.name: backend for backend in backends})
+    monkeypatch.setattr(text_extraction, "PDF_BACKEND", choice)
+    monkeypatch.setattr(text_extraction, "PDF_MIN_CHARS_PER_PAGE", 20)
+    return backends
+
+
+def names(backends):
+    return [backend.name for backend in backends]
+
+
+def test_pdf_backends_are_a_complete_abstract_interface():
+    class Incomplete(text_extraction.PdfBackend):
+        def page_count(self, pdf_bytes):
+            return 0
+
+    with pytest.raises(TypeError):
+        Incomplete()
+    assert all(isinstance(backend, text_extraction.PdfBackend) for backend in text_extraction.PDF_BACKENDS.values())
+
+
+def test_cid_and_type3_fonts_move_pdfminer_ahead_of_pypdf2(monkeypatch):
+    use_backends(monkeypatch, FakePdfBackend('pdfium', []), FakePdfBackend('pypdf2', []),
+                 FakePdfBackend('pdfminer', []))
+    assert names(text_extraction.choose_pdf_backends(b"%PDF /Type1")) == ['pdfium', 'pypdf2', 'pdfminer']
+    for marker in (b'/Identity-H', b'/Identity-V', b'/Type3'):
+        assert names(text_extraction.choose_pdf_backends(b"%PDF " + marker)) == ['pdfium', 'pdfminer', 'pypdf2']
+
+
+def test_missing_backends_are_skipped(monkeypatch):
+    use_backends(monkeypatch, FakePdfBackend('pdfium', [], installed=False), FakePdfBackend('pypdf2', []),
+                 FakePdfBackend('pdfminer', [], installed=False))
+    assert names(text_extraction.choose_pdf_backends(b"%PDF /Type3")) == ['pypdf2']
+
+
+def test_pdf_backend_override_and_its_fallback(monkeypatch):
+    backends = (FakePdfBackend('pdfium', []), FakePdfBackend('pypdf2', []), FakePdfBackend('pdfminer', []))
+    use_backends(monkeypatch, *backends, choice='pdfminer')
+    assert names(text_extraction.choose_pdf_backends(b"%PDF")) == ['pdfminer']
+
+    # An unknown or uninstalled backend falls back to the automatic order
+    use_backends(monkeypatch, *backends, choice='mupdf')
+    assert names(text_extraction.choose_pdf_backends(b"%PDF")) == ['pdfium', 'pypdf2', 'pdfminer']
+    backends[2].installed = False
+    use_backends(monkeypatch, *backends, choice='pdfminer')
+    assert names(text_extraction.choose_pdf_backends(b"%PDF")) == ['pdfium', 'pypdf2']
+
+
+def test_low_density_text_falls_back_to_the_next_backend(monkeypatch):
+    dense = "Python engineer with ten years of SQL"
+    pdfium, pypdf2, pdfminer = use_backends(
+        monkeypatch, FakePdfBackend('pdfium', ["x", "y"]), FakePdfBackend('pypdf2', [dense, dense]),
+        FakePdfBackend('pdfminer', [dense + " and more"] * 2))
+
+    assert text_extraction.extract_text_from_pdf(io.BytesIO(b"%PDF"), max_chars=0) == f"{dense}\n\n{dense}"
+    # The first dense enough text wins; later backends are not tried
+    assert (pdfium.calls, pypdf2.calls, pdfminer.calls) == (1, 1, 0)
+
+
+def test_longest_text_is_kept_when_every_backend_is_sparse(monkeypatch):
+    use_backends(monkeypatch, FakePdfBackend('pdfium', ["short"]), FakePdfBackend('pypdf2', ["a bit longer"]),
+                 FakePdfBackend('pdfminer', ["mid text"]))
+    assert text_extraction.extract_text_from_pdf(io.BytesIO(b"%PDF"), max_chars=0) == "a bit longer"
+
+
+def test_failing_backend_is_skipped(monkeypatch):
+    class BrokenBackend(FakePdfBackend):
+        def page_count(self, pdf_bytes):
+            raise ValueError("cannot parse")
+
+    dense = "Kubernetes, AWS and Terraform for five years"
+    use_backends(monkeypatch, BrokenBackend('pdfium', []), FakePdfBackend('pypdf2', [dense]),
+                 FakePdfBackend('pdfminer', []))
+    assert text_extraction.extract_text_from_pdf(io.BytesIO(b"%PDF"), max_chars=10) == dense[:10]
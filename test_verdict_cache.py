@@ -0,0 +1,149 @@
+from verdict_cache import (
+    VerdictCache,
+    analysis_cache_key,
+    prune_known_requirements,
+    reassemble_requirement_match,
+    remember_verdicts,
+    resume_hash,
+    verdict_resume_key,
+)
+
+REQUIREMENTS = {
+    "must_have_requirements": {
+        "technical_skills": ["Python", "PostgreSQL", "Design distributed systems"],
+        "experience": "3+ years",
+        "qualifications": ["Bachelor's degree in Computer Science"],
+        "core_responsibilities": ["Own services end to end"],
+    },
+    "good_to_have_requirements": {"additional_skills": ["Kubernetes"]},
+    "additional_screening_criteria": ["Location: Bangalore"],
+}
+
+ANALYSIS = {
+    "requirement_match": {
+        "must_have_requirements": {
+            "technical_skills": {"Python": True, "PostgreSQL": False, "Design distributed systems": True},
+            "experience": True,
+            "qualifications": False,
+            "core_responsibilities": {"Own services end to end": True},
+        },
+        "good_to_have_requirements": {"additional_skills": {"Kubernetes": False}},
+        "additional_screening_criteria": {"Location: Bangalore": True},
+    }
+}
+
+
+def test_resume_hash_ignores_whitespace():
+    assert resume_hash("Jane  Doe\n\nPython ") == resume_hash("Jane Doe Python")
+    assert resume_hash("Jane Doe Python") != resume_hash("Jane Doe Java")
+
+
+def test_analysis_cache_key_depends_on_requirements_and_model():
+    key = analysis_cache_key("resume", REQUIREMENTS, "o4-mini")
+    assert key == analysis_cache_key(" resume\n", dict(REQUIREMENTS), "o4-mini")
+    assert key != analysis_cache_key("resume", REQUIREMENTS, "gpt-4.1")
+    assert key != analysis_cache_key("resume", {**REQUIREMENTS, "additional_screening_criteria": []}, "o4-mini")
+
+
+def test_empty_cache_prunes_nothing():
+    cache = VerdictCache()
+    pruned, known = prune_known_requirements("resume", REQUIREMENTS, cache=cache)
+    assert pruned == REQUIREMENTS
+    assert known == {}
+
+
+def test_remembered_verdicts_are_pruned_and_reassembled():
+    cache = VerdictCache()
+    remember_verdicts("resume", ANALYSIS, REQUIREMENTS, cache=cache)
+
+    # Another JD sharing some items: only the new ones are left for the model
+    other = {
+        "must_have_requirements": {
+            "technical_skills": ["python", "Go"],
+            "experience": "3+ years",
+            "qualifications": ["Bachelor's degree in Computer Science"],
+            "core_responsibilities": [],
+        },
+        "good_to_have_requirements": {"additional_skills": ["Kubernetes", "Terraform"]},
+        "additional_screening_criteria": [],
+    }
+    pruned, known = prune_known_requirements("resume", other, cache=cache)
+    assert pruned["must_have_requirements"]["technical_skills"] == ["Go"]
+    assert pruned["good_to_have_requirements"]["additional_skills"] == ["Terraform"]
+    assert other["must_have_requirements"]["technical_skills"] == ["python", "Go"]
+
+    model_answer = {
+        "requirement_match": {
+            "must_have_requirements": {"technical_skills": {"Go": False}},
+            "good_to_have_requirements": {"additional_skills": {"Terraform": True}},
+        }
+    }
+    match = reassemble_requirement_match(model_answer, other, known)["requirement_match"]
+    assert list(match["must_have_requirements"]["technical_skills"].items()) == [("python", True), ("Go", False)]
+    assert match["must_have_requirements"]["experience"] is True
+    assert match["must_have_requirements"]["qualifications"] is False
+    assert list(match["good_to_have_requirements"]["additional_skills"].items()) == [("Kubernetes", False), ("Terraform", True)]
+
+
+def test_verdicts_are_per_resume():
+    cache = VerdictCache()
+    remember_verdicts("resume-a", ANALYSIS, REQUIREMENTS, cache=cache)
+    _, known = prune_known_requirements("resume-b", REQUIREMENTS, cache=cache)
+    assert known == {}
+
+
+def test_cache_evicts_least_recently_used_and_ignores_non_booleans():
+    cache = VerdictCache(max_entries=2)
+    cache.set("r", "a", True)
+    cache.set("r", "b", False)
+    cache.set("r", "ignored", "yes")
+    assert cache.get("r", "a") is True
+    cache.set("r", "c", True)
+
+    assert cache.get("r", "b") is None
+    assert cache.get("r", "a") is True
+    assert cache.get("r", "c") is True
+    assert cache.stats()["entries"] == 2
+
+
+def test_verdicts_are_not_shared_between_different_skill_requirements():
+    cache = VerdictCache()
+    requirements = {"must_have_requirements": {"technical_skills": ["Java or Python", "Basic Python"]}}
+    analysis = {"requirement_match": {"must_have_requirements": {
+        "technical_skills": {"Java or Python": True, "Basic Python": True}}}}
+    remember_verdicts("resume", analysis, requirements, cache=cache)
+
+    other = {"must_have_requirements": {"technical_skills": ["Java and Python", "Advanced Python"]}}
+    pruned, known = prune_known_requirements("resume", other, cache=cache)
+    assert known == {}
+    assert pruned["must_have_requirements"]["technical_skills"] == ["Java and Python", "Advanced Python"]
+
+
+def test_verdicts_are_per_model():
+    cache = VerdictCache()
+    remember_verdicts(verdict_resume_key("resume", "o4-mini"), ANALYSIS, REQUIREMENTS, cache=cache)
+
+    _, known = prune_known_requirements(verdict_resume_key(" resume\n", "o4-mini"), REQUIREMENTS, cache=cache)
+    assert len(known) == 8
+    _, known = prune_known_requirements(verdict_resume_key("resume", "gpt-4.1"), REQUIREMENTS, cache=cache)
+    assert known == {}
+
+
+def test_verdicts_are_per_requirement_section():
+    cache = VerdictCache()
+    remember_verdicts("resume", ANALYSIS, REQUIREMENTS, cache=cache)
+
+    # Kubernetes was a good-to-have and Python a must-have; their verdicts do not carry across sections
+    swapped = {
+        "must_have_requirements": {"technical_skills": ["Kubernetes"]},
+        "good_to_have_requirements": {"additional_skills": ["Python"]},
+        "additional_screening_criteria": ["Own services end to end"],
+    }
+    pruned, known = prune_known_requirements("resume", swapped, cache=cache)
+    assert known == {}
+    assert pruned == swapped
+
+    same_sections = {"must_have_requirements": {"technical_skills": ["Python"]},
+                     "good_to_have_requirements": {"additional_skills": ["Kubernetes"]}}
+    _, known = prune_known_requirements("resume", same_sections, cache=cache)
+    assert sorted(known.values()) == [False, True]
@@ -0,0 +1,473 @@
+import abc
+import atexit
+import importlib.util
+import io
+import multiprocessing
+import os
+import tarfile
+import threading
+import zipfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from xml.etree import ElementTree
+
+# File types the extractors understand; anything else is read as UTF-8 text
+SUPPORTED_EXTENSIONS = ('.pdf', '.docx', '.txt')
+
+# Archives of resumes that are expanded member by member
+ARCHIVE_EXTENSIONS = ('.zip', '.tar', '.tar.gz', '.tgz', '.tar.bz2')
+
+# Limits applied while expanding archives. Member sizes are checked on the bytes actually
+# decompressed, not on the sizes the archive claims, so a zip bomb cannot get past them.
+MAX_ARCHIVE_MEMBER_BYTES = int(os.getenv("MAX_ARCHIVE_MEMBER_BYTES", str(10 * 1024 * 1024)))
+MAX_ARCHIVE_MEMBERS = int(os.getenv("MAX_ARCHIVE_MEMBERS", "1000"))
+
+# Size of the chunks members are decompressed in
+ARCHIVE_READ_CHUNK = 64 * 1024
+
+# PDF libraries are imported by their backends on first use, so importing this module (and
+# the backend) does not pay for them until a PDF arrives
+
+# Extraction stops once this many characters have been read (0 disables the budget). Long
+# academic CVs put publications last, and the analyzers do not need them.
+PDF_MAX_TEXT_CHARS = int(os.getenv("PDF_MAX_TEXT_CHARS", "60000"))
+
+# PDFs with at least this many pages are split across worker processes, PDF_PAGES_PER_TASK
+# pages per task. The PDF libraries hold the GIL, so threads would not run pages in parallel.
+PDF_PARALLEL_MIN_PAGES = int(os.getenv("PDF_PARALLEL_MIN_PAGES", "12"))
+PDF_EXTRACTION_WORKERS = int(os.getenv("PDF_EXTRACTION_WORKERS", str(min(4, os.cpu_count() or 1))))
+PDF_PAGES_PER_TASK = 4
+
+# "auto" picks a backend per file (see choose_pdf_backends); a backend name forces that one
+PDF_BACKEND = os.getenv("PDF_BACKEND", "auto").lower()
+
+# Below this many non-space characters per page the text is treated as missing (e.g. fonts
+# the library cannot decode) and the next backend is tried
+PDF_MIN_CHARS_PER_PAGE = int(os.getenv("PDF_MIN_CHARS_PER_PAGE", "100"))
+
+class PdfBackend(abc.ABC):
+    """
+    A PDF text library behind extract_text_from_pdf. Backends work on the PDF bytes and
+    import their library on first use, so they can also run in worker processes.
+    """
+    name = None
+    module = None
+
+    def available(self):
+        """Returns True if the backend's library is installed."""
+        return importlib.util.find_spec(self.module) is not None
+
+    @abc.abstractmethod
+    def page_count(self, pdf_bytes):
+        """Returns the number of pages in the PDF."""
+
+    @abc.abstractmethod
+    def iter_pages(self, pdf_bytes, first_page=0, last_page=None):
+        """Yields the text of pages [first_page, last_page), one page at a time."""
+
+class PyPDF2Backend(PdfBackend):
+    """Pure Python; always installed, but slow and blind to some font encodings."""
+    name = 'pypdf2'
+    module = 'PyPDF2'
+
+    def page_count(self, pdf_bytes):
+        import PyPDF2
+
+        return len(PyPDF2.PdfReader(io.BytesIO(pdf_bytes)).pages)
+
+    def iter_pages(self, pdf_bytes, first_page=0, last_page=None):
+        import PyPDF2
+
+        pages = PyPDF2.PdfReader(io.BytesIO(pdf_bytes)).pages
+        for index in range(first_page, len(pages) if last_page is None else last_page):
+            yield pages[index].extract_text() or ''
+
+class PdfminerBackend(PdfBackend):
+    """pdfminer.six: slowest, but decodes CID and Type3 fonts through their ToUnicode maps."""
+    name = 'pdfminer'
+    module = 'pdfminer'
+
+    def page_count(self, pdf_bytes):
+        from pdfminer.pdfpage import PDFPage
+
+        return sum(1 for _ in PDFPage.get_pages(io.BytesIO(pdf_bytes)))
+
+    def iter_pages(self, pdf_bytes, first_page=0, last_page=None):
+        from pdfminer.converter import TextConverter
+        from pdfminer.layout import LAParams
+        from pdfminer.pdfinterp import PDFPageInterpreter, PDFResourceManager
+        from pdfminer.pdfpage import PDFPage
+
+        manager = PDFResourceManager()
+        for index, page in enumerate(PDFPage.get_pages(io.BytesIO(pdf_bytes))):
+            if index < first_page:
+                continue
+            if last_page is not None and index >= last_page:
+                return
+            output = io.StringIO()
+            device = TextConverter(manager, output, laparams=LAParams())
+            PDFPageInterpreter(manager, device).process_page(page)
+            device.close()
+            yield output.getvalue()
+
+class PdfiumBackend(PdfBackend):
+    """pypdfium2 (Chromium's PDFium): native code, much faster than the pure Python libraries."""
+    name = 'pdfium'
+    module = 'pypdfium2'
+
+    def page_count(self, pdf_bytes):
+        import pypdfium2
+
+        document = pypdfium2.PdfDocument(pdf_bytes)
+        try:
+            return len(document)
+        finally:
+            document.close()
+
+    def iter_pages(self, pdf_bytes, first_page=0, last_page=None):
+        import pypdfium2
+
+        document = pypdfium2.PdfDocument(pdf_bytes)
+        try:
+            for index in range(first_page, len(document) if last_page is None else last_page):
+                yield document[index].get_textpage().get_text_range()
+        finally:
+            document.close()
+
+# Backends by name, in the order "auto" prefers them
+PDF_BACKENDS = {backend.name: backend for backend in (PdfiumBackend(), PyPDF2Backend(), PdfminerBackend())}
+
+# Font types PyPDF2 often returns no text for, found by scanning the raw PDF bytes
+_HARD_FONT_MARKERS = (b'/Identity-H', b'/Identity-V', b'/Type3')
+
+def choose_pdf_backends(pdf_bytes):
+    """
+    Returns the installed backends to try for a PDF, best first. With PDF_BACKEND "auto",
+    PDFium comes first, then PyPDF2, then pdfminer; pdfminer moves ahead of PyPDF2 when the
+    file declares CID or Type3 fonts. Fonts inside compressed object streams are not seen,
+    which the low-density fallback in extract_text_from_pdf covers.
+    """
+    if PDF_BACKEND != 'auto':
+        backend = PDF_BACKENDS.get(PDF_BACKEND)
+        if backend is None or not backend.available():
+            print(f"PDF backend {PDF_BACKEND!r} is not available; choosing automatically")
+        else:
+            return [backend]
+
+    names = list(PDF_BACKENDS)
+    if any(marker in pdf_bytes for marker in _HARD_FONT_MARKERS):
+        names.remove('pdfminer')
+        names.insert(names.index('pypdf2'), 'pdfminer')
+    return [PDF_BACKENDS[name] for name in names if PDF_BACKENDS[name].available()]
+
+# Worker processes are started by a fork server (spawned where that is unavailable), since
+# forking a multithreaded web server can copy locks held by other threads into the workers
+PDF_WORKER_START_METHOD = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+
+_pdf_executor = None
+_pdf_executor_lock = threading.Lock()
+
+def _get_pdf_executor():
+    """Returns the process pool shared by all PDF extractions, creating it on first use."""
+    global _pdf_executor
+    with _pdf_executor_lock:
+        if _pdf_executor is None:
+            _pdf_executor = ProcessPoolExecutor(
+                max_workers=PDF_EXTRACTION_WORKERS,
+                mp_context=multiprocessing.get_context(PDF_WORKER_START_METHOD)
+            )
+        return _pdf_executor
+
+@atexit.register
+def _shutdown_pdf_executor():
+    """Stops the PDF worker processes when the interpreter exits."""
+    global _pdf_executor
+    with _pdf_executor_lock:
+        executor, _pdf_executor = _pdf_executor, None
+    if executor is not None:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+def _extract_pdf_pages(backend_name, pdf_bytes, first_page, last_page):
+    """Worker task: returns the text of pages [first_page, last_page) of a PDF."""
+    return list(PDF_BACKENDS[backend_name].iter_pages(pdf_bytes, first_page, last_page))
+
+def _read_pdf_bytes(pdf_file):
+    """Returns the whole PDF as bytes for the backends and worker processes."""
+    if isinstance(pdf_file, (str, os.PathLike)):
+        with open(pdf_file, 'rb') as f:
+            return f.read()
+    pdf_file.seek(0)
+    return pdf_file.read()
+
+def _iter_pdf_pages_parallel(backend, pdf_bytes, page_count):
+    """
+    Yields page texts in order while worker processes extract the pages ahead of them.
+    At most PDF_EXTRACTION_WORKERS tasks are in flight, so stopping early (when the caller
+    stops iterating) wastes at most that many tasks.
+    """
+    executor = _get_pdf_executor()
+    ranges = [(first, min(first + PDF_PAGES_PER_TASK, page_count))
+              for first in range(0, page_count, PDF_PAGES_PER_TASK)]
+    pending = deque()
+    try:
+        for first, last in ranges:
+            pending.append(executor.submit(_extract_pdf_pages, backend.name, pdf_bytes, first, last))
+            if len(pending) >= PDF_EXTRACTION_WORKERS:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+    finally:
+        for future in pending:
+            future.cancel()
+
+def normalize_extracted_text(text):
+    """
+    Collapses runs of spaces and tabs and trims each line, keeping line breaks and at most
+    one blank line between blocks, so section headings stay on their own lines.
+    """
+    lines = [' '.join(line.split()) for line in text.splitlines()]
+    normalized = []
+    for line in lines:
+        if line or (normalized and normalized[-1]):
+            normalized.append(line)
+    return '\n'.join(normalized).strip()
+
+def extract_pdf_pages(backend, pdf_bytes, max_chars=PDF_MAX_TEXT_CHARS):
+    """
+    Extracts the pages of a PDF with one backend, in parallel for long PDFs, until
+    `max_chars` characters have been read. Returns (page texts, total page count).
+    """
+    page_count = backend.page_count(pdf_bytes)
+    if PDF_EXTRACTION_WORKERS > 1 and page_count >= PDF_PARALLEL_MIN_PAGES:
+        page_texts = _iter_pdf_pages_parallel(backend, pdf_bytes, page_count)
+    else:
+        page_texts = backend.iter_pages(pdf_bytes)
+
+    pages = []
+    length = 0
+    try:
+        for page_num, page_text in enumerate(page_texts):
+            pages.append(page_text)
+            length += len(page_text)
+            
+            # Log each page separately for debugging
+            print(f"\n--- PAGE {page_num + 1} TEXT ({backend.name}) ---")
+            print(page_text[:300] + "..." if len(page_text) > 300 else page_text)
+            print("--- END PAGE ---")
+
+            if max_chars and length >= max_chars:
+                print(f"Reached the {max_chars} character budget after {page_num + 1} of {page_count} pages")
+                break
+    finally:
+        page_texts.close()
+    return pages, page_count
+
+def extract_text_from_pdf(pdf_file, max_chars=PDF_MAX_TEXT_CHARS):
+    """
+    Extract text from PDF file, page by page, with a blank line between pages.
+    Backends are tried in the order choose_pdf_backends gives until one returns at least
+    PDF_MIN_CHARS_PER_PAGE characters per page; otherwise the longest text is kept.
+    Long PDFs are extracted in parallel worker processes, and extraction stops early once
+    `max_chars` characters have been read; the text is cut to that length.
+
+    Args:
+        pdf_file: Path or file-like object holding the PDF
+        max_chars (int): Character budget for the extracted text; 0 for no limit
+    """
+    try:
+        pdf_bytes = _read_pdf_bytes(pdf_file)
+    except Exception as e:
+        print(f"Error reading PDF: {str(e)}")
+        return ""
+
+    text = ""
+    for backend in choose_pdf_backends(pdf_bytes):
+        try:
+            pages, _ = extract_pdf_pages(backend, pdf_bytes, max_chars)
+        except Exception as e:
+            print(f"Error extracting PDF text with {backend.name}: {str(e)}")
+            continue
+
+        # Clean up the text - normalize whitespace but keep line and section breaks
+        backend_text = normalize_extracted_text('\n\n'.join(pages))
+        if len(backend_text) > len(text):
+            text = backend_text
+        chars_per_page = len(''.join(backend_text.split())) / max(len(pages), 1)
+        if chars_per_page >= PDF_MIN_CHARS_PER_PAGE:
+            break
+        print(f"{backend.name} extracted only {chars_per_page:.0f} characters per page; trying the next PDF backend")
+
+    if max_chars:
+        text = text[:max_chars]
+    
+    # Log the extracted text for debugging
+    print("\n" + "="*80)
+    print(f"EXTRACTED PDF TEXT FROM: {pdf_file.name if hasattr(pdf_file, 'name') else 'PDF file'}")
+    print("="*80)
+    print(f"Total text length: {len(text)} characters")
+    print("First 1000 characters:")
+    print(text[:1000] + "..." if len(text) > 1000 else text)
+    print("="*80)
+    
+    return text
+
+# WordprocessingML and markup-compatibility namespaces used in word/document.xml
+_W = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+_MC_FALLBACK = '{http://schemas.openxmlformats.org/markup-compatibility/2006}Fallback'
+
+# Separator between the cells of a table row
+DOCX_CELL_SEPARATOR = ' | '
+
+def iter_docx_blocks(docx_file):
+    """
+    Streams the text of a DOCX body in document order: one string per paragraph and one
+    per table row (cells joined by DOCX_CELL_SEPARATOR). word/document.xml is read from the
+    zip with iterparse and processed elements are dropped as it goes, so memory stays flat
+    however long the document is.
+
+    Args:
+        docx_file: Path or seekable file-like object holding the .docx
+    """
+    with zipfile.ZipFile(docx_file) as archive, archive.open('word/document.xml') as document:
+        body = None
+        paragraphs = []  # Text runs of the open paragraphs (text boxes nest paragraphs)
+        rows = []        # Cells of the open table rows (tables can be nested in cells)
+        cells = []       # Paragraphs and nested rows of the open table cells
+        fallback_depth = 0  # Inside mc:Fallback, which repeats content already read
+
+        for event, elem in ElementTree.iterparse(document, events=('start', 'end')):
+            tag = elem.tag
+            if event == 'start':
+                if tag == _MC_FALLBACK:
+                    fallback_depth += 1
+                elif fallback_depth:
+                    continue
+                elif tag == _W + 'body':
+                    body = elem
+                elif tag == _W + 'p':
+                    paragraphs.append([])
+                elif tag == _W + 'tr':
+                    rows.append([])
+                elif tag == _W + 'tc':
+                    cells.append([])
+                continue
+
+            if tag == _MC_FALLBACK:
+                fallback_depth -= 1
+                continue
+            if fallback_depth:
+                continue
+
+            block = None
+            if tag == _W + 't' and paragraphs:
+                paragraphs[-1].append(elem.text or '')
+            elif tag == _W + 'tab' and paragraphs:
+                paragraphs[-1].append('\t')
+            elif tag in (_W + 'br', _W + 'cr') and paragraphs:
+                paragraphs[-1].append('\n')
+            elif tag == _W + 'p':
+                block = ''.join(paragraphs.pop())
+                elem.clear()
+            elif tag == _W + 'tc':
+                rows[-1].append(' '.join(text for text in cells.pop() if text.strip()))
+            elif tag == _W + 'tr':
+                block = DOCX_CELL_SEPARATOR.join(cell for cell in rows.pop() if cell)
+                elem.clear()
+
+            # Drop finished top-level paragraphs and tables from the tree
+            if body is not None and not paragraphs and not rows and tag in (_W + 'p', _W + 'tbl'):
+                body.clear()
+
+            if block is None:
+                continue
+            if cells:
+                cells[-1].append(block)
+            else:
+                # Text box paragraphs are emitted just before the paragraph that anchors them
+                yield block
+
+def extract_text_from_docx(docx_file):
+    """Extract text from DOCX file, including tables, one paragraph or table row per line"""
+    return ''.join(block + "\n" for block in iter_docx_blocks(docx_file))
+
+def extract_text(file, filename):
+    """
+    Extract text from a file-like object based on its file name.
+    PDF and DOCX files use the dedicated extractors; anything else is read as UTF-8 text.
+    """
+    name = filename.lower()
+    if name.endswith('.pdf'):
+        return extract_text_from_pdf(file)
+    elif name.endswith('.docx'):
+        return extract_text_from_docx(file)
+    else:
+        # Assume it's a text file
+        return file.read().decode('utf-8')
+
+def is_archive(filename):
+    """Returns True if the file name looks like a zip or tar archive."""
+    return (filename or '').lower().endswith(ARCHIVE_EXTENSIONS)
+
+def _is_resume_member(name):
+    """Skips directories, hidden files and macOS resource forks inside archives."""
+    base = os.path.basename(name)
+    if not base or base.startswith('.') or '__MACOSX/' in name:
+        return False
+    return base.lower().endswith(SUPPORTED_EXTENSIONS)
+
+def _read_limited(stream, max_bytes):
+    """Reads a member in chunks; returns None as soon as it grows past `max_bytes`."""
+    chunks = []
+    size = 0
+    while True:
+        chunk = stream.read(ARCHIVE_READ_CHUNK)
+        if not chunk:
+            return b''.join(chunks)
+        size += len(chunk)
+        if size > max_bytes:
+            return None
+        chunks.append(chunk)
+
+def iter_archive_members(archive_file, filename, max_member_bytes=MAX_ARCHIVE_MEMBER_BYTES,
+                         max_members=MAX_ARCHIVE_MEMBERS):
+    """
+    Yields (member_name, content) for every resume inside a zip or tar archive.
+    Members are decompressed one at a time, so only one member is held in memory.
+    `content` is None for members larger than `max_member_bytes`, which are not read further.
+
+    Args:
+        archive_file: Seekable file-like object for zip archives; tar archives are read as a stream
+        filename (str): Archive file name, used to pick the format
+        max_member_bytes (int): Largest decompressed member accepted
+        max_members (int): Maximum number of resumes taken from one archive
+    """
+    count = 0
+    if filename.lower().endswith('.zip'):
+        with zipfile.ZipFile(archive_file) as archive:
+            for info in archive.infolist():
+                if info.is_dir() or not _is_resume_member(info.filename):
+                    continue
+                if count >= max_members:
+                    print(f"Archive {filename} has more than {max_members} resumes; ignoring the rest")
+                    return
+                count += 1
+                with archive.open(info) as member:
+                    content = _read_limited(member, max_member_bytes)
+                if content is None:
+                    print(f"Skipping {info.filename}: larger than {max_member_bytes} bytes")
+                yield info.filename, content
+        return
+
+    # 'r|*' reads the tar sequentially with transparent gzip/bz2 decompression
+    with tarfile.open(fileobj=archive_file, mode='r|*') as archive:
+        for member in archive:
+            if not member.isfile() or not _is_resume_member(member.name):
+                continue
+            if count >= max_members:
+                print(f"Archive {filename} has more than {max_members} resumes; ignoring the rest")
+                return
+            count += 1
+            content = _read_limited(archive.extractfile(member), max_member_bytes)
+            if content is None:
+                print(f"Skipping {member.name}: larger than {max_member_bytes} bytes")
+            yield member.name, content
@@ -0,0 +1,204 @@
+import copy
+import hashlib
+import json
+import re
+import threading
+from collections import OrderedDict
+
+from skill_taxonomy import skill_key
+
+# Upper bound on cached (resume, requirement) verdicts kept in memory
+MAX_CACHED_VERDICTS = 50000
+
+# Requirement lists whose items get one boolean each in `requirement_match`,
+# as (section, key) paths; a section of None means a top-level list
+REQUIREMENT_ITEM_PATHS = (
+    ("must_have_requirements", "technical_skills"),
+    ("must_have_requirements", "core_responsibilities"),
+    ("good_to_have_requirements", "additional_skills"),
+    (None, "additional_screening_criteria"),
+)
+
+_NON_WORD_EDGES_RE = re.compile(r"^[\W_]+|[\W_]+$")
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def resume_hash(resume_text):
+    """Returns a content hash of a resume that ignores whitespace differences."""
+    normalized = _WHITESPACE_RE.sub(" ", resume_text or "").strip()
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+def verdict_resume_key(resume_text, model):
+    """
+    Returns the resume side of verdict cache keys: the resume hash scoped to the model, so
+    verdicts decided by one model are not reused for analyses run with another.
+    """
+    return f"{model or ''}:{resume_hash(resume_text)}"
+
+
+def analysis_cache_key(resume_text, requirements, model):
+    """
+    Returns the content hash identifying one analysis: the same resume (ignoring whitespace),
+    the same requirements and the same model always produce the same key.
+    """
+    requirements_json = json.dumps(requirements, sort_keys=True, separators=(",", ":"), default=str)
+    payload = "\n".join((resume_hash(resume_text), requirements_json, model or ""))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def canonical_requirement(item):
+    """
+    Normalizes a requirement string into a cache key. Pure skill requirements use the
+    skill taxonomy ("Postgres" and "PostgreSQL" share "skill:postgresql"); anything else
+    falls back to its whitespace- and case-normalized text.
+    """
+    skills = skill_key(item)
+    if skills:
+        return "skill:" + skills
+    text = _WHITESPACE_RE.sub(" ", str(item)).strip().lower()
+    return _NON_WORD_EDGES_RE.sub("", text)
+
+
+def requirement_key(section, item):
+    """
+    Returns the verdict cache key of a requirement item: its canonical form scoped to the
+    requirement section, so a must-have and a good-to-have with the same text stay apart.
+    """
+    return f"{section or 'additional_screening_criteria'}: {canonical_requirement(item)}"
+
+
+def _items(value):
+    """Returns the requirement items of a list (or the keys of a dict), de-duplicated in order."""
+    if isinstance(value, dict):
+        value = list(value)
+    if not isinstance(value, list):
+        return []
+    return list(dict.fromkeys(str(item) for item in value if item))
+
+
+def _scalar_keys(requirements):
+    """Cache keys for the single-boolean experience and qualifications checks."""
+    must_have = requirements.get("must_have_requirements", {}) or {}
+    keys = {}
+    experience = must_have.get("experience")
+    if experience:
+        keys["experience"] = "must_have_requirements: experience: " + canonical_requirement(experience)
+    qualifications = _items(must_have.get("qualifications"))
+    if qualifications:
+        keys["qualifications"] = "must_have_requirements: qualifications: " + "; ".join(
+            canonical_requirement(q) for q in qualifications)
+    return keys
+
+
+class VerdictCache:
+    """Thread-safe LRU map of (resume key, requirement key) -> bool."""
+
+    def __init__(self, max_entries=MAX_CACHED_VERDICTS):
+        self.max_entries = max_entries
+        self._verdicts = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, resume_key, requirement_key):
+        with self._lock:
+            key = (resume_key, requirement_key)
+            if key in self._verdicts:
+                self._verdicts.move_to_end(key)
+                self.hits += 1
+                return self._verdicts[key]
+            self.misses += 1
+            return None
+
+    def set(self, resume_key, requirement_key, verdict):
+        if not isinstance(verdict, bool):
+            return
+        with self._lock:
+            key = (resume_key, requirement_key)
+            self._verdicts[key] = verdict
+            self._verdicts.move_to_end(key)
+            while len(self._verdicts) > self.max_entries:
+                self._verdicts.popitem(last=False)
+
+    def stats(self):
+        with self._lock:
+            return {"entries": len(self._verdicts), "hits": self.hits, "misses": self.misses}
+
+
+verdict_cache = VerdictCache()
+
+
+def prune_known_requirements(resume_key, requirements, cache=verdict_cache):
+    """
+    Splits requirements into what the cache already knows for this resume and what
+    still has to be asked. Returns (pruned_requirements, known), where `known` maps
+    canonical keys to cached verdicts and the pruned copy omits the known list items.
+    """
+    pruned = copy.deepcopy(requirements)
+    known = {}
+
+    for section, key in REQUIREMENT_ITEM_PATHS:
+        container = pruned if section is None else (pruned.get(section) or {})
+        remaining = []
+        for item in _items(container.get(key)):
+            item_key = requirement_key(section, item)
+            verdict = cache.get(resume_key, item_key)
+            if verdict is None:
+                remaining.append(item)
+            else:
+                known[item_key] = verdict
+        if key in container:
+            container[key] = remaining
+
+    for scalar_key in _scalar_keys(requirements).values():
+        verdict = cache.get(resume_key, scalar_key)
+        if verdict is not None:
+            known[scalar_key] = verdict
+
+    return pruned, known
+
+
+def reassemble_requirement_match(analysis, requirements, known):
+    """
+    Rebuilds `analysis["requirement_match"]` for the full requirements, filling
+    cached verdicts back in and keeping the item order of the original JD.
+    """
+    requirement_match = analysis.setdefault("requirement_match", {})
+
+    for section, key in REQUIREMENT_ITEM_PATHS:
+        source = requirements if section is None else (requirements.get(section) or {})
+        target = requirement_match if section is None else requirement_match.setdefault(section, {})
+        answered = target.get(key) or {}
+        merged = {}
+        for item in _items(source.get(key)):
+            item_key = requirement_key(section, item)
+            if item_key in known:
+                merged[item] = known[item_key]
+            elif item in answered:
+                merged[item] = answered[item]
+        # Keep anything the model returned that is not in the requirement list
+        for item, verdict in answered.items():
+            merged.setdefault(item, verdict)
+        target[key] = merged
+
+    must_have = requirement_match.setdefault("must_have_requirements", {})
+    for field, scalar_key in _scalar_keys(requirements).items():
+        if scalar_key in known:
+            must_have[field] = known[scalar_key]
+
+    return analysis
+
+
+def remember_verdicts(resume_key, analysis, requirements, cache=verdict_cache):
+    """Stores every boolean verdict of an analysis under (resume key, requirement key)."""
+    requirement_match = analysis.get("requirement_match", {}) or {}
+
+    for section, key in REQUIREMENT_ITEM_PATHS:
+        answered = (requirement_match if section is None else (requirement_match.get(section) or {})).get(key) or {}
+        for item, verdict in answered.items():
+            cache.set(resume_key, requirement_key(section, item), verdict)
+
+    must_have = requirement_match.get("must_have_requirements", {}) or {}
+    for field, scalar_key in _scalar_keys(requirements).items():
+        cache.set(resume_key, scalar_key, must_have.get(field))